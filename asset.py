@@ -1,17 +1,39 @@
 import pandas as pd
 
 from constants import DT_SERIES_ERROR
+from price_store import PriceStore
 
 
-class Asset:
+class PricedMixin:
+    # Asset.prices on top of a PriceStore, shared with the __slots__ records in records.py
     
-    prices = None
+    __slots__ = ()
+    
+    @property
+    def prices(self):
+        if self.price_store is None:
+            return None
+        return self.price_store.to_series()
+    
+    @prices.setter
+    def prices(self, prices: pd.Series):
+        if prices is not None and self.price_store is not None and self.price_store.persistent:
+            self.price_store.reset(prices)
+        else:
+            self.price_store = None if prices is None else PriceStore.from_series(prices)
+
+
+class Asset(PricedMixin):
+    
+    price_store = None
     updated_at = None
     asset_id = None
 
     
 class AssetMethods():
     
+    __slots__ = ('asset',)
+    
     def __init__(self, asset: Asset):
         self.asset = asset
     
@@ -19,6 +41,11 @@ class AssetMethods():
         self.asset.asset_id = asset_id
         self.asset.updated_at = pd.to_datetime('today')
         
+    def set_price_store(self, store: PriceStore):
+        # e.g. an MmapPriceStore, later set_price_history/update_price calls write through to it
+        self.asset.price_store = store
+        self.asset.updated_at = pd.to_datetime('today')
+        
     def set_price_history(self, prices: pd.Series):
         assert isinstance(prices.index, pd.DatetimeIndex), DT_SERIES_ERROR
         self.asset.prices = prices
@@ -26,5 +53,8 @@ class AssetMethods():
 
     def update_price(self, prices: pd.Series):
         assert isinstance(prices.index, pd.DatetimeIndex), DT_SERIES_ERROR
-        self.asset.prices = prices.combine_first(self.asset.prices)
+        if self.asset.price_store is None:
+            self.asset.prices = prices
+        else:
+            self.asset.price_store.update(prices)
         self.asset.updated_at = pd.to_datetime('today')
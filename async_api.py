@@ -0,0 +1,85 @@
+import asyncio
+import inspect
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from io import StringIO
+
+import pandas as pd
+
+from asset import AssetMethods
+
+
+def csv_source(path: str, **kwargs):
+    # blocking loader for a two column (date, value) csv file, read on the executor
+    def load():
+        return pd.read_csv(path, index_col=0, parse_dates=True, **kwargs).iloc[:, 0]
+    return load
+
+
+def stream_source(reader: asyncio.StreamReader):
+    # loader reading the same csv layout from a socket/pipe until EOF
+    async def load():
+        data = await reader.read()
+        return pd.read_csv(StringIO(data.decode()), index_col=0, parse_dates=True).iloc[:, 0]
+    return load
+
+
+class AsyncPricing:
+    # asyncio front-end over AssetMethods/BillMethods: price sources are loaded concurrently and
+    # the blocking set_price_history/calc_ytm/calc_discount calls run on `executor` (the loop's
+    # default thread pool if None), so the event loop stays free to serve requests meanwhile.
+    # At most max_concurrency loads/recalculations are in flight at any time.
+    #
+    # A source is a callable returning a pd.Series: a coroutine function is awaited on the loop,
+    # a plain function (e.g. csv_source) runs on the executor.
+
+    def __init__(self, executor: Executor = None, max_concurrency: int = 8):
+        # thread executors only: the calls update the instruments in place, in a process pool they
+        # would update pickled copies and the results would be lost (see batch.run_analytics for that)
+        assert not isinstance(executor, ProcessPoolExecutor), "executor must be a thread executor"
+        assert max_concurrency > 0, "max_concurrency must be positive"
+        self.executor = executor
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def fetch(self, source):
+        if inspect.iscoroutinefunction(source):
+            return await source()
+        return await self.run(source)
+
+    async def load(self, methods: AssetMethods, source):
+        # bills take discounts, plain assets take prices, as with set_price_history
+        async with self.semaphore:
+            prices = await self.fetch(source)
+            await self.run(methods.set_price_history, prices)
+        return methods
+
+    async def recalc(self, methods, precision: int = 6):
+        async with self.semaphore:
+            await self.run(self._recalc, methods, precision)
+        return methods
+
+    async def refresh(self, methods, source, precision: int = 6):
+        await self.load(methods, source)
+        return await self.recalc(methods, precision)
+
+    async def load_all(self, sources):
+        # sources: iterable of (methods, source) pairs
+        return await asyncio.gather(*(self.load(methods, source) for methods, source in sources))
+
+    async def recalc_all(self, methods, precision: int = 6):
+        return await asyncio.gather(*(self.recalc(m, precision) for m in methods))
+
+    async def refresh_all(self, sources, precision: int = 6):
+        # each instrument is recalculated as soon as its own source is loaded
+        return await asyncio.gather(*(self.refresh(methods, source, precision) for methods, source in sources))
+
+    @staticmethod
+    def _recalc(methods, precision):
+        methods.calc_ytm()
+        # coupon debt (CashFlowMethods) has a ytm but no discount
+        if hasattr(methods, 'calc_discount'):
+            methods.calc_discount(precision=precision)
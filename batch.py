@@ -0,0 +1,132 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from bill import Bill, BillMethods
+from conventions import to_datetime64
+
+
+class SharedArrays:
+    # named columns in one shared memory block, so worker processes attach to the
+    # price arrays instead of receiving pickled Series/DataFrames
+
+    def __init__(self, layout, name=None):
+        self.layout = layout
+        nbytes = sum(np.dtype(dtype).itemsize * size for _, dtype, size in layout)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=max(nbytes, 1))
+        self.arrays = {}
+        offset = 0
+        for key, dtype, size in layout:
+            self.arrays[key] = np.ndarray((size,), dtype=dtype, buffer=self.shm.buf, offset=offset)
+            offset += np.dtype(dtype).itemsize * size
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self, unlink=False):
+        self.arrays = {}
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def run_chunk(shm_name, layout, start, end, lengths, conventions, inception, convention_maturity, maturity,
+              precision):
+    # worker side: rows [start, end) of the shared columns belong to consecutive bills with `lengths` rows each
+    shared = SharedArrays(layout, name=shm_name)
+    try:
+        dates = shared['dates'][start:end]
+        prices = shared['prices'][start:end]
+        ytm = shared['ytm'][start:end]
+        discounts = shared['discounts'][start:end]
+
+        classes = list(dict.fromkeys(conventions))
+        kinds = np.repeat([classes.index(convention) for convention in conventions], lengths)
+        inception = np.repeat(inception, lengths)
+        convention_maturity = np.repeat(convention_maturity, lengths)
+        maturity = np.repeat(maturity, lengths)
+
+        for kind, convention in enumerate(classes):
+            rows = kinds == kind
+            day_count = convention(inception=inception[rows], maturity=convention_maturity[rows])
+            ytm_tenor = day_count.year_frac_ytm_array(dates[rows], maturity[rows])
+            price_tenor = day_count.year_frac_price_array(dates[rows], maturity[rows])
+
+            ytm[rows] = (100 / prices[rows] - 1) / ytm_tenor
+            discounts[rows] = np.round((100 - prices[rows]) / price_tenor, precision)
+    finally:
+        shared.close()
+    return start, end
+
+
+def run_analytics(dates, prices, lengths, conventions, inception, convention_maturity, maturity,
+                  max_workers: int = None, chunk_size: int = 256, precision: int = 6):
+    # serialized form: dates/prices are the concatenated histories of all bills, lengths[i] rows
+    # belong to bill i; conventions/inception/convention_maturity/maturity hold one entry per bill
+    lengths = np.asarray(lengths, dtype=np.int64)
+    assert lengths.sum() == len(dates) == len(prices), "lengths must add up to the number of price rows"
+    assert chunk_size > 0, "chunk size must be positive"
+    inception = to_datetime64(inception)
+    convention_maturity = to_datetime64(convention_maturity)
+    maturity = to_datetime64(maturity)
+
+    rows = int(lengths.sum())
+    layout = [('dates', 'datetime64[ns]', rows), ('prices', np.float64, rows),
+              ('ytm', np.float64, rows), ('discounts', np.float64, rows)]
+    shared = SharedArrays(layout)
+    try:
+        shared['dates'][:] = to_datetime64(dates)
+        shared['prices'][:] = prices
+
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for first in range(0, lengths.shape[0], chunk_size):
+                bills = slice(first, first + chunk_size)
+                last = min(first + chunk_size, lengths.shape[0])
+                futures.append(executor.submit(run_chunk, shared.name, layout, offsets[first], offsets[last],
+                                               lengths[bills], conventions[bills], inception[bills],
+                                               convention_maturity[bills], maturity[bills], precision))
+            for future in futures:
+                future.result()
+
+        return shared['ytm'].copy(), shared['discounts'].copy()
+    finally:
+        shared.close(unlink=True)
+
+
+def run_bill_analytics(bills: Iterable[Bill], max_workers: int = None, chunk_size: int = 256, precision: int = 6):
+    # parallel calc_ytm + calc_discount over many bills, results are set on the Bill objects
+    bills = [bill for bill in bills if bill.prices is not None]
+    histories = [bill.prices for bill in bills]
+    lengths = [prices.shape[0] for prices in histories]
+    if not bills:
+        return bills
+
+    dates = np.concatenate([to_datetime64(prices.index) for prices in histories])
+    prices = np.concatenate([prices.to_numpy(dtype=np.float64) for prices in histories])
+    ytm, discounts = run_analytics(dates, prices, lengths,
+                                   conventions=[type(bill.convention) for bill in bills],
+                                   inception=[bill.convention.inception for bill in bills],
+                                   convention_maturity=[bill.convention.maturity for bill in bills],
+                                   maturity=[bill.maturity for bill in bills],
+                                   max_workers=max_workers, chunk_size=chunk_size, precision=precision)
+
+    start = 0
+    for bill, history, length in zip(bills, histories, lengths):
+        rows = slice(start, start + length)
+        bill.historic_ytm = pd.Series(ytm[rows], index=history.index, name='ytm')
+        bill.discounts = pd.Series(discounts[rows], index=history.index, name='discount')
+        # keeps the incremental calc_ytm/calc_discount bookkeeping in line with a serial run
+        methods = BillMethods(bill)
+        bill.price_store.mark_clean('ytm', methods.splice_tag())
+        bill.price_store.mark_clean('discount', methods.splice_tag(precision))
+        start += length
+    return bills
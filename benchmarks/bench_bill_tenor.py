@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_series_equal
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from universe import make_bill
+
+
+# row-wise implementations that BillMethods used before the batched tenor path
+def legacy_calc_ytm(bill):
+    df = bill.prices.to_frame(name='price')
+    df['date'] = df.index
+    df['maturity'] = bill.maturity
+    df['tenor'] = df[['date', 'maturity']]\
+                  .apply(lambda row: bill.convention.year_frac_ytm(row['date'], row['maturity']), axis=1)
+    df['ytm'] = (100 / df['price'] - 1) / df['tenor']
+    return df['ytm']
+
+
+def legacy_calc_discount(bill, precision=6):
+    df = bill.prices.to_frame(name='price')
+    df['date'] = df.index
+    df['maturity'] = bill.maturity
+    df['tenor'] = df[['date', 'maturity']]\
+                  .apply(lambda row: bill.convention.year_frac_price(row['date'], row['maturity']), axis=1)
+    df['discount'] = np.round((100 - df['price']) / df['tenor'], precision)
+    return df['discount']
+
+
+def legacy_calc_price(bill, discounts, precision=6):
+    df = discounts.to_frame(name='discount')
+    df['date'] = df.index
+    df['maturity'] = bill.maturity
+    df['tenor'] = df[['date', 'maturity']]\
+                  .apply(lambda row: bill.convention.year_frac_price(row['date'], row['maturity']), axis=1)
+    df['price'] = 100 - np.round(df['discount'] * df['tenor'], precision)
+    return df['price']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Row-wise apply vs batched tenor in BillMethods')
+    parser.add_argument('--years', type=float, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    bill, methods, discounts = make_bill(args.years)
+    cases = [('calc_ytm', lambda: legacy_calc_ytm(bill),
+              lambda: methods.calc_ytm(return_series=True, incremental=False)),
+             ('calc_discount', lambda: legacy_calc_discount(bill),
+              lambda: methods.calc_discount(return_series=True, incremental=False)),
+             ('calc_price', lambda: legacy_calc_price(bill, discounts),
+              lambda: methods.calc_price(discounts))]
+    
+    print(f"{bill.prices.shape[0]} daily prices ({args.years:g} years)")
+    for name, legacy, batched in cases:
+        assert_series_equal(batched(), legacy(), check_exact=True)
+        legacy_time = min(timeit.repeat(legacy, number=1, repeat=args.repeat))
+        batched_time = min(timeit.repeat(batched, number=1, repeat=args.repeat))
+        print(f"{name:<14} apply {legacy_time * 1e3:9.2f} ms   batched {batched_time * 1e3:7.2f} ms"
+              f"   speed-up {legacy_time / batched_time:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from bill import Bill, BillMethods
+from bill_book import BillBook, BillBookMethods
+from records import BillRecord
+
+
+def build(factory, count, keep_methods, full):
+    inception, maturity = pd.Timestamp('2023-01-05'), pd.Timestamp('2024-01-04')
+    instruments, wrappers = [], []
+    for i in range(count):
+        bill = factory()
+        methods = BillMethods(bill)
+        if full:
+            methods.set_attributes(isin=f'SYN{i:09d}', inception=inception, maturity=maturity, face_value=100)
+        else:
+            # scalar fields only, isolates the per-object overhead from the pandas payload
+            bill.isin, bill.inception, bill.maturity, bill.face_value = f'SYN{i:09d}', inception, maturity, 100
+            bill.min_piece = bill.increment = 100
+        instruments.append(bill)
+        if keep_methods:
+            wrappers.append(methods)
+    return instruments, wrappers
+
+
+def build_book(count):
+    book = BillBook()
+    BillBookMethods(book).set_attributes(isin=[f'SYN{i:09d}' for i in range(count)],
+                                         inception=pd.Timestamp('2023-01-05'), maturity=pd.Timestamp('2024-01-04'))
+    return book
+
+
+def measure(factory, count, keep_methods, full):
+    gc.collect()
+    tracemalloc.start()
+    objects = build(factory, count, keep_methods, full) if factory is not BillBook else build_book(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory of Bill + BillMethods vs BillRecord per instrument')
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    cases = [('Bill + kept BillMethods', Bill, True),
+             ('Bill', Bill, False),
+             ('BillRecord (__slots__)', BillRecord, False),
+             ('BillBook columns', BillBook, False)]
+    for full in (False, True):
+        print('set_attributes (with pmt_schedule Series, convention)' if full else 'scalar fields only')
+        baseline = None
+        for name, factory, keep_methods in cases:
+            size = measure(factory, args.count, keep_methods, full)
+            baseline = baseline or size
+            print(f"  {name:<26} {size / 2 ** 20:9.1f} MB  {size / args.count:8.0f} B/instrument"
+                  f"  {size / baseline:6.2f}x")
+
+if __name__ == '__main__':
+    main()
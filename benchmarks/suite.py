@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from universe import make_bill, make_universe, START
+from asset import Asset, AssetMethods
+from conventions import ACT_360
+
+
+# Benchmarks the pricing/convention hot paths against synthetic universes and writes one JSON
+# record per (case, size). Compare two result files with --compare to spot regressions:
+#
+#   python benchmarks/suite.py --output base.json
+#   python benchmarks/suite.py --output head.json --compare base.json
+
+INSTRUMENTS = [1, 100, 1000, 10000]
+YEARS = [1, 5, 10, 30]
+
+
+def measure(func, rows, repeat):
+    func()  # warm-up, also fills caches the way a long-running process would
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = np.array(times)
+    return {'rows': rows,
+            'repeat': repeat,
+            'p50_ms': float(np.percentile(times, 50) * 1e3),
+            'p90_ms': float(np.percentile(times, 90) * 1e3),
+            'p99_ms': float(np.percentile(times, 99) * 1e3),
+            'rows_per_sec': float(rows / np.median(times)) if np.median(times) > 0 else None,
+            'peak_mb': peak / 2 ** 20}
+
+
+def history_cases(years):
+    bill, methods, discounts = make_bill(years)
+    dates = discounts.index
+    day_count = ACT_360()
+    rows = dates.shape[0]
+
+    def stream_prices():
+        # end-of-day prices appended one by one onto an empty history
+        asset = Asset()
+        asset_methods = AssetMethods(asset)
+        for i in range(rows):
+            asset_methods.update_price(discounts.iloc[i:i + 1])
+
+    yield 'bill.calc_ytm', rows, lambda: methods.calc_ytm(incremental=False)
+    yield 'bill.calc_discount', rows, lambda: methods.calc_discount(incremental=False)
+    yield 'bill.calc_price', rows, lambda: methods.calc_price(discounts)
+    yield 'act_360.numerator', rows, lambda: [day_count.numerator(date, bill.maturity) for date in dates]
+    yield 'act_360.numerator_array', rows, lambda: day_count.numerator_array(dates, bill.maturity)
+    yield 'asset.update_price', rows, stream_prices
+
+
+def universe_cases(instruments):
+    book, methods, discounts = make_universe(instruments)
+    rows = discounts.shape[0]
+
+    yield 'bill_book.calc_ytm', rows, lambda: methods.calc_ytm()
+    yield 'bill_book.calc_discount', rows, lambda: methods.calc_discount()
+    yield 'bill_book.calc_price', rows, lambda: methods.calc_price(discounts)
+
+
+def git_commit():
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['case'], r['param'], r['size']): r for r in json.load(f)['results']}
+    print(f"\n{'case':<26}{'size':>8}{'base p50':>12}{'head p50':>12}{'ratio':>8}")
+    for r in results:
+        base = baseline.get((r['case'], r['param'], r['size']))
+        if base is None:
+            continue
+        ratio = r['p50_ms'] / base['p50_ms'] if base['p50_ms'] else float('nan')
+        flag = '  <-- slower' if ratio > 1.2 else ''
+        print(f"{r['case']:<26}{r['size']:>8}{base['p50_ms']:>12.3f}{r['p50_ms']:>12.3f}{ratio:>8.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hot-path benchmarks for portfolio_accounting')
+    parser.add_argument('--years', type=float, nargs='+', default=YEARS, help='history lengths in years')
+    parser.add_argument('--instruments', type=int, nargs='+', default=INSTRUMENTS, help='bill universe sizes')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='small sizes only, for a smoke run')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='earlier result file to compare against')
+    args = parser.parse_args()
+    if args.quick:
+        args.years, args.instruments, args.repeat = [1], [1, 100], 3
+
+    runs = [('years', years, history_cases(years)) for years in args.years] + \
+           [('instruments', instruments, universe_cases(instruments)) for instruments in args.instruments]
+
+    results = []
+    print(f"{'case':<26}{'size':>8}{'rows':>10}{'p50 ms':>10}{'p99 ms':>10}{'rows/s':>14}{'peak MB':>10}")
+    for param, size, cases in runs:
+        for case, rows, func in cases:
+            result = {'case': case, 'param': param, 'size': size, **measure(func, rows, args.repeat)}
+            results.append(result)
+            print(f"{case:<26}{size:>8g}{rows:>10}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                  f"{result['rows_per_sec'] or 0:>14,.0f}{result['peak_mb']:>10.2f}")
+
+    report = {'commit': git_commit(),
+              'timestamp': pd.Timestamp.now().isoformat(),
+              'python': platform.python_version(),
+              'numpy': np.__version__,
+              'pandas': pd.__version__,
+              'machine': platform.machine(),
+              'start': str(START.date()),
+              'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
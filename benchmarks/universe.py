@@ -0,0 +1,58 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from bill import Bill, BillMethods
+from bill_book import BillBook, BillBookMethods
+
+
+# synthetic bill universes shared by the benchmark scripts; everything is seeded so that
+# two runs (or two commits) price exactly the same instruments
+
+START = pd.Timestamp('2000-01-03')
+TENORS = np.array([28, 91, 182, 364])
+
+
+def daily_discounts(dates, rng):
+    # random walk around 3% kept inside (0.05, 8)
+    steps = rng.normal(0, 0.02, dates.shape[0]).cumsum()
+    return pd.Series(np.clip(3 + steps, 0.05, 8), index=dates, name='discount')
+
+
+def make_bill(years: float, seed: int = 0, isin: str = 'SYN000000000'):
+    # one long-dated bill with `years` of daily prices, for history-length scaling
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(START, periods=max(int(365.25 * years), 1), freq='D')
+    maturity = dates[-1] + pd.Timedelta(days=1)
+
+    bill = Bill()
+    methods = BillMethods(bill)
+    methods.set_attributes(isin=isin, inception=dates[0], maturity=maturity, face_value=100)
+    discounts = daily_discounts(dates, rng)
+    methods.set_price_history(discounts)
+    return bill, methods, discounts
+
+
+def make_universe(instruments: int, days: int = 252, seed: int = 0):
+    # `instruments` bills with staggered inceptions and the usual T-bill tenors, each quoted
+    # daily over the last `days` calendar days before maturity (or its whole life if shorter)
+    rng = np.random.default_rng(seed)
+    inception = START + pd.to_timedelta(rng.integers(0, 3650, instruments), unit='D')
+    tenor = rng.choice(TENORS, instruments)
+    maturity = inception + pd.to_timedelta(tenor, unit='D')
+    isin = np.array([f'SYN{i:09d}' for i in range(instruments)], dtype=object)
+
+    book = BillBook()
+    methods = BillBookMethods(book)
+    methods.set_attributes(isin=isin, inception=inception, maturity=maturity, face_value=100)
+
+    quotes = np.minimum(tenor, days)
+    dates = np.repeat(maturity.values, quotes) - pd.to_timedelta(
+        np.concatenate([np.arange(q, 0, -1) for q in quotes]), unit='D').values
+    index = pd.MultiIndex.from_arrays([pd.DatetimeIndex(dates), np.repeat(isin, quotes)], names=['date', 'isin'])
+    discounts = pd.Series(np.clip(3 + rng.normal(0, 0.5, index.shape[0]), 0.05, 8), index=index, name='discount')
+    methods.set_price_history(discounts)
+    return book, methods, discounts
@@ -6,6 +6,7 @@ import pandas as pd
 
 from debt import Debt, DebtMethods
 from constants import DT_SERIES_ERROR
+from conventions import date_key
 
 
 class Bill(Debt):
@@ -19,6 +20,8 @@ class Bill(Debt):
 
 class BillMethods(DebtMethods):
     
+    __slots__ = ('bill',)
+    
     def __init__(self, bill: Bill):
         self.bill = bill
         super().__init__(self.bill)
@@ -35,50 +38,80 @@ class BillMethods(DebtMethods):
             
         super().set_attributes(**kwargs)
     
-    def calc_ytm(self, return_series=False):
+    def calc_tenor(self, dates: pd.DatetimeIndex, basis: str = 'ytm'):
+        assert basis in ('ytm', 'price'), "basis must be 'ytm' or 'price'"
+        if basis == 'ytm':
+            return self.bill.convention.year_frac_ytm_array(dates, self.bill.maturity)
+        return self.bill.convention.year_frac_price_array(dates, self.bill.maturity)
+    
+    def splice_tag(self, tag=None):
+        # the price store tag of a calc_* result: every row depends on the maturity and the
+        # convention, so assigning either directly forces a full recompute too
+        convention = self.bill.convention
+        return (tag, date_key(self.bill.maturity), type(convention),
+                date_key(getattr(convention, 'inception', None)), date_key(getattr(convention, 'maturity', None)))
+    
+    def _splice(self, previous, prices, key, tag, calc):
+        # recomputes only the rows whose prices changed since the last calculation
+        store = self.bill.price_store
+        tag = self.splice_tag(tag)
+        dirty = store.dirty_dates(key, tag)
+        if previous is None or dirty is None:
+            result = calc(prices)
+        else:
+            result = previous.reindex(prices.index)
+            if dirty.shape[0]:
+                rows = prices.index.get_indexer(dirty)
+                result.iloc[rows] = calc(prices.iloc[rows]).values
+        store.mark_clean(key, tag)
+        return result
+    
+    def calc_ytm(self, return_series=False, incremental=True):
         
         assert self.bill.prices is not None
-        df = self.bill.prices.to_frame(name='price')
-        
-        df['date'] = df.index
-        df['maturity'] = self.bill.maturity
-        df['tenor'] = df[['date', 'maturity']]\
-                      .apply(lambda row: self.bill.convention.year_frac_ytm(\
-                      row['date'], row['maturity']), axis=1)
         
-        df['ytm'] = (100 / df['price'] - 1) / df['tenor']
+        def calc(prices):
+            tenor = self.calc_tenor(prices.index)
+            return ((100 / prices - 1) / tenor).rename('ytm')
         
-        self.bill.historic_ytm = df['ytm']
+        previous = self.bill.historic_ytm if incremental else None
+        self.bill.historic_ytm = self._splice(previous, self.bill.prices, 'ytm', None, calc)
         if return_series:
             return self.bill.historic_ytm
         
-    def calc_discount(self, return_series=False, precision=6):
+    def calc_discount(self, return_series=False, precision=6, incremental=True):
         assert self.bill.prices is not None
         
-        df = self.bill.prices.to_frame(name='price')
-        df['date'] = df.index
-        df['maturity'] = self.bill.maturity
-        df['tenor'] = df[['date', 'maturity']]\
-                      .apply(lambda row: self.bill.convention.year_frac_price(\
-                      row['date'], row['maturity']), axis=1)
-        df['discount'] = np.round((100 - df['price']) / df['tenor'], precision)
+        def calc(prices):
+            tenor = self.calc_tenor(prices.index, basis='price')
+            return np.round((100 - prices) / tenor, precision).rename('discount')
         
-        self.bill.discounts = df['discount']
+        previous = self.bill.discounts if incremental else None
+        self.bill.discounts = self._splice(previous, self.bill.prices, 'discount', precision, calc)
         if return_series:
             return self.bill.discounts
+    
+    def yield_terms(self, prices: pd.Series):
+        # the bill as a single flow of 100 at maturity under simple interest, the same shape
+        # CashFlowMethods.yield_terms gives coupon debt for solvers.solve_ytm
+        tenor = self.calc_tenor(prices.index)[:, None]
+        return prices.to_numpy(dtype=float), tenor, np.full(tenor.shape, 100.), 0
+    
+    def calc_latest(self, precision=6):
+        # price, ytm and discount for the most recent date only, the history is left untouched
+        store = self.bill.price_store
+        assert store is not None and len(store) > 0
         
-    def calc_price(self, discounts, precision=6):
+        date, price = store.dates[-1:], store.values[-1]
+        ytm = (100 / price - 1) / self.calc_tenor(date)[0]
+        discount = np.round((100 - price) / self.calc_tenor(date, basis='price')[0], precision)
+        return pd.Series({'price': price, 'ytm': ytm, 'discount': discount}, name=pd.Timestamp(date[0]))
         
-        df = discounts.to_frame(name='discount')
+    def calc_price(self, discounts, precision=6):
         
-        df['date'] = df.index
-        df['maturity'] = self.bill.maturity
-        df['tenor'] = df[['date', 'maturity']]\
-                      .apply(lambda row: self.bill.convention.year_frac_price(\
-                      row['date'], row['maturity']), axis=1)
-        df['price'] = 100 - np.round(df['discount'] * df['tenor'], precision)
+        tenor = self.calc_tenor(discounts.index, basis='price')
         
-        return df['price']
+        return (100 - np.round(discounts * tenor, precision)).rename('price')
     
     def set_price_history(self, discounts: pd.Series):
         assert isinstance(discounts.index, pd.DatetimeIndex), DT_SERIES_ERROR
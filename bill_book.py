@@ -0,0 +1,135 @@
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+from bill import Bill
+from constants import DT_SERIES_ERROR, PANEL_INDEX_ERROR
+from conventions import DayCount, ACT_360, get_convention, to_datetime64
+
+
+PANEL_INDEX = ['date', 'isin']
+
+
+class BillBook:
+
+    isin = None
+    inception = None
+    maturity = None
+    face_value = None
+    min_piece = None
+    increment = None
+    convention = None
+    prices = None
+    discounts = None
+    historic_ytm = None
+
+
+class BillBookMethods:
+
+    def __init__(self, book: BillBook):
+        self.book = book
+
+    def set_attributes(self, isin, inception, maturity, face_value=100, min_piece=100, increment=100,
+                       convention: Union[DayCount, str] = ACT_360):
+
+        isin = np.asarray(isin, dtype=object)
+        assert isin.ndim == 1, "isin must be a 1-d array"
+        assert pd.Index(isin).is_unique, "ISINs in a bill book must be unique"
+        size = isin.shape[0]
+
+        inception = np.broadcast_to(to_datetime64(pd.to_datetime(inception)), size).copy()
+        maturity = np.broadcast_to(to_datetime64(pd.to_datetime(maturity)), size).copy()
+        assert (maturity >= inception).all(), "Maturity date is before inception date!"
+
+        face_value = np.broadcast_to(np.asarray(face_value, dtype=float), size).copy()
+        assert (face_value > 0).all(), "Face value cannot be 0 or negative!"
+
+        self.book.isin = isin
+        self.book.inception = inception
+        self.book.maturity = maturity
+        self.book.face_value = face_value
+        self.book.min_piece = np.broadcast_to(np.asarray(min_piece, dtype=np.int64), size).copy()
+        self.book.increment = np.broadcast_to(np.asarray(increment, dtype=np.int64), size).copy()
+        self.book.convention = get_convention(convention)
+
+    def add_bills(self, bills: Iterable[Bill]):
+        # builds the columns from per-ISIN Bill objects and stacks their price histories
+        bills = list(bills)
+        # the book prices every row with one convention
+        conventions = {type(bill.convention) for bill in bills}
+        assert len(conventions) <= 1, "bills in a bill book must share one day count convention"
+        self.set_attributes(isin=[bill.isin for bill in bills],
+                            inception=[bill.inception for bill in bills],
+                            maturity=[bill.maturity for bill in bills],
+                            face_value=[bill.face_value for bill in bills],
+                            min_piece=[bill.min_piece for bill in bills],
+                            increment=[bill.increment for bill in bills],
+                            convention=type(bills[0].convention) if bills else ACT_360)
+
+        histories = {bill.isin: bill.prices for bill in bills if bill.prices is not None}
+        if histories:
+            prices = pd.concat(histories, names=['isin', 'date']).swaplevel().rename('price')
+            self.book.prices = prices
+
+    def positions(self, index: pd.MultiIndex):
+        # row -> bill position, resolved once per distinct ISIN rather than per row
+        assert isinstance(index, pd.MultiIndex) and list(index.names) == PANEL_INDEX, PANEL_INDEX_ERROR
+        index = index.remove_unused_levels()
+        positions = pd.Index(self.book.isin).get_indexer(index.levels[1])
+        assert (positions >= 0).all(), "unknown ISIN in price panel"
+        return positions[index.codes[1]]
+
+    def calc_tenor(self, index: pd.MultiIndex, basis: str = 'ytm'):
+        assert basis in ('ytm', 'price'), "basis must be 'ytm' or 'price'"
+        positions = self.positions(index)
+        dates = index.get_level_values('date')
+        assert isinstance(dates, pd.DatetimeIndex), DT_SERIES_ERROR
+        maturity = self.book.maturity[positions]
+
+        convention = self.book.convention(inception=self.book.inception[positions], maturity=maturity)
+        if basis == 'ytm':
+            return convention.year_frac_ytm_array(dates, maturity)
+        return convention.year_frac_price_array(dates, maturity)
+
+    def calc_ytm(self, return_series=False):
+
+        assert self.book.prices is not None
+        prices = self.book.prices
+        tenor = self.calc_tenor(prices.index)
+
+        self.book.historic_ytm = ((100 / prices - 1) / tenor).rename('ytm')
+        if return_series:
+            return self.book.historic_ytm
+
+    def calc_discount(self, return_series=False, precision=6):
+        assert self.book.prices is not None
+
+        prices = self.book.prices
+        tenor = self.calc_tenor(prices.index, basis='price')
+
+        self.book.discounts = np.round((100 - prices) / tenor, precision).rename('discount')
+        if return_series:
+            return self.book.discounts
+
+    def calc_price(self, discounts, precision=6):
+
+        tenor = self.calc_tenor(discounts.index, basis='price')
+
+        return (100 - np.round(discounts * tenor, precision)).rename('price')
+
+    def check_prices(self, prices: pd.Series):
+        positions = self.positions(prices.index)
+        dates = to_datetime64(prices.index.get_level_values('date'))
+        assert (dates >= self.book.inception[positions]).all(), "prices start before inception"
+        assert (dates <= self.book.maturity[positions]).all(), "prices end after maturity"
+
+    def set_price_history(self, discounts: pd.Series):
+        prices = self.calc_price(discounts)
+        self.check_prices(prices)
+        self.book.prices = prices
+
+    def update_price(self, discounts: pd.Series):
+        prices = self.calc_price(discounts)
+        self.check_prices(prices)
+        self.book.prices = prices.combine_first(self.book.prices)
@@ -0,0 +1,127 @@
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from conventions import DayCount, get_convention, to_datetime64
+
+
+ROLLS = {'following': 'following', 'preceding': 'preceding', 'modified_following': 'modifiedfollowing',
+         'modified_preceding': 'modifiedpreceding'}
+ROLL_ERROR = f"roll must be 'unadjusted' or one of {list(ROLLS)}"
+
+
+class BusinessCalendar:
+    # business days = weekmask days that are not holidays. The holidays are one sorted array of
+    # day ordinals and the np.busdaycalendar over them is built once, so every lookup is a binary
+    # search and all instruments using the calendar share the same arrays.
+
+    def __init__(self, holidays=(), weekmask: str = '1111100', name: str = None):
+        holidays = np.unique(np.asarray(to_datetime64(pd.to_datetime(holidays)), dtype='datetime64[D]'))
+        self.holidays = holidays
+        self.weekmask = weekmask
+        self.name = name
+        self.busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=holidays)
+
+    @classmethod
+    def from_file(cls, path: str, weekmask: str = '1111100', name: str = None):
+        # one date per line (first column of a csv), lines starting with '#' are comments
+        dates = pd.read_csv(path, header=None, comment='#', usecols=[0]).iloc[:, 0]
+        return cls(pd.to_datetime(dates.str.strip()), weekmask=weekmask, name=name)
+
+    def __repr__(self):
+        return f'BusinessCalendar(name={self.name!r}, holidays={self.holidays.shape[0]}, weekmask={self.weekmask!r})'
+
+    @staticmethod
+    def days(dates):
+        return np.asarray(to_datetime64(dates), dtype='datetime64[D]')
+
+    def is_holiday(self, dates):
+        days = self.days(dates)
+        positions = np.searchsorted(self.holidays, days)
+        found = positions < self.holidays.shape[0]
+        found[found] = self.holidays[positions[found]] == days[found]
+        return found
+
+    def is_business_day(self, dates):
+        return np.is_busday(self.days(dates), busdaycal=self.busdaycal)
+
+    def adjust(self, dates, roll: str = 'following'):
+        if roll == 'unadjusted':
+            return self.days(dates)
+        assert roll in ROLLS, ROLL_ERROR
+        return np.busday_offset(self.days(dates), 0, roll=ROLLS[roll], busdaycal=self.busdaycal)
+
+    def add_business_days(self, dates, days):
+        # dates that are not business days are rolled forward first
+        return np.busday_offset(self.days(dates), days, roll='following', busdaycal=self.busdaycal)
+
+    def settlement(self, trade_dates, lag: int = 2):
+        return self.add_business_days(trade_dates, lag)
+
+    def business_days_between(self, start_dates, end_dates):
+        # business days in [start, end)
+        return np.busday_count(self.days(start_dates), self.days(end_dates), busdaycal=self.busdaycal)
+
+    def schedule(self, inception, maturity, frequency: int = 1, roll: str = 'modified_following'):
+        # payment dates every 12 / frequency months counted back from maturity (short first period),
+        # day of month clamped to month end, then rolled; dates rolled past maturity roll back instead
+        assert 12 % frequency == 0, "frequency must divide 12"
+        inception, maturity = self.days(pd.Timestamp(inception)), self.days(pd.Timestamp(maturity))
+        assert maturity > inception, "Maturity date is before inception date!"
+        step = 12 // frequency
+        month = maturity.astype('datetime64[M]')
+        day = maturity - month.astype('datetime64[D]')
+
+        periods = (month - inception.astype('datetime64[M]')).astype(np.int64) // step + 1
+        months = month - np.arange(periods, -1, -1) * step
+        month_length = (months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')
+        dates = months.astype('datetime64[D]') + np.minimum(day, month_length - 1)
+        dates = dates[dates > inception]
+
+        adjusted = self.adjust(dates, roll)
+        late = adjusted > maturity
+        if late.any():
+            adjusted[late] = self.adjust(dates[late], 'preceding')
+        # a roll back (preceding, or modified at a month end) must not reach the inception date
+        assert (adjusted > inception).all(), "a payment date rolls to or before the inception date"
+        return pd.DatetimeIndex(to_datetime64(adjusted))
+
+    def payment_schedule(self, inception, maturity, rate, face_value, frequency: int = 1,
+                         roll: str = 'modified_following', convention: Union[DayCount, str] = None):
+        # DataFrame['interest', 'principal'] for Debt.pmt_schedule. rate is a float or a StepRate
+        # (the rate in force at the start of each period applies). Coupons are face * rate /
+        # frequency, or accrue over each adjusted period with `convention` (a class or a CONVENTIONS
+        # name) when one is given.
+        dates = self.schedule(inception, maturity, frequency, roll)
+        starts = to_datetime64(dates[:-1].insert(0, pd.Timestamp(inception)))
+        rates = rate.lookup(starts) if hasattr(rate, 'lookup') else np.full(dates.shape[0], float(rate))
+        if convention is None:
+            interest = face_value * rates / frequency
+        else:
+            interest = face_value * rates * get_convention(convention)().year_frac_price_array(starts, to_datetime64(dates))
+        principal = np.zeros(dates.shape[0])
+        principal[-1] = face_value
+        return pd.DataFrame({'interest': interest, 'principal': principal}, index=dates)
+
+
+# process-wide calendars by name, every instrument holds a reference to the same object
+CALENDARS = {}
+
+
+def register_calendar(name: str, calendar: BusinessCalendar):
+    calendar.name = name
+    CALENDARS[name] = calendar
+    return calendar
+
+
+def get_calendar(name: str):
+    assert name in CALENDARS, f"unknown calendar {name!r}"
+    return CALENDARS[name]
+
+
+def load_calendar(name: str, path: str, weekmask: str = '1111100'):
+    # reads the file only the first time a name is loaded
+    if name not in CALENDARS:
+        register_calendar(name, BusinessCalendar.from_file(path, weekmask=weekmask))
+    return CALENDARS[name]
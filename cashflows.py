@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from conventions import to_datetime64
+from debt import DebtMethods
+from solvers import YieldSolver, discounted_value
+
+
+class CashFlowMethods(DebtMethods):
+    # prices the pmt_schedule of a coupon Debt for many valuation dates at once. Prices are per
+    # 100 of face value, yields compound `frequency` times a year over the convention's
+    # year_frac_ytm; accrued interest uses year_frac_price over the current coupon period.
+
+    __slots__ = ()
+
+    def cash_flows(self):
+        schedule = self.debt.pmt_schedule
+        assert schedule is not None, "debt has no payment schedule"
+        schedule = schedule.sort_index()
+        if isinstance(schedule, pd.DataFrame):
+            amounts = schedule['interest'] + schedule['principal']
+        else:
+            amounts = schedule
+        return to_datetime64(schedule.index), amounts.to_numpy(dtype=float)
+
+    def coupons(self):
+        schedule = self.debt.pmt_schedule
+        if not isinstance(schedule, pd.DataFrame):
+            return to_datetime64([]), np.empty(0)
+        schedule = schedule[schedule['interest'] != 0].sort_index()
+        return to_datetime64(schedule.index), schedule['interest'].to_numpy(dtype=float)
+
+    def valuation_dates(self, dates=None):
+        if dates is None:
+            assert self.debt.prices is not None
+            dates = self.debt.prices.index
+        return np.atleast_1d(to_datetime64(dates))
+
+    def accrued_interest(self, dates=None):
+        dates = self.valuation_dates(dates)
+        coupon_dates, coupons = self.coupons()
+        accrued = np.zeros(dates.shape)
+        if coupon_dates.shape[0] == 0:
+            return accrued
+
+        following = np.searchsorted(coupon_dates, dates, side='right')
+        running = following < coupon_dates.shape[0]
+        period_end = coupon_dates[following[running]]
+        period_start = np.where(following[running] > 0, coupon_dates[np.maximum(following[running] - 1, 0)],
+                                to_datetime64(self.debt.inception))
+
+        convention = self.debt.convention
+        elapsed = convention.year_frac_price_array(period_start, dates[running])
+        period = convention.year_frac_price_array(period_start, period_end)
+        accrued[running] = coupons[following[running]] * elapsed / period
+        return accrued * 100 / self.debt.face_value
+
+    def discount_terms(self, dates):
+        # (valuation date x cash flow) year fractions and amounts, flows on or before the date are dropped
+        flow_dates, amounts = self.cash_flows()
+        tenor = self.debt.convention.year_frac_ytm_array(dates[:, None], flow_dates[None, :])
+        amounts = np.where(flow_dates[None, :] > dates[:, None], amounts[None, :], 0.) * 100 / self.debt.face_value
+        return tenor, amounts
+
+    def dirty_price(self, yields, dates=None, frequency: int = 1):
+        dates = self.valuation_dates(dates)
+        tenor, amounts = self.discount_terms(dates)
+        yields = np.broadcast_to(np.asarray(yields, dtype=float), dates.shape)
+        return discounted_value(yields, tenor, amounts, frequency)[0]
+
+    def clean_price(self, yields, dates=None, frequency: int = 1):
+        return self.dirty_price(yields, dates, frequency) - self.accrued_interest(dates)
+
+    def yield_terms(self, prices: pd.Series, frequency: int = 1):
+        # solver inputs shared with BillMethods.yield_terms: dirty price targets, (date x flow)
+        # year fractions and amounts, and the compounding frequency
+        dates = self.valuation_dates(prices.index)
+        tenor, amounts = self.discount_terms(dates)
+        dirty = prices.to_numpy(dtype=float) + self.accrued_interest(dates)
+        # nothing left to discount on or after the last payment date
+        dirty = np.where((amounts != 0).any(axis=1), dirty, np.nan)
+        return dirty, tenor, amounts, frequency
+
+    def calc_ytm(self, return_series=False, frequency: int = 1, solver: YieldSolver = None, block: int = 64):
+        # debt.prices are clean prices per 100 of face value; dates are solved `block` at a time,
+        # each block warm-started from the previous block's last yield
+        assert self.debt.prices is not None
+        prices = self.debt.prices
+        solver = YieldSolver(lower=-0.99 * frequency) if solver is None else solver
+        target, tenor, amounts, frequency = self.yield_terms(prices, frequency)
+
+        def price_fn(yields, rows):
+            return discounted_value(yields, tenor[rows], amounts[rows], frequency)
+
+        result = solver.solve(price_fn, target, steps=np.arange(target.shape[0]), block=block)
+
+        self.debt.historic_ytm = pd.Series(result.yields, index=prices.index, name='ytm')
+        if return_series:
+            return self.debt.historic_ytm
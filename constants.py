@@ -1 +1,2 @@
 DT_SERIES_ERROR = "pd.Series index must be pd.DateTimeIndex"
+PANEL_INDEX_ERROR = "price panel index must be a pd.MultiIndex with levels ['date', 'isin']"
@@ -1,12 +1,105 @@
 from abc import ABC, abstractmethod
+from functools import wraps
+from hashlib import blake2b
 
+import numpy as np
 import pandas as pd
 
+from lru import LRUCache
+
+
+ONE_DAY = np.timedelta64(1, 'D')
+
+
+def to_datetime64(dates):
+    # accepts pd.DatetimeIndex, datetime64 arrays, Timestamps/datetimes and None (-> NaT)
+    return np.asarray(dates, dtype='datetime64[ns]')
+
+
+def days_between(start_dates, end_dates):
+    # same flooring as pd.Timedelta.days
+    return (end_dates - start_dates) // ONE_DAY
+
+
+def add_years(dates, years):
+    # vectorized pd.DateOffset(years=...): Feb 29 falls back to Feb 28 in non-leap years
+    days = dates.astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    day_of_month = (days - months).astype(np.int64) + 1
+    
+    target = months + np.asarray(years, dtype=np.int64) * 12
+    month_length = ((target + 1).astype('datetime64[D]') - target.astype('datetime64[D]')).astype(np.int64)
+    shifted = target.astype('datetime64[D]') + (np.minimum(day_of_month, month_length) - 1)
+    
+    return shifted.astype('datetime64[ns]') + (dates - days)
+
+
+def date_key(date):
+    # nanoseconds since the epoch: the cached methods compute on the full timestamp, so the key
+    # keeps the time of day (e.g. Debt's default inception of 'today')
+    if date is None:
+        return None
+    return pd.Timestamp(date).value
+
+
+def block_key(dates):
+    # (shape, digest) of a block of dates: the array methods are keyed on the whole block, not on
+    # every date in it, so hashing the block costs one pass over the int64 nanoseconds
+    if dates is None:
+        return None
+    dates = np.ascontiguousarray(to_datetime64(dates)).view(np.int64)
+    return dates.shape, blake2b(dates, digest_size=16).digest()
+
+
+class DayCountCache(LRUCache):
+    # LRU of day-count results keyed on integer timestamps; the key holds the convention class
+    # and its dates, so one cache can be shared by any number of instruments
+    pass
+
+
+def cached(dated: bool = True):
+    # memoizes a (start_date, end_date) day-count method through self.cache when one is attached;
+    # dated results also depend on the convention's inception/maturity
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, start_date=None, end_date=None):
+            if self.cache is None:
+                return method(self, start_date, end_date)
+            key = (type(self), method.__name__, date_key(start_date), date_key(end_date))
+            if dated:
+                key += (date_key(self.inception), date_key(self.maturity))
+            return self.cache.get(key, lambda: method(self, start_date, end_date))
+        return wrapper
+    return decorator
+
+
+def cached_array(dated: bool = True):
+    # memoizes a (start_dates, end_dates) array method per block, e.g. one bill's price history
+    # against its maturity; every block counts as one entry of the cache's maxsize. Results are
+    # read-only since a hit hands the same array to every caller.
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, start_dates, end_dates):
+            if self.cache is None:
+                return method(self, start_dates, end_dates)
+            key = (type(self), method.__name__, block_key(start_dates), block_key(end_dates))
+            if dated:
+                key += (block_key(self.inception), block_key(self.maturity))
+            
+            def calc():
+                result = method(self, start_dates, end_dates)
+                result.flags.writeable = False
+                return result
+            return self.cache.get(key, calc)
+        return wrapper
+    return decorator
+
 
 class DayCount(ABC):
     
     numerator = None
     denominator = None
+    cache = None
     
     @abstractmethod
     def calc_days(self):
@@ -20,16 +113,29 @@ class DayCount(ABC):
     def year_frac_price(self):
         pass
     
+    def calc_days_array(self, start_dates, end_dates):
+        return days_between(to_datetime64(start_dates), to_datetime64(end_dates))
+    
+    @abstractmethod
+    def year_frac_ytm_array(self, start_dates, end_dates):
+        pass
+    
+    @abstractmethod
+    def year_frac_price_array(self, start_dates, end_dates):
+        pass
+    
     
 class ACT_360(DayCount):
     
-    def __init__(self, inception=None, maturity=None):
+    def __init__(self, inception=None, maturity=None, cache: DayCountCache = None):
         
         self.inception = inception
         self.maturity = maturity
+        self.cache = cache
         
         self.denominator = 360
         
+    @cached()
     def numerator(self, start_date=None, end_date=None):
         if (self.inception is None) or \
            (self.inception is not None and self.maturity is None) or \
@@ -60,9 +166,224 @@ class ACT_360(DayCount):
     def calc_days(self, start_date, end_date):
         return (end_date - start_date).days
     
+    @cached()
     def year_frac_ytm(self, start_date=None, end_date=None):
         return (end_date - start_date).days/self.numerator(start_date, end_date)
     
+    @cached(dated=False)
     def year_frac_price(self, start_date, end_date):
         return (end_date - start_date).days/self.denominator
-        
\ No newline at end of file
+    
+    def numerator_array(self, start_dates, end_dates):
+        start_dates, end_dates = np.broadcast_arrays(to_datetime64(start_dates), to_datetime64(end_dates))
+        inception = to_datetime64(self.inception)
+        maturity = to_datetime64(self.maturity)
+        
+        # same branching as numerator, evaluated element-wise; inception/maturity may be arrays
+        known = ~np.isnat(inception) & ~np.isnat(maturity)
+        inception = np.where(known, inception, np.datetime64(0, 'ns'))
+        maturity = np.where(known, maturity, np.datetime64(0, 'ns'))
+        tenor = days_between(inception, maturity)
+        date_based = ~known | (tenor > 366)
+        
+        tot_years = (days_between(start_dates, end_dates) / 365).astype(np.int64)
+        next_year = days_between(start_dates, add_years(start_dates, 1))
+        later_date = add_years(start_dates, tot_years)
+        leap_years = days_between(start_dates, later_date) % 365
+        multi_year = 365 + leap_years / np.where(tot_years == 0, 1, tot_years)
+        by_dates = np.where(tot_years == 0, np.where(next_year == 366, 366., 365.), multi_year)
+        
+        one_year = add_years(inception, 1)
+        inception_leap = days_between(inception, one_year) == 366
+        by_tenor = np.where(((tenor == 366) & (one_year == maturity)) | ((tenor <= 365) & inception_leap), 366., 365.)
+        
+        return np.where(date_based, by_dates, by_tenor)
+    
+    @cached_array()
+    def year_frac_ytm_array(self, start_dates, end_dates):
+        start_dates, end_dates = to_datetime64(start_dates), to_datetime64(end_dates)
+        return days_between(start_dates, end_dates) / self.numerator_array(start_dates, end_dates)
+    
+    @cached_array(dated=False)
+    def year_frac_price_array(self, start_dates, end_dates):
+        return self.calc_days_array(start_dates, end_dates) / self.denominator
+
+
+def date_parts(dates):
+    # calendar days and their year, month and day of month as int arrays
+    days = to_datetime64(dates).astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    years = days.astype('datetime64[Y]')
+    return (days, years.astype(np.int64) + 1970, (months - years.astype('datetime64[M]')).astype(np.int64) + 1,
+            (days - months).astype(np.int64) + 1)
+
+
+def days_in_year(years):
+    years = np.asarray(years)
+    return np.where((years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0)), 366, 365)
+
+
+def first_of_year(years):
+    return (np.asarray(years) - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+
+
+def last_of_february(years, months, days):
+    return (months == 2) & (days == np.where(days_in_year(years) == 366, 29, 28))
+
+
+BASES = ('ACT/365F', 'ACT/ACT ISDA', '30/360 US', '30E/360')
+
+
+def day_count_kernel(start_dates, end_dates, basis: str):
+    # (day counts, year fractions) of every (start, end) pair under `basis`, in one pass over
+    # the arrays; dates count at day resolution
+    assert basis in BASES, f"basis must be one of {BASES}"
+    start_dates, end_dates = np.broadcast_arrays(to_datetime64(start_dates), to_datetime64(end_dates))
+    start, y1, m1, d1 = date_parts(start_dates)
+    end, y2, m2, d2 = date_parts(end_dates)
+    actual = (end - start).astype(np.int64)
+
+    if basis == 'ACT/365F':
+        return actual, actual / 365
+    if basis == 'ACT/ACT ISDA':
+        # days in each calendar year over that year's length
+        split = (first_of_year(y1 + 1) - start).astype(np.int64) / days_in_year(y1) + (y2 - y1 - 1) + \
+                (end - first_of_year(y2)).astype(np.int64) / days_in_year(y2)
+        return actual, np.where(y1 == y2, actual / days_in_year(y1), split)
+
+    if basis == '30/360 US':
+        start_eom, end_eom = last_of_february(y1, m1, d1), last_of_february(y2, m2, d2)
+        d2 = np.where(start_eom & end_eom, 30, d2)
+        d1 = np.where(start_eom, 30, d1)
+        d2 = np.where((d2 == 31) & (d1 >= 30), 30, d2)
+        d1 = np.where(d1 == 31, 30, d1)
+    else:
+        d1, d2 = np.minimum(d1, 30), np.minimum(d2, 30)
+    days = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+    return days, days / 360
+
+
+class KernelDayCount(DayCount):
+    # conventions with one year fraction for both the ytm and the price basis. The scalar methods
+    # are written out per convention, the array methods all run through day_count_kernel.
+
+    basis = None
+
+    def __init__(self, inception=None, maturity=None, cache: DayCountCache = None):
+        self.inception = inception
+        self.maturity = maturity
+        self.cache = cache
+
+    @staticmethod
+    def _date(date):
+        return pd.Timestamp(date).normalize()
+
+    def calc_days(self, start_date, end_date):
+        return (self._date(end_date) - self._date(start_date)).days
+
+    @abstractmethod
+    def year_frac(self, start_date, end_date):
+        pass
+
+    @cached(dated=False)
+    def year_frac_ytm(self, start_date=None, end_date=None):
+        return self.year_frac(start_date, end_date)
+
+    @cached(dated=False)
+    def year_frac_price(self, start_date, end_date):
+        return self.year_frac(start_date, end_date)
+
+    def calc_days_array(self, start_dates, end_dates):
+        return day_count_kernel(start_dates, end_dates, self.basis)[0]
+
+    @cached_array(dated=False)
+    def year_frac_ytm_array(self, start_dates, end_dates):
+        return day_count_kernel(start_dates, end_dates, self.basis)[1]
+
+    @cached_array(dated=False)
+    def year_frac_price_array(self, start_dates, end_dates):
+        return day_count_kernel(start_dates, end_dates, self.basis)[1]
+
+
+class ACT_365F(KernelDayCount):
+
+    basis = 'ACT/365F'
+    denominator = 365
+
+    def year_frac(self, start_date, end_date):
+        return self.calc_days(start_date, end_date) / 365
+
+
+class ACT_ACT_ISDA(KernelDayCount):
+
+    basis = 'ACT/ACT ISDA'
+
+    def year_frac(self, start_date, end_date):
+        start, end = self._date(start_date), self._date(end_date)
+        if start.year == end.year:
+            return (end - start).days / int(days_in_year(start.year))
+        return ((pd.Timestamp(start.year + 1, 1, 1) - start).days / int(days_in_year(start.year)) +
+                (end.year - start.year - 1) +
+                (end - pd.Timestamp(end.year, 1, 1)).days / int(days_in_year(end.year)))
+
+
+class THIRTY_360_US(KernelDayCount):
+
+    basis = '30/360 US'
+    denominator = 360
+
+    def calc_days(self, start_date, end_date):
+        start, end = self._date(start_date), self._date(end_date)
+        d1, d2 = start.day, end.day
+        start_eom = start.month == 2 and start.is_month_end
+        if start_eom and end.month == 2 and end.is_month_end:
+            d2 = 30
+        if start_eom:
+            d1 = 30
+        if d2 == 31 and d1 >= 30:
+            d2 = 30
+        if d1 == 31:
+            d1 = 30
+        return 360 * (end.year - start.year) + 30 * (end.month - start.month) + d2 - d1
+
+    def year_frac(self, start_date, end_date):
+        return self.calc_days(start_date, end_date) / 360
+
+
+class THIRTY_E_360(KernelDayCount):
+
+    basis = '30E/360'
+    denominator = 360
+
+    def calc_days(self, start_date, end_date):
+        start, end = self._date(start_date), self._date(end_date)
+        return (360 * (end.year - start.year) + 30 * (end.month - start.month) +
+                min(end.day, 30) - min(start.day, 30))
+
+    def year_frac(self, start_date, end_date):
+        return self.calc_days(start_date, end_date) / 360
+
+
+# instruments may name their convention, e.g. DebtMethods.set_attributes(convention='ACT/365F')
+CONVENTIONS = {'ACT/360': ACT_360, 'ACT/365F': ACT_365F, 'ACT/ACT ISDA': ACT_ACT_ISDA,
+               '30/360 US': THIRTY_360_US, '30E/360': THIRTY_E_360}
+
+
+def register_convention(name: str, convention):
+    assert isinstance(convention, type) and issubclass(convention, DayCount), "conventions must be DayCount classes"
+    CONVENTIONS[name.upper()] = convention
+    return convention
+
+
+def get_convention(name):
+    # registry names are case-insensitive, class names (e.g. 'THIRTY_E_360') work too;
+    # anything else that builds a DayCount, e.g. partial(ACT_360, cache=shared), is returned as it is
+    if not isinstance(name, str):
+        return name
+    key = name.upper()
+    if key in CONVENTIONS:
+        return CONVENTIONS[key]
+    for convention in CONVENTIONS.values():
+        if convention.__name__ == name:
+            return convention
+    raise KeyError(f"unknown day count convention {name!r}")
@@ -0,0 +1,252 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from bill import Bill, BillMethods
+from bill_book import BillBook, BillBookMethods
+from conventions import to_datetime64
+from lru import LRUCache
+
+
+# Zero curves from bill yields. Every bill quote is a zero-coupon point: with the ytm tenor t of
+# BillMethods.calc_tenor, 1 + ytm * t = 100 / price, so the continuously compounded zero rate is
+# ln(1 + ytm * t) / t. All points of all dates go into one (dates x points) matrix, each row
+# sorted by tenor and padded with NaN, and every method below works on whole rows at once.
+#
+# Interpolation is on zero rates ('linear', 'monotone_cubic': Fritsch-Carlson/PCHIP slopes) or
+# on ln(discount factor) = -z * t ('log_linear'); beyond the first/last point the zero rate is
+# held flat.
+
+METHODS = ('linear', 'log_linear', 'monotone_cubic')
+METHOD_ERROR = f"method must be one of {METHODS}"
+
+
+def zero_rates(ytm, tenor):
+    return np.log1p(ytm * tenor) / tenor
+
+
+def pchip_slopes(tenors, zeros, counts):
+    # Fritsch-Carlson slopes at every knot of every row (scipy's PchipInterpolator end rules),
+    # rows of two points are straight lines
+    rows = np.arange(tenors.shape[0])
+    if tenors.shape[1] < 2:
+        return np.zeros(tenors.shape)
+    h = np.diff(tenors, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = np.diff(zeros, axis=1) / h
+        w1, w2 = 2 * h[:, 1:] + h[:, :-1], h[:, 1:] + 2 * h[:, :-1]
+        inner = (w1 + w2) / (w1 / delta[:, :-1] + w2 / delta[:, 1:])
+    slopes = np.full(tenors.shape, np.nan)
+    slopes[:, 1:-1] = np.where(delta[:, :-1] * delta[:, 1:] > 0, inner, 0.)
+
+    def end_slope(h0, h1, d0, d1):
+        with np.errstate(invalid='ignore'):
+            slope = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+        slope = np.where(np.sign(slope) != np.sign(d0), 0., slope)
+        return np.where((np.sign(d0) != np.sign(d1)) & (np.abs(slope) > np.abs(3 * d0)), 3 * d0, slope)
+
+    wide = counts > 2
+    last = np.maximum(counts - 1, 1)
+    take = lambda values, columns: values[rows, np.clip(columns, 0, values.shape[1] - 1)]
+    first_slope = end_slope(take(h, 0), take(h, 1), take(delta, 0), take(delta, 1))
+    last_slope = end_slope(take(h, last - 1), take(h, last - 2), take(delta, last - 1), take(delta, last - 2))
+    line = take(delta, 0)
+    slopes[:, 0] = np.where(wide, first_slope, line)
+    slopes[rows, last] = np.where(wide, last_slope, line)
+    # a single point is a flat curve
+    slopes[counts < 2] = 0.
+    return slopes
+
+
+def interpolate(tenors, zeros, counts, slopes, rows, points, method):
+    # zero rates at `points`, each read off row rows[i] of the knot matrices; the interval of
+    # every point comes from one searchsorted over all rows laid end to end
+    assert method in METHODS, METHOD_ERROR
+    rows, points = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(points, dtype=float))
+    shape = points.shape
+    rows, points = rows.ravel(), points.ravel()
+    width = tenors.shape[1]
+    result = np.full(points.shape, np.nan)
+    filled = counts[rows] > 0
+    if not filled.any() or width == 0:
+        return result.reshape(shape)
+
+    top = np.nanmax(tenors)
+    span = top - min(np.nanmin(tenors), 0.) + 1
+    flat = (np.arange(tenors.shape[0])[:, None] * span + np.where(np.isnan(tenors), top + .5, tenors)).ravel()
+
+    rows, t = rows[filled], points[filled]
+    n = counts[rows]
+    first, last = tenors[rows, 0], tenors[rows, n - 1]
+    clipped = np.clip(t, first, last)
+    left = np.searchsorted(flat, rows * span + clipped, side='right') - 1 - rows * width
+    left = np.clip(left, 0, np.maximum(n - 2, 0))
+    right = np.minimum(left + 1, n - 1)
+
+    t0, t1 = tenors[rows, left], tenors[rows, right]
+    z0, z1 = zeros[rows, left], zeros[rows, right]
+    h = t1 - t0
+    single = h == 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        s = np.where(single, 0., (clipped - t0) / h)
+        if method == 'linear':
+            z = z0 + (z1 - z0) * s
+        elif method == 'log_linear':
+            # linear in z * t, turned back into a zero rate at the point
+            z = np.where(single, z0, (z0 * t0 + (z1 * t1 - z0 * t0) * s) / clipped)
+        else:
+            m0, m1 = slopes[rows, left], slopes[rows, right]
+            z = np.where(single, z0, (2 * s ** 3 - 3 * s ** 2 + 1) * z0 + (s ** 3 - 2 * s ** 2 + s) * h * m0 +
+                         (-2 * s ** 3 + 3 * s ** 2) * z1 + (s ** 3 - s ** 2) * h * m1)
+    # flat zero rate outside the points
+    z = np.where(t < first, zeros[rows, 0], np.where(t > last, zeros[rows, n - 1], z))
+    result[filled] = z
+    return result.reshape(shape)
+
+
+class Curve:
+    # one date's zero curve; every query is a binary search over its points
+
+    def __init__(self, tenors, zeros, method: str = 'monotone_cubic', date=None, slopes=None):
+        assert method in METHODS, METHOD_ERROR
+        tenors, zeros = np.asarray(tenors, dtype=float), np.asarray(zeros, dtype=float)
+        assert tenors.shape == zeros.shape and tenors.ndim == 1, "tenors and zeros must be 1-d and the same length"
+        order = np.argsort(tenors, kind='stable')
+        self.tenors, self.zeros = tenors[order], zeros[order]
+        self.method = method
+        self.date = date
+        self.counts = np.array([self.tenors.shape[0]])
+        if slopes is None and method == 'monotone_cubic':
+            slopes = pchip_slopes(self.tenors[None], self.zeros[None], self.counts)[0]
+        self.slopes = None if slopes is None else np.asarray(slopes, dtype=float)
+
+    def __len__(self):
+        return self.tenors.shape[0]
+
+    def zero(self, tenors):
+        slopes = None if self.slopes is None else self.slopes[None]
+        return interpolate(self.tenors[None], self.zeros[None], self.counts, slopes, 0, tenors, self.method)
+
+    def discount(self, tenors):
+        tenors = np.asarray(tenors, dtype=float)
+        return np.exp(-self.zero(tenors) * tenors)
+
+    def forward(self, start, end):
+        # continuously compounded forward rate between two tenors
+        start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+        return (self.zero(end) * end - self.zero(start) * start) / (end - start)
+
+
+class YieldCurve:
+    # zero curves for every quoted date, stored as (dates x points) matrices; curve(date) hands
+    # out the fitted Curve of a date from an LRU, zero()/discount() price any number of
+    # (date, tenor) pairs in one vectorized call
+
+    def __init__(self, dates, tenors, zeros, method: str = 'monotone_cubic', cache_size: int = 1024):
+        assert method in METHODS, METHOD_ERROR
+        self.dates = to_datetime64(dates)
+        self.tenors = np.asarray(tenors, dtype=float)
+        self.zeros = np.asarray(zeros, dtype=float)
+        assert self.tenors.shape == self.zeros.shape == (self.dates.shape[0], self.tenors.shape[1]), \
+            "tenors and zeros must be (dates x points) matrices"
+        self.counts = (~np.isnan(self.tenors)).sum(axis=1)
+        self.method = method
+        self.cache = LRUCache(cache_size)
+        self._slopes = None
+
+    @classmethod
+    def from_points(cls, dates, tenors, zeros, method: str = 'monotone_cubic', cache_size: int = 1024):
+        # loose (date, tenor, zero rate) points into the curve matrices in one sort; points with the
+        # same date and tenor are averaged, points without a positive tenor or a rate are dropped
+        dates, tenors, zeros = to_datetime64(dates), np.asarray(tenors, dtype=float), np.asarray(zeros, dtype=float)
+        keep = ~np.isnat(dates) & (tenors > 0) & ~np.isnan(zeros)
+        dates, tenors, zeros = dates[keep], tenors[keep], zeros[keep]
+
+        unique_dates, rows = np.unique(dates, return_inverse=True)
+        order = np.lexsort((tenors, rows))
+        rows, tenors, zeros = rows[order], tenors[order], zeros[order]
+        new = np.ones(rows.shape, dtype=bool)
+        new[1:] = (rows[1:] != rows[:-1]) | (tenors[1:] != tenors[:-1])
+        group = np.cumsum(new) - 1
+        zeros = np.bincount(group, zeros) / np.bincount(group)
+        rows, tenors = rows[new], tenors[new]
+
+        counts = np.bincount(rows, minlength=unique_dates.shape[0])
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        columns = np.arange(rows.shape[0]) - starts[rows]
+        width = counts.max() if counts.shape[0] else 0
+        tenor_matrix = np.full((unique_dates.shape[0], width), np.nan)
+        zero_matrix = np.full((unique_dates.shape[0], width), np.nan)
+        tenor_matrix[rows, columns] = tenors
+        zero_matrix[rows, columns] = zeros
+        return cls(unique_dates, tenor_matrix, zero_matrix, method, cache_size)
+
+    @classmethod
+    def from_bills(cls, bills: Iterable[Bill], method: str = 'monotone_cubic', cache_size: int = 1024):
+        # bills without historic_ytm (unpriced or calc_ytm not run) have no points
+        dates, tenors, yields = [], [], []
+        for bill in bills:
+            ytm = bill.historic_ytm
+            if ytm is None or ytm.shape[0] == 0:
+                continue
+            dates.append(to_datetime64(ytm.index))
+            tenors.append(BillMethods(bill).calc_tenor(ytm.index))
+            yields.append(ytm.to_numpy(dtype=float))
+        if not dates:
+            return cls(np.empty(0, dtype='datetime64[ns]'), np.empty((0, 0)), np.empty((0, 0)), method, cache_size)
+        tenors, yields = np.concatenate(tenors), np.concatenate(yields)
+        return cls.from_points(np.concatenate(dates), tenors, zero_rates(yields, tenors), method, cache_size)
+
+    @classmethod
+    def from_book(cls, book: BillBook, method: str = 'monotone_cubic', cache_size: int = 1024):
+        assert book.historic_ytm is not None, "calc_ytm must run on the bill book first"
+        ytm = book.historic_ytm
+        tenors = BillBookMethods(book).calc_tenor(ytm.index)
+        return cls.from_points(ytm.index.get_level_values('date'), tenors,
+                               zero_rates(ytm.to_numpy(dtype=float), tenors), method, cache_size)
+
+    def __len__(self):
+        return self.dates.shape[0]
+
+    @property
+    def slopes(self):
+        # monotone cubic slopes of all rows, fitted once on first use
+        if self._slopes is None and self.method == 'monotone_cubic':
+            self._slopes = pchip_slopes(self.tenors, self.zeros, self.counts)
+        return self._slopes
+
+    def rows(self, dates):
+        # row of the latest curve on or before each date, -1 before the first curve
+        return np.searchsorted(self.dates, to_datetime64(dates), side='right') - 1
+
+    def curve(self, date) -> Curve:
+        row = int(self.rows(pd.Timestamp(date)))
+        assert row >= 0, f"no curve on or before {date}"
+
+        def fit():
+            n = self.counts[row]
+            slopes = None if self.slopes is None else self.slopes[row, :n]
+            return Curve(self.tenors[row, :n], self.zeros[row, :n], self.method, pd.Timestamp(self.dates[row]), slopes)
+        return self.cache.get(row, fit)
+
+    def zero(self, dates, tenors):
+        # zero rates for (date, tenor) pairs broadcast against each other, NaN before the first curve
+        rows = self.rows(dates)
+        rows, tenors = np.broadcast_arrays(rows, np.asarray(tenors, dtype=float))
+        known = rows >= 0
+        result = np.full(rows.shape, np.nan)
+        result[known] = interpolate(self.tenors, self.zeros, self.counts, self.slopes, rows[known], tenors[known],
+                                    self.method)
+        return result
+
+    def discount(self, dates, tenors):
+        tenors = np.asarray(tenors, dtype=float)
+        return np.exp(-self.zero(dates, tenors) * tenors)
+
+    def to_frame(self, tenors):
+        # the curves on a fixed tenor grid, one row per date
+        tenors = np.asarray(tenors, dtype=float)
+        rows = np.broadcast_to(np.arange(len(self))[:, None], (len(self), tenors.shape[0]))
+        values = interpolate(self.tenors, self.zeros, self.counts, self.slopes, rows, tenors[None], self.method)
+        return pd.DataFrame(values, index=pd.DatetimeIndex(self.dates, name='date'), columns=tenors)
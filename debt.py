@@ -1,12 +1,13 @@
 from typing import Union
 import datetime
 
-import numpy as np
 import pandas as pd
 
 from asset import Asset, AssetMethods
+from business_calendar import BusinessCalendar
 from constants import DT_SERIES_ERROR
-from conventions import DayCount, ACT_360
+from conventions import DayCount, ACT_360, get_convention
+from rates import StepRate
 
 
 class Debt(Asset):
@@ -17,10 +18,14 @@ class Debt(Asset):
     face_value = None
     pmt_schedule = None
     convention = None
+    calendar = None
+    historic_ytm = None
 
     
 class DebtMethods(AssetMethods):
     
+    __slots__ = ('debt',)
+    
     def __init__(self, debt: Debt):
         self.debt = debt
         super().__init__(self.debt)
@@ -31,7 +36,8 @@ class DebtMethods(AssetMethods):
                  rate: Union[float, pd.Series] = None,
                  face_value: Union[int, float] = 1,
                  pmt_schedule: Union[pd.Series, pd.DataFrame] = None,
-                 convention: DayCount = ACT_360):
+                 convention: Union[DayCount, str] = ACT_360,
+                 calendar: BusinessCalendar = None):
         
         if isinstance(inception, str):
             inception = pd.to_datetime(inception)
@@ -43,15 +49,14 @@ class DebtMethods(AssetMethods):
             assert maturity >= self.debt.inception, "Maturity date is before inception date!"
         self.debt.maturity = maturity    
         
+        # rates are kept as change points only, use rate.to_series() for a daily pd.Series
         if isinstance(rate, float) and maturity is not None:
-            dates = pd.date_range(start=self.debt.inception, end=self.debt.maturity, freq='D')
-            rates = np.ones(dates.shape[0]) * rate
-            self.debt.rate = pd.Series(data=rates, index=dates)
+            self.debt.rate = StepRate(dates=self.debt.inception, values=rate, end=self.debt.maturity)
         elif isinstance(rate, pd.Series):
             assert isinstance(rate.index, pd.DatetimeIndex), DT_SERIES_ERROR
             assert rate.index.min() >= self.debt.inception
             assert rate.index.max() <= self.debt.maturity
-            self.debt.rate = rate
+            self.debt.rate = StepRate.from_series(rate, end=self.debt.maturity)
         
         assert face_value > 0, "Face value cannot be 0 or negative!"
         self.debt.face_value = face_value
@@ -65,8 +70,20 @@ class DebtMethods(AssetMethods):
             assert all(pmt_schedule.columns == ['interest', 'principal']), err_msg
         self.debt.pmt_schedule = pmt_schedule
         
+        # a DayCount class or a registered name such as 'ACT/365F'
+        convention = get_convention(convention)
         self.debt.convention = convention(inception=self.debt.inception,
                                           maturity=self.debt.maturity)
+        # shared, e.g. business_calendar.get_calendar(name); never copied per instrument
+        self.debt.calendar = calendar
+        
+    def set_pmt_schedule(self, frequency: int = 1, roll: str = 'modified_following'):
+        # coupon schedule from the debt's calendar, rate and face value
+        assert self.debt.calendar is not None, "debt has no business calendar"
+        assert self.debt.rate is not None and self.debt.maturity is not None
+        self.debt.pmt_schedule = self.debt.calendar.payment_schedule(self.debt.inception, self.debt.maturity,
+                                                                     self.debt.rate, self.debt.face_value,
+                                                                     frequency, roll)
         
     def set_price_history(self, prices: pd.Series):
         if self.debt.inception is not None:
@@ -0,0 +1,131 @@
+import time
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from bill import BillMethods
+
+
+class IngestStats:
+
+    def __init__(self):
+        self.records = 0
+        self.rejected = 0
+        self.batches = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.elapsed = 0.
+
+    @property
+    def throughput(self):
+        # records per second of wall time spent inside the ingestor
+        return self.records / self.elapsed if self.elapsed > 0 else float('nan')
+
+    def __repr__(self):
+        return (f'IngestStats(records={self.records}, rejected={self.rejected}, batches={self.batches}, '
+                f'queue_depth={self.queue_depth}, max_queue_depth={self.max_queue_depth}, '
+                f'throughput={self.throughput:,.0f}/s)')
+
+
+class TickIngestor:
+    # micro-batches a stream of (timestamp, isin, discount) quotes per ISIN and applies every
+    # batch with one BillMethods.update_price call, i.e. one bulk discount -> price conversion and
+    # one price store update per instrument instead of one per quote.
+    #
+    # An ISIN's batch is flushed once it holds max_batch quotes, or once the stream's clock (the
+    # latest timestamp seen) is `window` past the batch's first quote. Quotes for ISINs without a
+    # BillMethods, or dated outside the bill's [inception, maturity], are counted as rejected and
+    # dropped, so one bad quote cannot fail the update of a whole batch.
+
+    def __init__(self, methods: Iterable[BillMethods], max_batch: int = 256, window=None):
+        assert max_batch > 0, "max_batch must be positive"
+        self.methods = {m.bill.isin: m for m in methods}
+        self.max_batch = max_batch
+        self.window = None if window is None else pd.Timedelta(window).value
+        self.stats = IngestStats()
+        # isin -> (timestamps, discounts); dicts keep insertion order, so the first entry is always
+        # the batch opened longest ago
+        self._buffers = {}
+        self._clock = None
+
+    def stream(self, records: Iterable):
+        # generator: yields (isin, quotes applied) for every flushed batch, ending with a flush of
+        # everything still buffered in order of each batch's first quote
+        records = iter(records)
+        while True:
+            started = time.perf_counter()
+            try:
+                timestamp, isin, discount = next(records)
+            except StopIteration:
+                flushed = self.flush()
+                self.stats.elapsed += time.perf_counter() - started
+                yield from flushed
+                return
+            flushed = self.push(timestamp, isin, discount)
+            self.stats.elapsed += time.perf_counter() - started
+            yield from flushed
+
+    def run(self, records: Iterable):
+        for _ in self.stream(records):
+            pass
+        return self.stats
+
+    def push(self, timestamp, isin, discount):
+        # buffers one quote, returns the batches this quote caused to be flushed
+        if isin not in self.methods:
+            self.stats.rejected += 1
+            return []
+        timestamp = pd.Timestamp(timestamp).value
+        bill = self.methods[isin].bill
+        if (bill.inception is not None and timestamp < pd.Timestamp(bill.inception).value) or \
+           (bill.maturity is not None and timestamp > pd.Timestamp(bill.maturity).value):
+            self.stats.rejected += 1
+            return []
+        self.stats.records += 1
+
+        buffer = self._buffers.get(isin)
+        if buffer is None:
+            buffer = self._buffers[isin] = ([], [])
+        buffer[0].append(timestamp)
+        buffer[1].append(discount)
+        self._set_depth(self.stats.queue_depth + 1)
+
+        flushed = []
+        if len(buffer[0]) >= self.max_batch:
+            flushed.append(self._flush(isin))
+        if self.window is not None:
+            self._clock = timestamp if self._clock is None else max(self._clock, timestamp)
+            flushed.extend(self._flush_expired())
+        return flushed
+
+    def flush(self):
+        return [self._flush(isin) for isin in list(self._buffers)]
+
+    def _flush_expired(self):
+        flushed = []
+        while self._buffers:
+            isin, (timestamps, _) = next(iter(self._buffers.items()))
+            if self._clock - timestamps[0] < self.window:
+                break
+            flushed.append(self._flush(isin))
+        return flushed
+
+    def _flush(self, isin):
+        # the batch stays queued until the update succeeds, so a caller can fix the bill and replay
+        # it with another flush
+        timestamps, discounts = self._buffers[isin]
+        dates = pd.DatetimeIndex(np.array(timestamps, dtype='datetime64[ns]'))
+        discounts = pd.Series(np.asarray(discounts, dtype=float), index=dates, name='discount')
+        # later quotes for the same timestamp win, as they would quote by quote
+        discounts = discounts[~discounts.index.duplicated(keep='last')].sort_index()
+        self.methods[isin].update_price(discounts)
+
+        del self._buffers[isin]
+        self._set_depth(self.stats.queue_depth - len(timestamps))
+        self.stats.batches += 1
+        return isin, len(timestamps)
+
+    def _set_depth(self, depth):
+        self.stats.queue_depth = depth
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
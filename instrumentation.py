@@ -0,0 +1,211 @@
+import importlib
+import json
+import random
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+
+# Opt-in timing of hot methods. Nothing is wrapped until enable(): the targets' class attributes
+# are swapped for timing wrappers and put back by disable(), so a disabled registry leaves the
+# original functions in place and costs nothing.
+#
+#   with profile() as registry:
+#       methods.calc_ytm()
+#
+# Targets are 'module.Class.method' paths. calc_tenor is where BillMethods turns dates into
+# tenors and PriceStore.update is the merge behind AssetMethods.update_price. Rows are counted
+# from the array arguments, or by the target's entry in ROW_COUNTERS for methods that work on
+# the instrument's own history.
+
+DEFAULT_TARGETS = [
+    'conventions.ACT_360.numerator',
+    'conventions.ACT_360.year_frac_ytm',
+    'conventions.ACT_360.year_frac_price',
+    'conventions.ACT_360.numerator_array',
+    'conventions.ACT_360.year_frac_ytm_array',
+    'conventions.ACT_360.year_frac_price_array',
+    'conventions.DayCount.calc_days_array',
+    'conventions.KernelDayCount.year_frac_ytm',
+    'conventions.KernelDayCount.year_frac_price',
+    'conventions.KernelDayCount.calc_days_array',
+    'conventions.KernelDayCount.year_frac_ytm_array',
+    'conventions.KernelDayCount.year_frac_price_array',
+    'price_store.PriceStore.update',
+    'asset.AssetMethods.set_price_history',
+    'asset.AssetMethods.update_price',
+    'debt.DebtMethods.set_attributes',
+    'debt.DebtMethods.set_price_history',
+    'debt.DebtMethods.update_price',
+    'bill.BillMethods.set_attributes',
+    'bill.BillMethods.calc_tenor',
+    'bill.BillMethods.calc_ytm',
+    'bill.BillMethods.calc_discount',
+    'bill.BillMethods.calc_price',
+    'bill.BillMethods.calc_latest',
+    'bill.BillMethods.set_price_history',
+    'bill.BillMethods.update_price',
+]
+
+REPORT_COLUMNS = ['calls', 'total_ms', 'mean_us', 'p50_us', 'p90_us', 'p99_us', 'max_us', 'rows', 'rows_per_sec']
+
+
+def count_rows(args, kwargs):
+    # rows a call works on: the longest array-like argument, 1 for scalar-only calls
+    rows = 1
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, (pd.Series, pd.DataFrame, pd.Index, np.ndarray)) and value.ndim:
+            rows = max(rows, value.shape[0])
+    return rows
+
+
+def history_rows(args, kwargs):
+    # rows of the price history the DebtMethods/BillMethods instance (args[0]) works on
+    prices = args[0].debt.prices
+    return 0 if prices is None else prices.shape[0]
+
+
+ROW_COUNTERS = {
+    'bill.BillMethods.calc_ytm': history_rows,
+    'bill.BillMethods.calc_discount': history_rows,
+}
+
+
+class MethodStats:
+    # call count, total time and rows; percentiles come from a reservoir of at most max_samples
+    # call durations so long runs keep a bounded footprint
+
+    def __init__(self, max_samples: int = 10000, seed: int = 0):
+        self.calls = 0
+        self.total = 0.
+        self.rows = 0
+        self.max_samples = max_samples
+        self.samples = []
+        self._random = random.Random(seed)
+
+    def add(self, elapsed: float, rows: int):
+        self.calls += 1
+        self.total += elapsed
+        self.rows += rows
+        if len(self.samples) < self.max_samples:
+            self.samples.append(elapsed)
+        else:
+            slot = self._random.randrange(self.calls)
+            if slot < self.max_samples:
+                self.samples[slot] = elapsed
+
+    def summary(self):
+        samples = np.array(self.samples) * 1e6
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99]) if samples.shape[0] else (np.nan,) * 3
+        return {'calls': self.calls, 'total_ms': self.total * 1e3,
+                'mean_us': self.total / self.calls * 1e6 if self.calls else np.nan,
+                'p50_us': p50, 'p90_us': p90, 'p99_us': p99,
+                'max_us': samples.max() if samples.shape[0] else np.nan,
+                'rows': self.rows, 'rows_per_sec': self.rows / self.total if self.total > 0 else np.nan}
+
+
+class Instrumentation:
+
+    def __init__(self, targets=None, max_samples: int = 10000, row_counters=None):
+        # row_counters: target -> callable(args, kwargs) returning the rows of a call, on top of ROW_COUNTERS
+        self.targets = list(DEFAULT_TARGETS if targets is None else targets)
+        self.max_samples = max_samples
+        self.row_counters = {**ROW_COUNTERS, **(row_counters or {})}
+        self.stats = {}
+        self._patched = {}
+        self._lock = Lock()
+
+    @property
+    def enabled(self):
+        return bool(self._patched)
+
+    @property
+    def patched(self):
+        # targets currently wrapped, in the order they were enabled
+        return list(self._patched)
+
+    def is_patched(self, target: str):
+        return target in self._patched
+
+    def enable(self, targets=None):
+        for target in (self.targets if targets is None else targets):
+            if target in self._patched:
+                continue
+            owner, name = self.resolve(target)
+            original = owner.__dict__[name]
+            self._patched[target] = (owner, name, original)
+            setattr(owner, name, self.wrap(target, original))
+
+    def disable(self, targets=None):
+        for target in (list(self._patched) if targets is None else targets):
+            if target in self._patched:
+                owner, name, original = self._patched.pop(target)
+                setattr(owner, name, original)
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    @staticmethod
+    def resolve(target: str):
+        module, cls, name = target.rsplit('.', 2)
+        owner = getattr(importlib.import_module(module), cls)
+        assert name in owner.__dict__, f"{target} is not defined on {cls}"
+        return owner, name
+
+    def wrap(self, target, original):
+        counter = self.row_counters.get(target)
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                # args[0] is self, the rows are in the remaining arguments unless the target has a counter
+                self.record(target, elapsed, count_rows(args[1:], kwargs) if counter is None else counter(args, kwargs))
+        return timed
+
+    def record(self, target, elapsed, rows=1):
+        with self._lock:
+            stats = self.stats.get(target)
+            if stats is None:
+                stats = self.stats[target] = MethodStats(self.max_samples)
+            stats.add(elapsed, rows)
+
+    def report(self):
+        with self._lock:
+            rows = {target: stats.summary() for target, stats in self.stats.items()}
+        report = pd.DataFrame.from_dict(rows, orient='index', columns=REPORT_COLUMNS)
+        return report.rename_axis('method').sort_values('total_ms', ascending=False)
+
+    def dump(self, path: str):
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump({method: {key: None if pd.isna(value) else value for key, value in row.items()}
+                       for method, row in report.to_dict(orient='index').items()}, f, indent=2)
+
+
+registry = Instrumentation()
+
+
+@contextmanager
+def profile(targets=None, registry: Instrumentation = registry, stream=sys.stderr):
+    # times the block with fresh stats and writes the per-method report to `stream` (None: don't);
+    # targets the registry had already enabled stay enabled afterwards
+    targets = registry.targets if targets is None else targets
+    added = [target for target in targets if not registry.is_patched(target)]
+    registry.reset()
+    registry.enable(added)
+    try:
+        yield registry
+    finally:
+        registry.disable(added)
+        if stream is not None:
+            stream.write(registry.report().to_string(float_format='{:,.1f}'.format) + '\n')
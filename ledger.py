@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from bill_book import BillBook
+from conventions import ONE_DAY, to_datetime64
+
+
+VALUATION_COLUMNS = ['face', 'market_value', 'book_value', 'accretion', 'realized_pnl', 'unrealized_pnl',
+                     'total_pnl', 'daily_pnl']
+
+
+def epoch_days(dates):
+    # whole days since 1970-01-01, trades on a date count at that date's close
+    return (to_datetime64(dates) - np.datetime64(0, 'ns')) // ONE_DAY
+
+
+class Ledger:
+
+    book = None
+    position = None
+    trade_date = None
+    quantity = None
+    price = None
+
+
+class LedgerMethods:
+    # holdings of the bills in a BillBook, kept as one row per trade (lot): book position, trade
+    # date, face quantity (negative for sales) and clean price per 100.
+    #
+    # Accounting: bought lots accrete straight-line from their cost to face value at maturity,
+    # sales take the average amortized cost of the position, positions still held at maturity are
+    # redeemed at 100. Valuation runs over all lots and dates at once: between two trades of an
+    # instrument its unamortized discount is K * (days to maturity), so only K has to be carried
+    # through the (instrument, trade date) ordered trades.
+
+    def __init__(self, ledger: Ledger):
+        self.ledger = ledger
+
+    def set_book(self, book: BillBook):
+        self.ledger.book = book
+        self.ledger.position = np.empty(0, dtype=np.int64)
+        self.ledger.trade_date = np.empty(0, dtype='datetime64[ns]')
+        self.ledger.quantity = np.empty(0, dtype=np.int64)
+        self.ledger.price = np.empty(0, dtype=float)
+
+    def add_trades(self, isin, trade_date, quantity, price):
+        book = self.ledger.book
+        assert book is not None, "ledger has no bill book, call set_book first"
+        isin = np.atleast_1d(np.asarray(isin, dtype=object))
+        size = isin.shape[0]
+        position = pd.Index(book.isin).get_indexer(isin)
+        assert (position >= 0).all(), "unknown ISIN in trades"
+
+        trade_date = np.broadcast_to(to_datetime64(pd.to_datetime(trade_date)), size)
+        quantity = np.broadcast_to(np.asarray(quantity, dtype=np.int64), size)
+        price = np.broadcast_to(np.asarray(price, dtype=float), size)
+
+        size = np.abs(quantity)
+        min_piece, increment = book.min_piece[position], book.increment[position]
+        assert (size >= min_piece).all(), "trade quantity is below the bill's minimum piece"
+        assert ((size - min_piece) % increment == 0).all(), "trade quantity is not a multiple of the bill's increment"
+        assert (price > 0).all(), "trade price must be positive"
+        assert (trade_date >= book.inception[position]).all(), "trade before the bill's inception"
+        assert (trade_date < book.maturity[position]).all(), "trade on or after the bill's maturity"
+
+        position = np.concatenate([self.ledger.position, position])
+        trade_date = np.concatenate([self.ledger.trade_date, trade_date])
+        quantity = np.concatenate([self.ledger.quantity, quantity])
+        order = np.lexsort((trade_date, position))
+        held = pd.Series(quantity[order]).groupby(position[order]).cumsum().to_numpy()
+        assert (held >= 0).all(), "sale larger than the position held"
+
+        self.ledger.position = position
+        self.ledger.trade_date = trade_date
+        self.ledger.quantity = quantity
+        self.ledger.price = np.concatenate([self.ledger.price, price])
+
+    def events(self):
+        # trades plus a redemption at maturity for every position still open, ordered by
+        # (position, date), with the face held and the accretion rate K after each event and
+        # the cash/book amounts each event moves
+        ledger, book = self.ledger, self.ledger.book
+        held = pd.Series(ledger.quantity).groupby(ledger.position).sum()
+        held = held[held > 0]
+        redeemed = held.index.to_numpy(dtype=np.int64)
+
+        position = np.concatenate([ledger.position, redeemed])
+        date = np.concatenate([ledger.trade_date, book.maturity[redeemed]])
+        quantity = np.concatenate([ledger.quantity, -held.to_numpy()]).astype(float)
+        price = np.concatenate([ledger.price, np.full(redeemed.shape, 100.)])
+        order = np.lexsort((date, position))
+        position, date, quantity, price = position[order], date[order], quantity[order], price[order]
+
+        first = np.r_[True, position[1:] != position[:-1]]
+        face = pd.Series(quantity).groupby(position).cumsum().to_numpy()
+        face_before = face - quantity
+        days = (book.maturity[position] - date) / ONE_DAY
+
+        # K_j = K_j-1 * scale_j + added_j per position: buys add their discount per day to
+        # maturity, sales keep the unsold fraction. A full sale (scale 0) restarts the recursion,
+        # so within a segment K_j = S_j * sum(added_i / S_i) with S the running product of scales.
+        buy = quantity > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = np.where(buy, 1., face / face_before)
+            added = np.where(buy, quantity * (100 - price) / 100 / days, 0.)
+        segment = np.cumsum(first | (scale == 0))
+        log_scale = pd.Series(np.log(np.where(scale == 0, 1., scale))).groupby(segment).cumsum().to_numpy()
+        rate = np.exp(log_scale) * pd.Series(added * np.exp(-log_scale)).groupby(segment).cumsum().to_numpy()
+
+        rate_before = np.where(first, 0., np.roll(rate, 1))
+        book_before = face_before - rate_before * days
+        removed = np.where(buy, 0., (1 - scale) * book_before)
+        return pd.DataFrame({'position': position, 'date': date, 'quantity': quantity, 'price': price,
+                             'face': face, 'rate': rate,
+                             'cost': np.where(buy, quantity * price / 100, 0.),
+                             'proceeds': np.where(buy, 0., -quantity * price / 100),
+                             'removed': removed})
+
+    def _state(self, dates, prices=None):
+        # (dates x traded bills) face held, book value and market value as of each date's close
+        book = self.ledger.book
+        dates = pd.DatetimeIndex(np.atleast_1d(to_datetime64(dates)))
+        events = self.events()
+        traded = np.unique(events['position'].to_numpy())
+
+        # last event of every (bill, date) pair with one searchsorted over (position, day) keys
+        keys = (events['position'].to_numpy() << 32) + epoch_days(events['date']) + 2 ** 31
+        lookup = (traded[None, :] << 32) + epoch_days(dates)[:, None] + 2 ** 31
+        last = np.searchsorted(keys, lookup, side='right') - 1
+        valid = (last >= 0) & (events['position'].to_numpy()[np.maximum(last, 0)] == traded[None, :])
+
+        face = np.where(valid, events['face'].to_numpy()[last], 0.)
+        rate = np.where(valid, events['rate'].to_numpy()[last], 0.)
+        to_maturity = (book.maturity[traded][None, :] - to_datetime64(dates)[:, None]) / ONE_DAY
+        book_value = face - rate * np.maximum(to_maturity, 0)
+
+        prices = self.ledger.book.prices if prices is None else prices
+        if prices is None:
+            market = np.full(face.shape, np.nan)
+        else:
+            panel = prices.unstack('isin').reindex(columns=book.isin[traded])
+            market = panel.reindex(panel.index.union(dates)).ffill().reindex(dates).to_numpy(dtype=float)
+        # bills without a price yet are carried at amortized cost
+        market_value = np.where(np.isnan(market), book_value, face * market / 100)
+        return dates, book.isin[traded], face, book_value, market_value, events
+
+    def holdings(self, dates):
+        dates, isin, face, _, _, _ = self._state(dates)
+        return pd.DataFrame(face, index=dates, columns=isin)
+
+    def mark_to_market(self, dates, prices: pd.Series = None):
+        dates, isin, _, _, market_value, _ = self._state(dates, prices)
+        return pd.DataFrame(market_value, index=dates, columns=isin)
+
+    def valuation(self, dates, prices: pd.Series = None):
+        # portfolio totals per date; accretion, realized and total P&L are cumulative since the
+        # first trade, daily_pnl is the change in total P&L from the previous valuation date
+        dates, _, face, book_value, market_value, events = self._state(dates, prices)
+        book_value, market_value = book_value.sum(axis=1), market_value.sum(axis=1)
+
+        events = events.sort_values('date', kind='stable')
+        flows = events[['cost', 'proceeds', 'removed']].cumsum().to_numpy()
+        last = np.searchsorted(epoch_days(events['date']), epoch_days(dates), side='right') - 1
+        cost, proceeds, removed = np.where(last[:, None] >= 0, flows[np.maximum(last, 0)], 0.).T
+
+        accretion = book_value - cost + removed
+        realized = proceeds - removed
+        unrealized = market_value - book_value
+        total = accretion + realized + unrealized
+        result = pd.DataFrame({'face': face.sum(axis=1), 'market_value': market_value, 'book_value': book_value,
+                               'accretion': accretion, 'realized_pnl': realized, 'unrealized_pnl': unrealized,
+                               'total_pnl': total}, index=dates)
+        result['daily_pnl'] = result['total_pnl'].diff()
+        return result[VALUATION_COLUMNS]
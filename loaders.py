@@ -0,0 +1,241 @@
+import os
+import struct
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from bill import Bill, BillMethods
+from bill_book import BillBook, BillBookMethods, PANEL_INDEX
+from debt import DebtMethods
+from conventions import to_datetime64
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+# Universes on disk: a directory with prices.<ext> and bills.<ext> for ext in parquet, feather
+# or npz. prices holds the columns isin, date and one value column, sorted by (isin, date): its
+# name says what the values are, 'discount' (BillBook.discounts, bill discounts) or 'price'
+# (BillBook.prices). bills holds one row of static data per ISIN. Parquet/Feather need pyarrow,
+# npz only numpy.
+
+FORMATS = ('parquet', 'feather', 'npz')
+VALUES = ('discount', 'price')
+BILL_COLUMNS = ['isin', 'inception', 'maturity', 'face_value', 'min_piece', 'increment']
+ROW_GROUP_SIZE = 2 ** 16
+PYARROW_ERROR = "pyarrow is required for parquet/feather universes, use format='npz' without it"
+
+
+def universe_format(root: str):
+    for fmt in FORMATS:
+        if os.path.exists(os.path.join(root, 'prices.' + fmt)):
+            return fmt
+    raise FileNotFoundError(f"no prices file in {root}")
+
+
+def write_universe(root: str, prices: pd.Series, bills: pd.DataFrame = None, format: str = None):
+    # prices: values on a (date, isin) MultiIndex as in BillBook, named 'discount' (the default for
+    # an unnamed Series) or 'price'; bills: BILL_COLUMNS rows
+    format = format or ('parquet' if pa is not None else 'npz')
+    assert format in FORMATS, f"format must be one of {FORMATS}"
+    value = prices.name or 'discount'
+    assert value in VALUES, f"prices must be named one of {VALUES}"
+    assert format == 'npz' or pa is not None, PYARROW_ERROR
+    assert list(prices.index.names) == PANEL_INDEX, "prices index must have levels ['date', 'isin']"
+    os.makedirs(root, exist_ok=True)
+
+    isin = prices.index.get_level_values('isin').to_numpy(dtype=str)
+    date = to_datetime64(prices.index.get_level_values('date'))
+    order = np.lexsort((date, isin))
+    columns = {'isin': isin[order], 'date': date[order],
+               value: prices.to_numpy(dtype=float)[order]}
+    write_columns(os.path.join(root, 'prices.' + format), columns, format)
+
+    if bills is not None:
+        bills = bills.sort_values('isin')
+        columns = {'isin': bills['isin'].to_numpy(dtype=str),
+                   'inception': to_datetime64(bills['inception']), 'maturity': to_datetime64(bills['maturity']),
+                   'face_value': bills['face_value'].to_numpy(dtype=float),
+                   'min_piece': bills['min_piece'].to_numpy(dtype=np.int64),
+                   'increment': bills['increment'].to_numpy(dtype=np.int64)}
+        write_columns(os.path.join(root, 'bills.' + format), columns, format)
+
+
+def write_columns(path: str, columns: dict, format: str):
+    if format == 'npz':
+        # uncompressed on purpose: members stay memory-mappable, see npz_member
+        np.savez(path, **{key: np.asarray(value) for key, value in columns.items()})
+        return
+    table = pa.table(columns)
+    if format == 'parquet':
+        # small row groups keep isin/date statistics selective enough for filter pushdown
+        pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE)
+    else:
+        feather.write_feather(table, path)
+
+
+def npz_member(path: str, name: str):
+    # memmap over one array stored uncompressed in an .npz, falls back to reading it whole
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name + '.npy')
+        if info.compress_type != zipfile.ZIP_STORED:
+            return np.load(path)[name]
+        with open(path, 'rb') as f:
+            f.seek(info.header_offset)
+            local = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', local[26:30])
+            start = info.header_offset + 30 + name_length + extra_length
+            f.seek(start)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+    if dtype.hasobject or fortran or 0 in shape:
+        return np.load(path)[name]
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape, offset=offset)
+
+
+def read_columns(path: str, format: str, columns=None, isins=None, start=None, end=None):
+    # columns of the rows with isin in `isins` and start <= date <= end (both optional)
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    isins = None if isins is None else np.unique(np.asarray(isins, dtype=str))
+    if format == 'npz':
+        return read_npz(path, columns, isins, None if start is None else to_datetime64(start)[()],
+                        None if end is None else to_datetime64(end)[()])
+
+    assert pa is not None, PYARROW_ERROR
+    if columns is not None:
+        columns = list(dict.fromkeys(['isin', *columns]))
+    if format == 'parquet':
+        filters = []
+        if isins is not None:
+            filters.append(('isin', 'in', list(isins)))
+        if start is not None:
+            filters.append(('date', '>=', start))
+        if end is not None:
+            filters.append(('date', '<=', end))
+        table = pq.read_table(path, columns=columns, filters=filters or None)
+    else:
+        # feather has no statistics to prune with: the filter scans the isin/date columns in full,
+        # the memory-mapped table only saves copying the other columns of the rows it drops
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        mask = None
+        for condition in (None if isins is None else pc.is_in(table['isin'], value_set=pa.array(isins)),
+                          None if start is None else pc.greater_equal(table['date'], pa.scalar(start)),
+                          None if end is None else pc.less_equal(table['date'], pa.scalar(end))):
+            if condition is not None:
+                mask = condition if mask is None else pc.and_(mask, condition)
+        if mask is not None:
+            table = table.filter(mask)
+    return {name: table[name].to_numpy() for name in table.column_names}
+
+
+def read_npz(path: str, columns, isins, start, end):
+    # isin is sorted, so the rows of every requested ISIN are one contiguous block; within a
+    # block dates are sorted and the window is found by searchsorted on that block only
+    with np.load(path) as archive:
+        names = [name[:-4] if name.endswith('.npy') else name for name in archive.files]
+    isin = npz_member(path, 'isin')
+    date = npz_member(path, 'date') if 'date' in names else None
+
+    window = date is not None and (start is not None or end is not None)
+    if isins is None:
+        # dates are only sorted within an ISIN, a window over all of them is a plain mask
+        rows = np.arange(isin.shape[0])
+        if window:
+            keep = np.ones(rows.shape, dtype=bool)
+            if start is not None:
+                keep &= date >= start
+            if end is not None:
+                keep &= date <= end
+            rows = rows[keep]
+    else:
+        rows = []
+        for first, last in zip(np.searchsorted(isin, isins, side='left'), np.searchsorted(isin, isins, side='right')):
+            if window:
+                block = date[first:last]
+                first, last = (first + (0 if start is None else np.searchsorted(block, start, side='left')),
+                               first + (block.shape[0] if end is None else np.searchsorted(block, end, side='right')))
+            if last > first:
+                rows.append(np.arange(first, last))
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+
+    names = [name for name in names if name != 'isin' and (columns is None or name in columns)]
+    result = {'isin': np.asarray(isin[rows])}
+    for name in names:
+        result[name] = np.asarray(npz_member(path, name)[rows])
+    return result
+
+
+def read_price_columns(root: str, isins=None, start=None, end=None):
+    # isin, date and the value column, whichever of VALUES the universe was written with
+    format = universe_format(root)
+    columns = read_columns(os.path.join(root, 'prices.' + format), format, None, isins, start, end)
+    value, = [name for name in columns if name in VALUES]
+    return columns, value
+
+
+def read_prices(root: str, isins=None, start=None, end=None):
+    # the stored values as a (date, isin) Series like BillBook.prices/discounts, named after them
+    columns, value = read_price_columns(root, isins, start, end)
+    index = pd.MultiIndex.from_arrays([pd.DatetimeIndex(to_datetime64(columns['date'])),
+                                       columns['isin'].astype(object)], names=PANEL_INDEX)
+    return pd.Series(columns[value].astype(float), index=index, name=value)
+
+
+def read_bill_columns(root: str, isins=None):
+    format = universe_format(root)
+    columns = read_columns(os.path.join(root, 'bills.' + format), format, BILL_COLUMNS[1:], isins)
+    columns['isin'] = columns['isin'].astype(object)
+    return columns
+
+
+def read_bill_book(root: str, isins=None, start=None, end=None) -> BillBook:
+    # whole universe straight into the columnar BillBook, no per-bill objects at all
+    static = read_bill_columns(root, isins)
+    book = BillBook()
+    methods = BillBookMethods(book)
+    methods.set_attributes(**static)
+    values = read_prices(root, static['isin'], start, end)
+    if values.shape[0] and values.name == 'price':
+        methods.check_prices(values)
+        book.prices = values
+    elif values.shape[0]:
+        methods.set_price_history(values)
+    return book
+
+
+def read_bills(root: str, isins=None, start=None, end=None):
+    # one Bill per ISIN; every price history is a slice of the loaded columns
+    static = read_bill_columns(root, isins)
+    columns, value = read_price_columns(root, static['isin'].astype(str), start, end)
+    dates = pd.DatetimeIndex(to_datetime64(columns['date']))
+    isin, wanted = columns['isin'].astype(str), static['isin'].astype(str)
+    bounds, ends = np.searchsorted(isin, wanted, side='left'), np.searchsorted(isin, wanted, side='right')
+
+    bills = []
+    for i, (first, last) in enumerate(zip(bounds, ends)):
+        bill = Bill()
+        methods = BillMethods(bill)
+        methods.set_attributes(isin=static['isin'][i], inception=pd.Timestamp(static['inception'][i]),
+                               maturity=pd.Timestamp(static['maturity'][i]),
+                               face_value=float(static['face_value'][i]),
+                               min_piece=int(static['min_piece'][i]), increment=int(static['increment'][i]))
+        if last > first:
+            values = pd.Series(columns[value][first:last], index=dates[first:last], name=value)
+            if value == 'price':
+                # prices are stored as they are, BillMethods.set_price_history converts discounts
+                DebtMethods.set_price_history(methods, values)
+            else:
+                methods.set_price_history(values)
+        bills.append(bill)
+    return bills
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    # size-bounded, thread-safe least-recently-used map with hit/miss/eviction counters; values
+    # are computed outside the lock, so a slow calc never blocks other lookups
+    
+    def __init__(self, maxsize: int = 2 ** 16):
+        assert maxsize > 0, "cache size must be positive"
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+        
+    def __len__(self):
+        return len(self._data)
+    
+    def get(self, key, calc):
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        
+        value = calc()
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+            
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._data), 'maxsize': self.maxsize}
@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore
+
+
+DAYS_SUFFIX = '.days'
+VALUES_SUFFIX = '.values'
+META_SUFFIX = '.meta'
+
+
+class MmapPriceStore(PriceStore):
+    # PriceStore kept on disk as two fixed-width columns per asset: <key>.<n>.days holds int64 day
+    # ordinals (days since 1970-01-01) and <key>.<n>.values float64 prices, <key>.meta the current
+    # generation n and the number of rows in use. The files are mapped with numpy.memmap on first
+    # access, so untouched histories are never paged in.
+    #
+    # A mapped file is never truncated or replaced (Windows refuses both): in-order appends write
+    # into spare capacity, and growth or a correction writes generation n + 1 and maps that
+    # instead. Series handed out earlier keep mapping their generation; old generations are
+    # deleted once nothing maps them any more.
+
+    persistent = True
+
+    def __init__(self, root: str, key: str, name=None, freq=None):
+        self.root = root
+        self.key = key
+        self.generation, self.size = self._read_meta()
+        self.name = name
+        self.freq = freq
+        self._series = None
+        self._dirty = {}
+
+    def path(self, suffix, generation=None):
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.root, f'{self.key}.{generation}{suffix}')
+
+    def _read_meta(self):
+        meta = os.path.join(self.root, self.key + META_SUFFIX)
+        if not os.path.exists(meta):
+            return 0, 0
+        with open(meta) as f:
+            generation, size = f.read().split()
+        return int(generation), int(size)
+
+    def _write_meta(self):
+        meta = os.path.join(self.root, self.key + META_SUFFIX)
+        with open(meta + '.tmp', 'w') as f:
+            f.write(f'{self.generation} {self.size}\n')
+        os.replace(meta + '.tmp', meta)
+
+    def __getattr__(self, attr):
+        # _dates/_values are only created when something reads or writes the history
+        if attr in ('_dates', '_values'):
+            self._map()
+            return self.__dict__[attr]
+        raise AttributeError(attr)
+
+    @property
+    def mapped(self):
+        return '_dates' in self.__dict__
+
+    @property
+    def capacity(self):
+        return self._values.shape[0]
+
+    def _map(self):
+        # the whole file: rows past self.size are spare capacity for appends
+        if self.generation == 0:
+            self._dates = np.empty(0, dtype='datetime64[D]')
+            self._values = np.empty(0, dtype=np.float64)
+            return
+        self._dates = np.memmap(self.path(DAYS_SUFFIX), dtype=np.int64, mode='r+').view('datetime64[D]')
+        self._values = np.memmap(self.path(VALUES_SUFFIX), dtype=np.float64, mode='r+')
+
+    def _result_dtypes(self, prices: pd.Series):
+        return np.dtype(np.float64), np.dtype('datetime64[D]')
+
+    def _reserve(self, size: int, dtype=None, date_dtype=None):
+        # capacity doubles, so appends cost O(1) amortized
+        if size <= self.capacity:
+            return
+        self._write_generation(self.dates, self.values, max(size, 2 * self.capacity))
+
+    def _replace(self, dates, values):
+        # corrections go to a new generation, Series handed out earlier keep mapping the previous one
+        self._write_generation(dates, values, dates.shape[0])
+
+    def _write_generation(self, dates, values, capacity):
+        generation = self.generation + 1
+        os.makedirs(self.root, exist_ok=True)
+        size = dates.shape[0]
+        days = np.memmap(self.path(DAYS_SUFFIX, generation), dtype=np.int64, mode='w+', shape=(max(capacity, 1),))
+        prices = np.memmap(self.path(VALUES_SUFFIX, generation), dtype=np.float64, mode='w+',
+                           shape=(max(capacity, 1),))
+        days[:size] = dates.astype('datetime64[D]').view(np.int64)
+        prices[:size] = values.astype(np.float64)
+        days.flush()
+        prices.flush()
+        self._dates, self._values = days.view('datetime64[D]'), prices
+        self.generation, self.size = generation, size
+        self._write_meta()
+        self._discard(generation)
+
+    def _discard(self, current):
+        # earlier generations; files still mapped somewhere (on Windows) stay until a later call
+        for f in os.listdir(self.root):
+            stem, _, suffix = f.rpartition('.')
+            key, _, generation = stem.rpartition('.')
+            if key == self.key and '.' + suffix in (DAYS_SUFFIX, VALUES_SUFFIX) and generation.isdigit() and \
+               int(generation) < current:
+                try:
+                    os.remove(os.path.join(self.root, f))
+                except OSError:
+                    pass
+
+    def reset(self, prices: pd.Series):
+        prices = prices[~prices.index.duplicated(keep='last')].sort_index()
+        self._replace(prices.index.values.astype('datetime64[D]'), prices.values)
+        self.invalidate()
+        self.name = prices.name
+        self.freq = prices.index.freq
+        self._series = None
+
+    def update(self, prices: pd.Series):
+        super().update(prices)
+        self.flush()
+
+    def flush(self):
+        for column in (self.__dict__.get('_dates'), self.__dict__.get('_values')):
+            if isinstance(column, np.memmap):
+                column.flush()
+        if self.generation:
+            self._write_meta()
+
+
+class MmapPriceLibrary:
+    # one directory of MmapPriceStore files, opened per asset id on request
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def keys(self):
+        return sorted(f[:-len(META_SUFFIX)] for f in os.listdir(self.root) if f.endswith(META_SUFFIX))
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self.root, key + META_SUFFIX))
+
+    def open(self, key: str, name=None):
+        return MmapPriceStore(self.root, key, name=name)
+
+    def write(self, key: str, prices: pd.Series):
+        store = self.open(key, name=prices.name)
+        store.reset(prices)
+        return store
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from constants import DT_SERIES_ERROR
+
+
+class PriceStore:
+    # append-optimized backing store for Asset.prices: dates and values live in
+    # NumPy buffers with amortized (doubling) growth, the pd.Series is only built on read
+
+    persistent = False
+
+    def __init__(self, capacity: int = 16, dtype=np.float64, date_dtype='datetime64[ns]', name=None, freq=None):
+        self._dates = np.empty(max(capacity, 1), dtype=date_dtype)
+        self._values = np.empty(max(capacity, 1), dtype=dtype)
+        self.size = 0
+        self.name = name
+        self.freq = freq
+        self._series = None
+        # consumer key -> (tag, date arrays updated since the consumer last called mark_clean)
+        self._dirty = {}
+
+    @classmethod
+    def from_series(cls, prices: pd.Series):
+        assert isinstance(prices.index, pd.DatetimeIndex), DT_SERIES_ERROR
+        store = cls(capacity=prices.shape[0], dtype=prices.dtype, date_dtype=prices.index.dtype)
+        store.reset(prices)
+        return store
+
+    @classmethod
+    def from_arrays(cls, dates, values, name=None, freq=None):
+        # sorted, unique dates; the arrays are used as-is (e.g. read-only memmaps), any update
+        # that does not fit copies them into fresh buffers first
+        store = cls.__new__(cls)
+        store._dates, store._values = dates, values
+        store.size = dates.shape[0]
+        store.name = name
+        store.freq = freq
+        store._series = None
+        store._dirty = {}
+        return store
+
+    def reset(self, prices: pd.Series):
+        assert isinstance(prices.index, pd.DatetimeIndex), DT_SERIES_ERROR
+        self.size = 0
+        self.invalidate()
+        if prices.shape[0]:
+            self.update(prices)
+        self.name = prices.name
+        self.freq = prices.index.freq
+        # the caller's Series is returned as-is until the first update
+        self._series = prices
+
+    @property
+    def dates(self):
+        return self._dates[:self.size]
+
+    @property
+    def values(self):
+        return self._values[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, size: int, dtype=None, date_dtype=None):
+        dtype = self._values.dtype if dtype is None else dtype
+        date_dtype = self._dates.dtype if date_dtype is None else date_dtype
+        if size <= self._values.shape[0] and dtype == self._values.dtype and date_dtype == self._dates.dtype:
+            return
+
+        capacity = max(size, 2 * self._values.shape[0])
+        dates = np.empty(capacity, dtype=date_dtype)
+        values = np.empty(capacity, dtype=dtype)
+        dates[:self.size] = self.dates
+        values[:self.size] = self.values
+        self._dates, self._values = dates, values
+
+    def update(self, prices: pd.Series):
+        # same result as prices.combine_first(current prices): new non-missing values win on overlap
+        assert isinstance(prices.index, pd.DatetimeIndex), DT_SERIES_ERROR
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index(kind='stable')
+        if not prices.index.is_unique:
+            prices = prices[~prices.index.duplicated(keep='last')]
+
+        dtype, date_dtype = self._result_dtypes(prices)
+        dates = prices.index.values.astype(date_dtype)
+        values = prices.values
+
+        if self.size == 0 or (dates.shape[0] and dates[0] > self._dates[self.size - 1]):
+            # in-order append, O(len(prices)) amortized
+            self._reserve(self.size + dates.shape[0], dtype, date_dtype)
+            self._dates[self.size:self.size + dates.shape[0]] = dates
+            self._values[self.size:self.size + dates.shape[0]] = values
+            self.size += dates.shape[0]
+        else:
+            self._merge(dates, values, dtype, date_dtype)
+
+        self.name = prices.name
+        self._series = None
+        for tag, changes in self._dirty.values():
+            changes.append(dates)
+
+    def _result_dtypes(self, prices: pd.Series):
+        return np.result_type(self._values.dtype, prices.dtype), np.result_type(self._dates.dtype, prices.index.dtype)
+
+    def _merge(self, dates, values, dtype, date_dtype):
+        # out-of-order corrections: binary search into the existing dates, overwrite matches
+        # and insert the rest; fresh buffers so Series handed out earlier stay unchanged
+        current_dates = self.dates.astype(date_dtype)
+        current_values = self.values.astype(dtype)
+
+        positions = np.searchsorted(current_dates, dates)
+        found = positions < self.size
+        found[found] = current_dates[positions[found]] == dates[found]
+
+        overwrite = found & ~pd.isna(values)
+        current_values[positions[overwrite]] = values[overwrite]
+
+        merged_dates = np.insert(current_dates, positions[~found], dates[~found])
+        merged_values = np.insert(current_values, positions[~found], values[~found])
+        self._replace(merged_dates, merged_values)
+
+    def _replace(self, dates, values):
+        size = dates.shape[0]
+        capacity = self._dates.shape[0] if size <= self._dates.shape[0] else max(size, 2 * self._dates.shape[0])
+        self._dates = np.empty(capacity, dtype=dates.dtype)
+        self._values = np.empty(capacity, dtype=values.dtype)
+        self._dates[:size] = dates
+        self._values[:size] = values
+        self.size = size
+
+    def mark_clean(self, key, tag=None):
+        self._dirty[key] = (tag, [])
+
+    def invalidate(self):
+        self._dirty = {}
+
+    def dirty_dates(self, key, tag=None):
+        # None means that everything is dirty for this consumer: it never marked the
+        # store clean, the store was invalidated or the consumer's tag changed since
+        if key not in self._dirty or self._dirty[key][0] != tag:
+            return None
+        changes = self._dirty[key][1]
+        if not changes:
+            return self._dates[:0]
+        return np.unique(np.concatenate(changes).astype(self._dates.dtype))
+
+    def to_series(self):
+        if self._series is None:
+            index = pd.DatetimeIndex(self.dates)
+            if self.freq is not None:
+                try:
+                    index = pd.DatetimeIndex(self.dates, freq=self.freq)
+                except ValueError:
+                    pass
+            self._series = pd.Series(self.values, index=index, name=self.name, copy=False)
+        return self._series
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from constants import DT_SERIES_ERROR
+from conventions import to_datetime64
+
+
+class StepRate:
+    # piecewise-constant rate: only the change dates and their values are stored,
+    # each value holds until the next change date (or until `end`)
+
+    def __init__(self, dates, values, end=None):
+        dates = np.atleast_1d(to_datetime64(dates))
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        assert dates.shape == values.shape, "dates and values must have the same length"
+        assert dates.shape[0] > 0, "a step rate needs at least one change date"
+
+        order = np.argsort(dates, kind='stable')
+        self.dates = dates[order]
+        self.values = values[order]
+        self.end = to_datetime64(end if end is not None else self.dates[-1])[()]
+        assert self.end >= self.dates[0], "end date is before the first change date"
+
+    @classmethod
+    def from_series(cls, rate: pd.Series, end=None):
+        assert isinstance(rate.index, pd.DatetimeIndex), DT_SERIES_ERROR
+        rate = rate.sort_index()
+        # consecutive equal values carry no information
+        changes = rate.ne(rate.shift())
+        return cls(dates=rate.index[changes], values=rate.values[changes], end=end)
+
+    @property
+    def start(self):
+        return self.dates[0]
+
+    def __len__(self):
+        return self.dates.shape[0]
+
+    def __eq__(self, other):
+        if not isinstance(other, StepRate):
+            return NotImplemented
+        return np.array_equal(self.dates, other.dates) and self.end == other.end and \
+               np.array_equal(self.values, other.values, equal_nan=True)
+
+    def lookup(self, dates):
+        dates = to_datetime64(dates)
+        positions = np.searchsorted(self.dates, dates, side='right') - 1
+        inside = (positions >= 0) & (dates <= self.end)
+        return np.where(inside, self.values[np.clip(positions, 0, None)], np.nan)
+
+    def __getitem__(self, date):
+        if isinstance(date, slice):
+            return self.slice(date.start, date.stop)
+        return float(self.lookup(date))
+
+    def slice(self, start=None, end=None):
+        start = self.start if start is None else max(to_datetime64(start)[()], self.start)
+        end = self.end if end is None else min(to_datetime64(end)[()], self.end)
+        assert start <= end, "slice is outside of the rate's date range"
+
+        keep = (self.dates > start) & (self.dates <= end)
+        dates = np.concatenate([[start], self.dates[keep]])
+        values = np.concatenate([self.lookup(start)[None], self.values[keep]])
+        return StepRate(dates=dates, values=values, end=end)
+
+    def to_series(self, freq='D'):
+        # materializes the rate on a regular grid, e.g. the daily Series set_attributes used to build
+        if freq is None:
+            return pd.Series(data=self.values, index=pd.DatetimeIndex(self.dates))
+        dates = pd.date_range(start=self.start, end=self.end, freq=freq)
+        return pd.Series(data=self.lookup(dates), index=dates)
@@ -0,0 +1,32 @@
+from asset import PricedMixin
+
+
+# __slots__ counterparts of Asset/Debt/Bill: same attribute API for AssetMethods, DebtMethods and
+# BillMethods, but no per-instance __dict__ and no class-level defaults shared between instances
+
+class AssetRecord(PricedMixin):
+    
+    __slots__ = ('price_store', 'updated_at', 'asset_id')
+    
+    def __init__(self, **fields):
+        for cls in type(self).__mro__:
+            for field in getattr(cls, '__slots__', ()):
+                setattr(self, field, None)
+        for field, value in fields.items():
+            setattr(self, field, value)
+            
+    def __repr__(self):
+        fields = ', '.join(f'{field}={getattr(self, field)!r}' for field in ('asset_id', 'isin')
+                           if hasattr(self, field) and getattr(self, field) is not None)
+        return f'{type(self).__name__}({fields})'
+            
+            
+class DebtRecord(AssetRecord):
+    
+    __slots__ = ('inception', 'maturity', 'rate', 'face_value', 'pmt_schedule', 'convention', 'calendar',
+                 'historic_ytm')
+    
+    
+class BillRecord(DebtRecord):
+    
+    __slots__ = ('isin', 'discounts', 'min_piece', 'increment')
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from conventions import to_datetime64
+
+
+# Scenario risk on the yield_terms contract of BillMethods/CashFlowMethods (see solvers.solve_ytm):
+# every instrument is a row of (year fraction, amount) cash flows per 100 of face value, its
+# frequency (0: simple interest) and its ytm on the valuation date. A scenario is a row of yield
+# bumps at the pillar tenors; each cash flow moves by the bump interpolated at its own tenor
+# (flat beyond the first/last pillar), so a parallel shift moves every yield by the same amount
+# and a key-rate bump only the flows around its pillar. Scenarios bump yields only: bumping bill
+# discount rates (the calc_price basis) is not supported. All scenarios are priced as one
+# (scenarios x instruments x flows) array, cut into blocks of instruments and chunks of scenarios
+# so that neither the pillar weights of a block nor the bumped yields exceed max_elements.
+
+BP = 1e-4
+PILLARS = (0.25, 0.5, 1., 2., 5., 10., 30.)
+MEASURE_COLUMNS = ['price', 'dv01', 'modified_duration', 'convexity', 'position_dv01']
+
+
+def parallel_shifts(shifts, pillars=PILLARS):
+    shifts = np.atleast_1d(np.asarray(shifts, dtype=float))
+    return pd.DataFrame(np.repeat(shifts[:, None], len(pillars), axis=1),
+                        index=[f'parallel {shift / BP:+g}bp' for shift in shifts], columns=list(pillars))
+
+
+def key_rate_bumps(pillars=PILLARS, size: float = BP):
+    return pd.DataFrame(np.eye(len(pillars)) * size, index=[f'key rate {pillar:g}y' for pillar in pillars],
+                        columns=list(pillars))
+
+
+def scenario_matrix(pillars=PILLARS, shifts=(), key_rates: bool = False, size: float = BP):
+    # parallel shifts followed, optionally, by one key-rate bump of `size` per pillar
+    frames = [parallel_shifts(shifts, pillars)]
+    if key_rates:
+        frames.append(key_rate_bumps(pillars, size))
+    return pd.concat(frames)
+
+
+def pillar_weights(tenor, pillars):
+    # (..., pillars) share of every pillar's bump in the bump at `tenor`, rows sum to 1
+    eye = np.eye(len(pillars))
+    return np.stack([np.interp(tenor, pillars, eye[p]) for p in range(len(pillars))], axis=-1)
+
+
+class RiskEngine:
+
+    def __init__(self, methods, date, pillars=PILLARS, holdings=None, max_elements: int = 2 ** 22):
+        # methods: BillMethods/CashFlowMethods with historic_ytm (calc_ytm); the ytm on or before `date`
+        # is the base yield. holdings: face amount held per instrument, the instrument's face value
+        # by default. Instruments without a yield or past their last flow value at NaN.
+        self.methods = list(methods)
+        self.date = to_datetime64(pd.Timestamp(date))[()]
+        self.pillars = np.asarray(pillars, dtype=float)
+        assert self.pillars.ndim == 1 and (np.diff(self.pillars) > 0).all(), "pillars must be increasing tenors"
+        self.max_elements = max_elements
+
+        index = pd.DatetimeIndex([self.date])
+        terms = [m.yield_terms(pd.Series([np.nan], index=index)) for m in self.methods]
+        flows = max((t[1].shape[1] for t in terms), default=0)
+        self.tenor = np.concatenate([np.pad(t[1], ((0, 0), (0, flows - t[1].shape[1]))) for t in terms]) \
+            if terms else np.empty((0, 0))
+        self.amounts = np.concatenate([np.pad(t[2], ((0, 0), (0, flows - t[2].shape[1]))) for t in terms]) \
+            if terms else np.empty((0, 0))
+        # bill terms keep their flow after maturity, it no longer counts
+        self.amounts = np.where(self.tenor > 0, self.amounts, 0.)
+        self.frequency = np.array([float(t[3]) for t in terms])
+        self.yields = np.array([self.base_yield(m) for m in self.methods])
+
+        self.labels = [getattr(m.debt, 'isin', None) or i for i, m in enumerate(self.methods)]
+        self.holdings = np.array([m.debt.face_value for m in self.methods], dtype=float) if holdings is None else \
+            np.broadcast_to(np.asarray(holdings, dtype=float), len(self.methods))
+        self.base = self.value(np.zeros((1, self.pillars.shape[0])))[0]
+
+    def base_yield(self, methods):
+        ytm = methods.debt.historic_ytm
+        if ytm is None:
+            return np.nan
+        row = np.searchsorted(to_datetime64(ytm.index), self.date, side='right') - 1
+        return ytm.iloc[row] if row >= 0 else np.nan
+
+    def scenarios(self, scenarios):
+        scenarios = scenarios.to_numpy(dtype=float) if isinstance(scenarios, pd.DataFrame) else \
+            np.atleast_2d(np.asarray(scenarios, dtype=float))
+        assert scenarios.shape[1] == self.pillars.shape[0], "scenarios need one bump per pillar"
+        return scenarios
+
+    def value(self, scenarios):
+        # (scenarios x instruments) dirty prices per 100 of face value
+        scenarios = self.scenarios(scenarios)
+        instruments, flows = self.tenor.shape
+        # instruments per block: its (instruments x flows x pillars) weights fit in max_elements
+        block = max(1, self.max_elements // max(flows * self.pillars.shape[0], 1))
+        values = np.empty((scenarios.shape[0], instruments))
+        for first in range(0, instruments, block):
+            rows = slice(first, first + block)
+            tenor, amounts, frequency = self.tenor[rows], self.amounts[rows], self.frequency[rows]
+            weights = pillar_weights(tenor, self.pillars)
+            simple = (frequency == 0)[:, None]
+            periods = np.where(simple, 1., frequency[:, None])
+            chunk = max(1, self.max_elements // max(tenor.size, 1))
+            for start in range(0, scenarios.shape[0], chunk):
+                bumps = np.einsum('nkp,sp->snk', weights, scenarios[start:start + chunk])
+                yields = self.yields[None, rows, None] + bumps
+                with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                    discount = np.where(simple, 1 / (1 + yields * tenor),
+                                        (1 + yields / periods) ** (-periods * tenor))
+                    values[start:start + chunk, rows] = (amounts * discount).sum(axis=2)
+        # nothing left to value on or after the last flow
+        values[:, ~(self.amounts != 0).any(axis=1)] = np.nan
+        return values
+
+    def pnl(self, scenarios):
+        # (scenarios x instruments) P&L on the holdings
+        values = self.value(scenarios)
+        index = scenarios.index if isinstance(scenarios, pd.DataFrame) else None
+        return pd.DataFrame((values - self.base) * self.holdings / 100, index=index, columns=self.labels)
+
+    def measures(self, bump: float = BP):
+        # price, DV01 (price change per 100 face for a 1bp fall), modified duration and convexity
+        # from central differences of a parallel shift of +-bump
+        down, up = self.value(parallel_shifts([-bump, bump], self.pillars))
+        dv01 = (down - up) / 2 * BP / bump
+        with np.errstate(divide='ignore', invalid='ignore'):
+            duration = (down - up) / (2 * bump * self.base)
+            convexity = (down + up - 2 * self.base) / (bump ** 2 * self.base)
+        return pd.DataFrame({'price': self.base, 'dv01': dv01, 'modified_duration': duration,
+                             'convexity': convexity, 'position_dv01': dv01 * self.holdings / 100},
+                            index=self.labels, columns=MEASURE_COLUMNS)
+
+    def key_rate_dv01(self, bump: float = BP):
+        # (instruments x pillars) price change per 100 face for a 1bp fall at each pillar
+        down = self.value(-key_rate_bumps(self.pillars, bump))
+        up = self.value(key_rate_bumps(self.pillars, bump))
+        return pd.DataFrame(((down - up) / 2 * BP / bump).T, index=self.labels, columns=list(self.pillars))
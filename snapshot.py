@@ -0,0 +1,212 @@
+import hashlib
+import json
+import struct
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from bill import Bill, BillMethods
+from conventions import get_convention, to_datetime64
+from price_store import PriceStore
+
+
+# Snapshot file: MAGIC, a little-endian uint64 header length, the JSON header, then the columns
+# dates (datetime64[ns]), prices, ytm and discounts (float64), each 64-byte aligned. Every bill
+# owns rows [start, start + length) of all four columns. Restoring maps the columns read-only,
+# so only the histories actually used are paged in.
+
+MAGIC = b'PASNAP\x00\x01'
+SNAPSHOT_VERSION = 1
+ALIGNMENT = 64
+COLUMNS = [('dates', 'datetime64[ns]'), ('prices', 'float64'), ('ytm', 'float64'), ('discounts', 'float64')]
+
+
+def timestamp(date):
+    return None if date is None or pd.isna(date) else pd.Timestamp(date).isoformat()
+
+
+def bill_attributes(bill: Bill):
+    convention = bill.convention
+    return {'isin': bill.isin, 'inception': timestamp(bill.inception), 'maturity': timestamp(bill.maturity),
+            'face_value': float(bill.face_value), 'min_piece': int(bill.min_piece),
+            'increment': int(bill.increment), 'convention': type(convention).__name__,
+            'convention_inception': timestamp(convention.inception),
+            'convention_maturity': timestamp(convention.maturity)}
+
+
+def input_hash(bill: Bill, precision: int = 6):
+    # everything calc_ytm/calc_discount depend on: a bill whose hash is unchanged can reuse
+    # the analytics stored for it
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([SNAPSHOT_VERSION, precision, bill_attributes(bill)], sort_keys=True).encode())
+    store = bill.price_store
+    if store is not None:
+        digest.update(np.ascontiguousarray(store.dates.astype('datetime64[ns]')).tobytes())
+        digest.update(np.ascontiguousarray(store.values.astype(np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def content_hash(*columns):
+    digest = hashlib.blake2b(digest_size=16)
+    for column in columns:
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest.hexdigest()
+
+
+def aligned_rows(series, index):
+    # analytics are only stored when they line up with the price history
+    if series is None or not series.index.equals(index):
+        return None
+    return series.to_numpy(dtype=np.float64)
+
+
+def write_snapshot(path: str, bills: Iterable[Bill], precision: int = 6):
+    entries, columns = [], {name: [] for name, _ in COLUMNS}
+    start = 0
+    for bill in bills:
+        prices = bill.prices
+        index = pd.DatetimeIndex([]) if prices is None else prices.index
+        length = index.shape[0]
+        ytm, discounts = aligned_rows(bill.historic_ytm, index), aligned_rows(bill.discounts, index)
+        rows = {'dates': to_datetime64(index),
+                'prices': np.empty(0) if prices is None else prices.to_numpy(dtype=np.float64),
+                'ytm': np.full(length, np.nan) if ytm is None else ytm,
+                'discounts': np.full(length, np.nan) if discounts is None else discounts}
+        for name, _ in COLUMNS:
+            columns[name].append(rows[name])
+        entries.append({**bill_attributes(bill), 'start': start, 'length': length, 'priced': prices is not None,
+                        'has_ytm': ytm is not None, 'has_discounts': discounts is not None,
+                        'input_hash': input_hash(bill, precision),
+                        'content_hash': content_hash(rows['ytm'], rows['discounts'])})
+        start += length
+
+    header = {'version': SNAPSHOT_VERSION, 'precision': precision, 'rows': start, 'bills': entries, 'columns': {}}
+    data = {name: np.concatenate(columns[name]).astype(dtype) if columns[name] else np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS}
+    # offsets depend on the header length, two passes settle it
+    for _ in range(2):
+        encoded = json.dumps(header).encode()
+        offset = aligned(len(MAGIC) + 8 + len(encoded))
+        for name, dtype in COLUMNS:
+            header['columns'][name] = offset
+            offset = aligned(offset + data[name].nbytes)
+    encoded = json.dumps(header).encode()
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+        for name, _ in COLUMNS:
+            f.write(b'\0' * (header['columns'][name] - f.tell()))
+            f.write(data[name].tobytes())
+
+
+def aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class Snapshot:
+    # an opened snapshot file: the header is parsed, the columns are mapped on first use
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            assert f.read(len(MAGIC)) == MAGIC, f"{path} is not a snapshot file"
+            length, = struct.unpack('<Q', f.read(8))
+            self.header = json.loads(f.read(length))
+        self.entries = {entry['isin']: entry for entry in self.header['bills']}
+        self._columns = None
+
+    @property
+    def current(self):
+        # written by this version of the code, otherwise every bill counts as stale
+        return self.header['version'] == SNAPSHOT_VERSION
+
+    @property
+    def precision(self):
+        return self.header['precision']
+
+    @property
+    def isins(self):
+        return list(self.entries)
+
+    def __contains__(self, isin):
+        return isin in self.entries
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            rows = self.header['rows']
+            self._columns = {name: np.memmap(self.path, dtype=dtype, mode='r', offset=self.header['columns'][name],
+                                             shape=(rows,)) if rows else np.empty(0, dtype=dtype)
+                             for name, dtype in COLUMNS}
+        return self._columns
+
+    def rows(self, isin):
+        entry = self.entries[isin]
+        rows = slice(entry['start'], entry['start'] + entry['length'])
+        return {name: column[rows] for name, column in self.columns.items()}
+
+    def is_stale(self, bill: Bill):
+        entry = self.entries.get(bill.isin)
+        return not self.current or entry is None or entry['input_hash'] != input_hash(bill, self.precision)
+
+    def verify(self, isins=None):
+        # isins whose stored analytics no longer match their content hash (e.g. a damaged file)
+        isins = self.isins if isins is None else isins
+        return [isin for isin in isins
+                if content_hash(self.rows(isin)['ytm'], self.rows(isin)['discounts']) !=
+                self.entries[isin]['content_hash']]
+
+    def restore(self, isins=None):
+        # Bills with attributes, prices and analytics straight from the snapshot; prices stay on
+        # the mapped columns until they are updated
+        assert self.current, f"snapshot version {self.header['version']} != {SNAPSHOT_VERSION}"
+        isins = self.isins if isins is None else isins
+        bills = []
+        for isin in isins:
+            entry = self.entries[isin]
+            bill = Bill()
+            methods = BillMethods(bill)
+            convention = get_convention(entry['convention'])
+            methods.set_attributes(isin=isin, inception=pd.Timestamp(entry['inception']),
+                                   maturity=pd.Timestamp(entry['maturity']), face_value=entry['face_value'],
+                                   min_piece=entry['min_piece'], increment=entry['increment'],
+                                   convention=convention)
+            bill.convention = convention(inception=self._date(entry['convention_inception']),
+                                         maturity=self._date(entry['convention_maturity']))
+            if entry['priced']:
+                rows = self.rows(isin)
+                bill.price_store = PriceStore.from_arrays(rows['dates'], rows['prices'], name='price')
+                self._apply(bill, entry, rows)
+            bills.append(bill)
+        return bills
+
+    def refresh(self, bills: Iterable[Bill]):
+        # freshly loaded bills take the stored analytics when their inputs are unchanged, the
+        # others are recalculated; returns the isins that had to be recalculated
+        recalculated = []
+        for bill in bills:
+            if bill.prices is None:
+                continue
+            entry = self.entries.get(bill.isin)
+            if not self.is_stale(bill) and entry['has_ytm'] and entry['has_discounts']:
+                self._apply(bill, entry, self.rows(bill.isin))
+                continue
+            methods = BillMethods(bill)
+            methods.calc_ytm()
+            methods.calc_discount(precision=self.precision)
+            recalculated.append(bill.isin)
+        return recalculated
+
+    def _apply(self, bill, entry, rows):
+        index = bill.prices.index
+        if entry['has_ytm']:
+            bill.historic_ytm = pd.Series(rows['ytm'], index=index, name='ytm', copy=False)
+            bill.price_store.mark_clean('ytm', BillMethods(bill).splice_tag())
+        if entry['has_discounts']:
+            bill.discounts = pd.Series(rows['discounts'], index=index, name='discount', copy=False)
+            bill.price_store.mark_clean('discount', BillMethods(bill).splice_tag(self.precision))
+
+    @staticmethod
+    def _date(date):
+        return None if date is None else pd.Timestamp(date)
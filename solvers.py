@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+
+def discounted_value(yields, tenor, amounts, frequency):
+    # value and d(value)/d(yield) of rows of cash flows; frequency 0 means simple
+    # (money-market) interest as used for bills, otherwise compounding per year
+    yields = np.asarray(yields, dtype=float)[:, None]
+    frequency = np.broadcast_to(np.asarray(frequency, dtype=float), yields.shape[:1])[:, None]
+    simple = frequency == 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        periods = np.where(simple, 1., frequency)
+        growth = np.where(simple, 1 + yields * tenor, 1 + yields / periods)
+        discount = np.where(simple, 1 / growth, growth ** (-periods * tenor))
+        value = (amounts * discount).sum(axis=1)
+        dvalue = (-tenor * amounts * discount / growth).sum(axis=1)
+    return value, dvalue
+
+
+class SolverResult:
+
+    def __init__(self, yields, iterations, converged, bisected):
+        self.yields = yields
+        self.iterations = iterations
+        self.converged = converged
+        self.bisected = bisected
+
+    def __repr__(self):
+        return (f'SolverResult(n={self.yields.shape[0]}, converged={int(self.converged.sum())}, '
+                f'bisected={int(self.bisected.sum())}, max_iterations={int(self.iterations.max(initial=0))})')
+
+
+class YieldSolver:
+    # Solves price_fn(y) == target for N elements at once. price_fn(yields, rows) returns price and
+    # dprice/dy for the elements selected by `rows` (a boolean mask or integer positions), `yields`
+    # holds just those elements' yields. Prices must be decreasing in y.
+    # All elements take vectorized Newton steps; elements that do not converge within max_iter or
+    # step outside [lower, upper] are finished by bisection on that bracket.
+
+    def __init__(self, tol: float = 1e-12, max_iter: int = 50, bisect_iter: int = 200,
+                 lower: float = -0.99, upper: float = 10., default_guess: float = 0.05):
+        self.tol = tol
+        self.max_iter = max_iter
+        self.bisect_iter = bisect_iter
+        self.lower = lower
+        self.upper = upper
+        self.default_guess = default_guess
+
+    def solve(self, price_fn, target, guess=None, series=None, steps=None, block: int = 1, lower=None, upper=None):
+        # with steps (e.g. date positions) the elements are solved in order of steps, `block` steps at
+        # a time, each seeded from the latest solution of the same series (e.g. the same instrument)
+        target = np.asarray(target, dtype=float)
+        size = target.shape[0]
+        lower = np.broadcast_to(np.asarray(self.lower if lower is None else lower, dtype=float), size)
+        upper = np.broadcast_to(np.asarray(self.upper if upper is None else upper, dtype=float), size)
+        guess = np.full(size, self.default_guess) if guess is None else \
+                np.broadcast_to(np.asarray(guess, dtype=float), size).copy()
+
+        if steps is None:
+            return self.newton_bisect(price_fn, target, guess, lower, upper)
+
+        series = np.zeros(size, dtype=np.int64) if series is None else pd.factorize(np.asarray(series))[0]
+        steps = np.asarray(steps)
+        order = np.argsort(steps, kind='stable')
+        distinct = np.unique(steps)
+        bounds = np.searchsorted(steps[order], distinct[::block])
+
+        last = np.full(series.max(initial=-1) + 1, np.nan)
+        result = SolverResult(np.full(size, np.nan), np.zeros(size, dtype=np.int64),
+                              np.zeros(size, dtype=bool), np.zeros(size, dtype=bool))
+        for start, end in zip(bounds, np.append(bounds[1:], size)):
+            elements = np.sort(order[start:end])
+            seed = last[series[elements]]
+            seed = np.where(np.isnan(seed), guess[elements], seed)
+
+            def block_price_fn(yields, rows, elements=elements):
+                return price_fn(yields, elements[rows])
+
+            solved = self.newton_bisect(block_price_fn, target[elements], seed, lower[elements], upper[elements])
+            result.yields[elements] = solved.yields
+            result.iterations[elements] = solved.iterations
+            result.converged[elements] = solved.converged
+            result.bisected[elements] = solved.bisected
+
+            # the last solved step of each series seeds its next block
+            finite = np.isfinite(solved.yields)
+            last[series[elements[finite]]] = solved.yields[finite]
+        return result
+
+    def newton_bisect(self, price_fn, target, guess, lower, upper):
+        size = target.shape[0]
+        yields = np.clip(np.where(np.isnan(guess), self.default_guess, guess), lower, upper)
+        iterations = np.zeros(size, dtype=np.int64)
+        missing = np.isnan(target)
+
+        active = ~missing
+        converged = np.zeros(size, dtype=bool)
+        for _ in range(self.max_iter):
+            if not active.any():
+                break
+            price, dprice = price_fn(yields[active], active)
+            step = np.zeros(size)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step[active] = (price - target[active]) / dprice
+            yields = yields - step
+            iterations += active
+            done = active & (np.abs(step) <= self.tol * np.maximum(1, np.abs(yields)))
+            converged |= done
+            active &= ~done
+            # a step outside of the bracket hands the element over to bisection
+            active &= (yields > lower) & (yields < upper) & np.isfinite(yields)
+
+        bisected = ~converged & ~missing
+        if bisected.any():
+            low, high = lower.copy(), upper.copy()
+            for _ in range(self.bisect_iter):
+                middle = (low + high) / 2
+                price, _ = price_fn(middle[bisected], bisected)
+                above = np.zeros(size, dtype=bool)
+                above[bisected] = price > target[bisected]
+                low = np.where(bisected & above, middle, low)
+                high = np.where(bisected & ~above, middle, high)
+                iterations += bisected
+                if np.all((high - low)[bisected] <= self.tol * np.maximum(1, np.abs(middle[bisected]))):
+                    break
+            yields = np.where(bisected, (low + high) / 2, yields)
+            # a bracket that never moved off one of its bounds holds no root
+            converged |= bisected & (high - low <= self.tol * np.maximum(1, np.abs(yields))) & \
+                         (low > lower) & (high < upper)
+
+        yields = np.where(missing, np.nan, yields)
+        return SolverResult(yields, iterations, converged, bisected)
+
+
+def solve_ytm(methods, solver: YieldSolver = None, block: int = 1):
+    # One solve over many instruments: every item of `methods` provides
+    # yield_terms(prices) -> (target, tenor, amounts, frequency) for its price history, e.g.
+    # BillMethods (simple yield on a single flow) or CashFlowMethods (coupon schedule).
+    # Dates are solved in calendar order, each warm-started from the instrument's previous date.
+    solver = YieldSolver() if solver is None else solver
+    methods = [m for m in methods if m.debt.prices is not None]
+    if not methods:
+        return SolverResult(np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=bool),
+                            np.empty(0, dtype=bool))
+
+    terms = [m.yield_terms(m.debt.prices) for m in methods]
+    flows = max(t[1].shape[1] for t in terms)
+    target = np.concatenate([t[0] for t in terms])
+    tenor = np.concatenate([np.pad(t[1], ((0, 0), (0, flows - t[1].shape[1]))) for t in terms])
+    amounts = np.concatenate([np.pad(t[2], ((0, 0), (0, flows - t[2].shape[1]))) for t in terms])
+    frequency = np.concatenate([np.broadcast_to(t[3], t[0].shape) for t in terms])
+    lengths = [t[0].shape[0] for t in terms]
+    series = np.repeat(np.arange(len(methods)), lengths)
+    dates = np.concatenate([m.debt.prices.index.values.astype('datetime64[ns]') for m in methods])
+
+    def price_fn(yields, rows):
+        return discounted_value(yields, tenor[rows], amounts[rows], frequency[rows])
+
+    result = solver.solve(price_fn, target, series=series, steps=dates, block=block,
+                          lower=-0.99 * np.maximum(frequency, 1))
+
+    start = 0
+    for m, length in zip(methods, lengths):
+        m.debt.historic_ytm = pd.Series(result.yields[start:start + length], index=m.debt.prices.index, name='ytm')
+        start += length
+    return result
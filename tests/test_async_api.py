@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from async_api import AsyncPricing, csv_source, stream_source
+from asset import Asset, AssetMethods
+from bill import Bill, BillMethods
+
+
+class AsyncPricingTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.dates = pd.date_range('2022-01-06', periods=200, freq='D')
+        self.discounts = [pd.Series(rng.uniform(0.5, 5., 200), index=self.dates, name='discount') for _ in range(6)]
+        self.methods = []
+        for i in range(6):
+            bill_methods = BillMethods(Bill())
+            bill_methods.set_attributes(isin=f'BILL{i:04d}', inception=datetime(2022, 1, 6),
+                                        maturity=datetime(2023, 1, 5), face_value=100)
+            self.methods.append(bill_methods)
+        self.running = self.peak = 0
+
+    def source(self, discounts):
+        async def load():
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            return discounts
+        return load
+
+    def assert_calculated(self, bill_methods, discounts):
+        expected = BillMethods(Bill())
+        expected.set_attributes(isin='X', inception=datetime(2022, 1, 6), maturity=datetime(2023, 1, 5),
+                                face_value=100)
+        expected.set_price_history(discounts)
+        # csv/socket sources come back without the index freq
+        assert_series_equal(bill_methods.bill.prices, expected.bill.prices, check_freq=False)
+        assert_series_equal(bill_methods.bill.historic_ytm, expected.calc_ytm(return_series=True), check_freq=False)
+        assert_series_equal(bill_methods.bill.discounts, expected.calc_discount(return_series=True),
+                            check_freq=False)
+
+    async def test_refresh_all_limits_concurrency(self):
+        pricing = AsyncPricing(max_concurrency=2)
+        result = await pricing.refresh_all(zip(self.methods, map(self.source, self.discounts)))
+        self.assertEqual(result, self.methods)
+        self.assertEqual(self.peak, 2)
+        for bill_methods, discounts in zip(self.methods, self.discounts):
+            self.assert_calculated(bill_methods, discounts)
+
+    async def test_csv_source(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'prices.csv')
+            self.discounts[0].to_csv(path)
+            pricing = AsyncPricing()
+            await pricing.load_all([(self.methods[0], csv_source(path))])
+            await pricing.recalc_all(self.methods[:1])
+        self.assert_calculated(self.methods[0], self.discounts[0])
+
+    async def test_stream_source(self):
+        payload = self.discounts[1].to_csv().encode()
+
+        async def serve(reader, writer):
+            writer.write(payload)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(serve, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await AsyncPricing().refresh(self.methods[1], stream_source(reader))
+            writer.close()
+        self.assert_calculated(self.methods[1], self.discounts[1])
+
+    async def test_asset_prices(self):
+        asset = Asset()
+        await AsyncPricing().load(AssetMethods(asset), self.source(self.discounts[2]))
+        assert_series_equal(asset.prices, self.discounts[2])
+
+    async def test_process_pool_rejected(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            with self.assertRaises(AssertionError):
+                AsyncPricing(executor=executor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from batch import run_bill_analytics
+from bill import Bill, BillMethods
+
+
+class BatchRunnerTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.bills = []
+        for i in range(25):
+            inception = pd.Timestamp('2019-01-02') + pd.Timedelta(days=int(rng.integers(0, 400)))
+            maturity = inception + pd.Timedelta(days=int(rng.choice([91, 182, 364, 366, 728])))
+            bill = Bill()
+            bill_methods = BillMethods(bill)
+            bill_methods.set_attributes(isin=f'BILL{i:04d}', inception=inception, maturity=maturity, face_value=100)
+            dates = pd.date_range(inception, maturity - pd.Timedelta(days=1), freq='B')
+            bill_methods.set_price_history(pd.Series(rng.uniform(0.5, 6., dates.shape[0]), index=dates))
+            self.bills.append(bill)
+
+    def test_matches_serial_run(self):
+        expected = []
+        for bill in self.bills:
+            bill_methods = BillMethods(bill)
+            expected.append((bill_methods.calc_ytm(return_series=True, incremental=False),
+                             bill_methods.calc_discount(return_series=True, incremental=False)))
+            bill.historic_ytm = bill.discounts = None
+
+        run_bill_analytics(self.bills, max_workers=2, chunk_size=4)
+        for bill, (ytm, discounts) in zip(self.bills, expected):
+            assert_series_equal(bill.historic_ytm, ytm, check_exact=True)
+            assert_series_equal(bill.discounts, discounts, check_exact=True)
+
+    def test_incremental_after_batch(self):
+        run_bill_analytics(self.bills[:3], max_workers=1)
+        bill = self.bills[0]
+        bill_methods = BillMethods(bill)
+        bill_methods.update_price(pd.Series([3.], index=[bill.prices.index[-1]]))
+        assert_series_equal(bill_methods.calc_ytm(return_series=True),
+                            bill_methods.calc_ytm(return_series=True, incremental=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
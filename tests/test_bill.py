@@ -10,7 +10,7 @@ from pandas.testing import assert_series_equal
 package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
 sys.path.append(package_path)
 from bill import Bill, BillMethods
-from conventions import ACT_360
+from conventions import ACT_360, ACT_365F
 
 
 class TestBillMethods(unittest.TestCase):
@@ -29,6 +29,13 @@ class TestBillMethods(unittest.TestCase):
         self.bill_methods.set_attributes(isin=isin, maturity=maturity, face_value=face_value, inception=inception)
         assert_series_equal(self.bill.pmt_schedule, pmt_schedule)
 
+    def test_calc_tenor(self):
+        self.bill.maturity = datetime(2023, 6, 29)
+        dates = pd.date_range(start='2023-01-01', periods=3)
+        np.testing.assert_array_equal(self.bill_methods.calc_tenor(dates), np.array([179, 178, 177]) / 365)
+        np.testing.assert_array_equal(self.bill_methods.calc_tenor(dates, basis='price'),
+                                      np.array([179, 178, 177]) / 360)
+
     def test_calc_ytm(self):
         self.bill.maturity = datetime(2023, 6, 29)
         self.bill.prices = pd.Series([90, 91, 92, 93, 94], index=pd.date_range(start='2023-01-01', periods=5))
@@ -74,6 +81,57 @@ class TestBillMethods(unittest.TestCase):
                                       index=pd.date_range(start='2023-01-01', periods=5))
         assert_series_equal(self.bill.prices, expected_prices)
 
+    def test_calc_ytm_incremental(self):
+        self.bill.maturity = datetime(2023, 6, 29)
+        discounts = pd.Series([5, 6, 7, 8, 9], name='discount', index=pd.date_range(start='2023-01-01', periods=5))
+        self.bill_methods.set_price_history(discounts)
+        self.bill_methods.calc_ytm()
+        self.bill_methods.calc_discount()
+        
+        # only the dates touched by update_price are recomputed, the rest is spliced in
+        self.bill.historic_ytm.iloc[0] = -1.
+        self.bill_methods.update_price(pd.Series([10, 11], index=pd.date_range(start='2023-01-05', periods=2)))
+        ytm = self.bill_methods.calc_ytm(return_series=True)
+        discount = self.bill_methods.calc_discount(return_series=True)
+        self.assertEqual(ytm.iloc[0], -1.)
+        
+        full_ytm = self.bill_methods.calc_ytm(return_series=True, incremental=False)
+        full_discount = self.bill_methods.calc_discount(return_series=True, incremental=False)
+        assert_series_equal(ytm.iloc[1:], full_ytm.iloc[1:])
+        assert_series_equal(discount, full_discount)
+        
+    def test_calc_ytm_after_direct_assignment(self):
+        self.bill.maturity = datetime(2023, 6, 29)
+        self.bill.prices = pd.Series([90, 91, 92], index=pd.date_range(start='2023-01-01', periods=3))
+        self.bill_methods.calc_ytm()
+        self.bill_methods.calc_discount()
+
+        # no price changed, but every row depends on the maturity and the convention
+        self.bill.maturity = datetime(2023, 9, 28)
+        assert_series_equal(self.bill_methods.calc_ytm(return_series=True),
+                            self.bill_methods.calc_ytm(return_series=True, incremental=False))
+        self.bill.convention = ACT_365F()
+        assert_series_equal(self.bill_methods.calc_discount(return_series=True),
+                            self.bill_methods.calc_discount(return_series=True, incremental=False))
+        self.assertAlmostEqual(self.bill.discounts.iloc[0], 10 / (270 / 365), places=6)
+
+    def test_calc_discount_precision_change(self):
+        self.bill.maturity = datetime(2023, 6, 29)
+        self.bill.prices = pd.Series([90, 91, 92], index=pd.date_range(start='2023-01-01', periods=3))
+        self.bill_methods.calc_discount(precision=2)
+        discount = self.bill_methods.calc_discount(return_series=True)
+        self.assertAlmostEqual(discount.iloc[0], 20.111732, places=6)
+        
+    def test_calc_latest(self):
+        self.bill.maturity = datetime(2023, 6, 29)
+        self.bill.prices = pd.Series([90, 91, 92, 93, 94], index=pd.date_range(start='2023-01-01', periods=5))
+        latest = self.bill_methods.calc_latest()
+        self.assertEqual(latest.name, pd.Timestamp('2023-01-05'))
+        self.assertEqual(latest['price'], 94)
+        self.assertAlmostEqual(latest['ytm'], 0.13313070, places=8)
+        self.assertAlmostEqual(latest['discount'], 12.342857, places=6)
+        self.assertIsNone(self.bill.historic_ytm)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from bill_book import BillBook, BillBookMethods
+
+
+class TestBillBookMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.bills = []
+        maturities = [datetime(2023, 6, 29), datetime(2024, 1, 4), datetime(2025, 3, 1)]
+        inceptions = [datetime(2022, 12, 29), datetime(2023, 1, 5), datetime(2022, 2, 28)]
+        for i, (inception, maturity) in enumerate(zip(inceptions, maturities)):
+            bill = Bill()
+            bill_methods = BillMethods(bill)
+            bill_methods.set_attributes(isin=f'BILL{i}', inception=inception, maturity=maturity, face_value=100)
+            discounts = pd.Series(np.linspace(4, 6, 20) + i, index=pd.date_range('2023-01-05', periods=20))
+            bill_methods.set_price_history(discounts)
+            self.bills.append(bill)
+
+        self.book = BillBook()
+        self.book_methods = BillBookMethods(self.book)
+        self.book_methods.add_bills(self.bills)
+
+    def test_add_bills(self):
+        np.testing.assert_array_equal(self.book.isin, ['BILL0', 'BILL1', 'BILL2'])
+        self.assertEqual(self.book.maturity.dtype, np.dtype('datetime64[ns]'))
+        self.assertEqual(list(self.book.prices.index.names), ['date', 'isin'])
+        self.assertEqual(self.book.prices.shape[0], 60)
+
+    def test_add_bills_mixed_conventions(self):
+        other = Bill()
+        BillMethods(other).set_attributes(isin='BILL3', inception=datetime(2023, 1, 5), maturity=datetime(2023, 7, 6),
+                                          face_value=100, convention='ACT/365F')
+        with self.assertRaises(AssertionError):
+            BillBookMethods(BillBook()).add_bills(self.bills + [other])
+
+    def test_calc_ytm_matches_bill_methods(self):
+        ytm = self.book_methods.calc_ytm(return_series=True)
+        for bill in self.bills:
+            expected = BillMethods(bill).calc_ytm(return_series=True)
+            assert_series_equal(ytm.xs(bill.isin, level='isin').rename_axis(None), expected, check_exact=True, check_freq=False)
+
+    def test_calc_discount_matches_bill_methods(self):
+        discounts = self.book_methods.calc_discount(return_series=True)
+        for bill in self.bills:
+            expected = BillMethods(bill).calc_discount(return_series=True)
+            assert_series_equal(discounts.xs(bill.isin, level='isin').rename_axis(None), expected, check_exact=True, check_freq=False)
+
+    def test_calc_price_matches_bill_methods(self):
+        discounts = self.book_methods.calc_discount(return_series=True)
+        prices = self.book_methods.calc_price(discounts)
+        for bill in self.bills:
+            expected = BillMethods(bill).calc_price(discounts.xs(bill.isin, level='isin').rename_axis(None))
+            assert_series_equal(prices.xs(bill.isin, level='isin').rename_axis(None), expected, check_exact=True, check_freq=False)
+
+    def test_update_price(self):
+        index = pd.MultiIndex.from_tuples([(pd.Timestamp('2023-01-24'), 'BILL1'), (pd.Timestamp('2023-01-25'), 'BILL1')],
+                                          names=['date', 'isin'])
+        self.book_methods.update_price(pd.Series([10., 11.], index=index))
+        self.assertEqual(self.book.prices.shape[0], 61)
+        assert_series_equal(self.book.prices.loc[index], self.book_methods.calc_price(pd.Series([10., 11.], index=index)))
+
+    def test_unknown_isin(self):
+        index = pd.MultiIndex.from_tuples([(pd.Timestamp('2023-01-24'), 'XXX')], names=['date', 'isin'])
+        with self.assertRaises(AssertionError):
+            self.book_methods.calc_price(pd.Series([10.], index=index))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from business_calendar import BusinessCalendar, CALENDARS, get_calendar, load_calendar
+from cashflows import CashFlowMethods
+from conventions import ACT_360
+from debt import Debt, DebtMethods
+
+
+def days(*dates):
+    return np.array(dates, dtype='datetime64[D]')
+
+
+class BusinessCalendarTest(unittest.TestCase):
+    def setUp(self):
+        # 2024-07-04 is a Thursday, 2024-12-25 a Wednesday, 2025-01-01 a Wednesday
+        self.calendar = BusinessCalendar(['2024-12-25', '2024-07-04', '2025-01-01', '2024-07-04'])
+
+    def test_holidays(self):
+        np.testing.assert_array_equal(self.calendar.holidays, days('2024-07-04', '2024-12-25', '2025-01-01'))
+        np.testing.assert_array_equal(self.calendar.is_holiday(['2024-07-04', '2024-07-05', '2025-01-02']),
+                                      [True, False, False])
+        np.testing.assert_array_equal(self.calendar.is_business_day(['2024-07-04', '2024-07-05', '2024-07-06']),
+                                      [False, True, False])
+
+    def test_adjust(self):
+        dates = ['2024-07-04', '2024-08-31', '2024-06-29', '2024-07-05']
+        np.testing.assert_array_equal(self.calendar.adjust(dates, 'following'),
+                                      days('2024-07-05', '2024-09-02', '2024-07-01', '2024-07-05'))
+        np.testing.assert_array_equal(self.calendar.adjust(dates, 'modified_following'),
+                                      days('2024-07-05', '2024-08-30', '2024-06-28', '2024-07-05'))
+        np.testing.assert_array_equal(self.calendar.adjust(dates, 'preceding'),
+                                      days('2024-07-03', '2024-08-30', '2024-06-28', '2024-07-05'))
+        np.testing.assert_array_equal(self.calendar.adjust(dates, 'unadjusted'), days(*dates))
+        with self.assertRaises(AssertionError):
+            self.calendar.adjust(dates, 'nearest')
+
+    def test_settlement(self):
+        np.testing.assert_array_equal(self.calendar.settlement(['2024-07-03', '2024-12-23', '2024-12-28'], lag=2),
+                                      days('2024-07-08', '2024-12-26', '2025-01-02'))
+        self.assertEqual(self.calendar.business_days_between('2024-12-23', '2025-01-06'), 8)
+
+    def test_schedule(self):
+        # day 31 is clamped to February's last day, weekends roll without leaving the month
+        dates = self.calendar.schedule(datetime(2024, 5, 10), datetime(2026, 8, 31), frequency=2)
+        expected = pd.DatetimeIndex(['2024-08-30', '2025-02-28', '2025-08-29', '2026-02-27', '2026-08-31'])
+        self.assertTrue(dates.equals(expected))
+
+    def test_payment_schedule(self):
+        schedule = self.calendar.payment_schedule(datetime(2024, 1, 2), datetime(2026, 1, 2), 0.05, 1000,
+                                                  frequency=2)
+        self.assertEqual(list(schedule.columns), ['interest', 'principal'])
+        np.testing.assert_allclose(schedule['interest'], 25.)
+        np.testing.assert_allclose(schedule['principal'], [0, 0, 0, 1000])
+        accrued = self.calendar.payment_schedule(datetime(2024, 1, 2), datetime(2026, 1, 2), 0.05, 1000,
+                                                 frequency=2, convention=ACT_360)
+        starts = [datetime(2024, 1, 2), *schedule.index[:-1]]
+        np.testing.assert_allclose(accrued['interest'],
+                                   [1000 * 0.05 * (end - start).days / 360 for start, end in zip(starts, schedule.index)])
+        # conventions may be named, as in Debt.set_attributes
+        named = self.calendar.payment_schedule(datetime(2024, 1, 2), datetime(2026, 1, 2), 0.05, 1000,
+                                               frequency=2, convention='act/360')
+        np.testing.assert_array_equal(named['interest'], accrued['interest'])
+
+    def test_schedule_rolled_to_inception(self):
+        # maturity on a Sunday rolls back to Friday 2024-01-05, the inception date itself
+        with self.assertRaises(AssertionError):
+            self.calendar.schedule(datetime(2024, 1, 5), datetime(2024, 1, 7))
+        self.assertTrue(self.calendar.schedule(datetime(2024, 1, 4), datetime(2024, 1, 7)).equals(
+            pd.DatetimeIndex(['2024-01-05'])))
+
+    def test_debt_schedule(self):
+        debt = Debt()
+        methods = DebtMethods(debt)
+        rate = pd.Series([0.04, 0.06], index=pd.to_datetime(['2024-01-02', '2025-01-02']))
+        methods.set_attributes(inception=datetime(2024, 1, 2), maturity=datetime(2026, 1, 2), rate=rate,
+                               face_value=100, calendar=self.calendar)
+        methods.set_pmt_schedule(frequency=2)
+        np.testing.assert_allclose(debt.pmt_schedule['interest'], [2, 2, 3, 3])
+        # the schedule prices like any other coupon debt
+        CashFlowMethods(debt).dirty_price(0.05, dates=[datetime(2024, 1, 2)])
+
+    def test_registry(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'holidays.csv')
+            with open(path, 'w') as f:
+                f.write('# test holidays\n2024-12-25\n2025-01-01,New Year\n')
+            calendar = load_calendar('TEST', path)
+            try:
+                self.assertIs(load_calendar('TEST', path), calendar)
+                self.assertIs(get_calendar('TEST'), calendar)
+                np.testing.assert_array_equal(calendar.holidays, days('2024-12-25', '2025-01-01'))
+                debts = [Debt() for _ in range(3)]
+                for debt in debts:
+                    DebtMethods(debt).set_attributes(inception=datetime(2024, 1, 2), maturity=datetime(2025, 1, 2),
+                                                     calendar=get_calendar('TEST'))
+                self.assertTrue(all(debt.calendar.holidays is calendar.holidays for debt in debts))
+            finally:
+                CALENDARS.pop('TEST')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from cashflows import CashFlowMethods
+from debt import Debt
+
+
+class CashFlowMethodsTest(unittest.TestCase):
+    def setUp(self):
+        self.debt = Debt()
+        self.methods = CashFlowMethods(self.debt)
+        pay_dates = pd.to_datetime(['2022-01-01', '2023-01-01', '2024-01-01'])
+        pmt_schedule = pd.DataFrame({'interest': [50., 50., 50.], 'principal': [0., 0., 1000.]}, index=pay_dates)
+        self.methods.set_attributes(inception=datetime(2021, 1, 1), maturity=datetime(2024, 1, 1),
+                                    face_value=1000, pmt_schedule=pmt_schedule)
+
+    def test_par_bond(self):
+        self.assertAlmostEqual(self.methods.dirty_price(0.05, dates=[datetime(2021, 1, 1)])[0], 100., places=10)
+        self.assertAlmostEqual(self.methods.dirty_price(0.05, dates=[datetime(2022, 1, 1)])[0], 100., places=10)
+
+    def test_accrued_interest(self):
+        accrued = self.methods.accrued_interest(pd.to_datetime(['2021-01-01', '2021-07-02', '2022-01-01', '2024-01-01']))
+        np.testing.assert_allclose(accrued, [0., 5 * 182 / 365, 0., 0.])
+
+    def test_clean_price(self):
+        dates = pd.to_datetime(['2021-07-02', '2022-03-15'])
+        np.testing.assert_allclose(self.methods.clean_price(0.04, dates),
+                                   self.methods.dirty_price(0.04, dates) - self.methods.accrued_interest(dates))
+
+    def test_dirty_price_matches_loop(self):
+        dates = pd.date_range('2021-01-01', '2023-12-31', freq='37D')
+        convention = self.debt.convention
+        expected = []
+        for date in dates:
+            pv = 0.
+            for pay_date, (interest, principal) in self.debt.pmt_schedule.iterrows():
+                if pay_date > date:
+                    pv += (interest + principal) / 1.04 ** convention.year_frac_ytm(date, pay_date)
+            expected.append(pv / 10)
+        np.testing.assert_allclose(self.methods.dirty_price(0.04, dates), expected, rtol=1e-13)
+
+    def test_calc_ytm(self):
+        dates = pd.date_range('2021-01-01', '2023-12-30', freq='D')
+        true_yields = np.linspace(-0.01, 0.12, dates.shape[0])
+        clean = self.methods.dirty_price(true_yields, dates) - self.methods.accrued_interest(dates)
+        self.methods.set_price_history(pd.Series(clean, index=dates))
+        ytm = self.methods.calc_ytm(return_series=True)
+        self.assertEqual(ytm.name, 'ytm')
+        np.testing.assert_allclose(ytm.values, true_yields, atol=1e-10)
+        assert_series_equal(self.debt.historic_ytm, ytm)
+
+    def test_calc_ytm_semi_annual_and_maturity(self):
+        dates = pd.to_datetime(['2021-03-01', '2024-01-01'])
+        clean = self.methods.clean_price(0.03, dates, frequency=2)
+        self.methods.set_price_history(pd.Series(clean, index=dates))
+        ytm = self.methods.calc_ytm(return_series=True, frequency=2)
+        self.assertAlmostEqual(ytm.iloc[0], 0.03, places=10)
+        self.assertTrue(np.isnan(ytm.iloc[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,17 @@
 import os
 import sys
 import unittest
+from datetime import datetime
+from functools import partial
 
+import numpy as np
 import pandas as pd
 
 package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
 sys.path.append(package_path)
-from conventions import ACT_360
+from conventions import (ACT_360, ACT_365F, ACT_ACT_ISDA, THIRTY_360_US, THIRTY_E_360, DayCountCache,
+                         get_convention)
+from bill import Bill, BillMethods
 
 class TestACT_360(unittest.TestCase):
     
@@ -90,6 +95,163 @@ class TestACT_360(unittest.TestCase):
         year_frac = day_count.year_frac_price(self.sf_leap, self.ed_leap)
         self.assertAlmostEqual(year_frac, 0.761111, places=6)
         
+    def test_array_methods_match_scalar(self):
+        start_dates = pd.date_range('2014-07-01', '2021-08-01', freq='17D')
+        end_dates = pd.date_range('2016-02-01', periods=start_dates.shape[0], freq='5D')
+        day_counts = [ACT_360(),
+                      ACT_360(inception=pd.to_datetime('2017-07-01')),
+                      ACT_360(inception=pd.to_datetime('2017-07-01'), maturity=pd.to_datetime('2018-04-01')),
+                      ACT_360(inception=pd.to_datetime('2019-09-01'), maturity=pd.to_datetime('2020-09-01')),
+                      ACT_360(inception=pd.to_datetime('2019-06-01'), maturity=pd.to_datetime('2019-09-01')),
+                      ACT_360(inception=pd.to_datetime('2016-02-29'), maturity=pd.to_datetime('2017-02-28'))]
+        for day_count in day_counts:
+            for scalar, array in [(day_count.numerator, day_count.numerator_array),
+                                  (day_count.year_frac_ytm, day_count.year_frac_ytm_array),
+                                  (day_count.year_frac_price, day_count.year_frac_price_array)]:
+                expected = [scalar(start, end) for start, end in zip(start_dates, end_dates)]
+                np.testing.assert_array_equal(array(start_dates, end_dates), expected)
+                
+                expected = [scalar(start, self.ed_leap) for start in start_dates]
+                np.testing.assert_array_equal(array(start_dates.values, self.ed_leap), expected)
+                
+    def test_calc_days_array(self):
+        days = self.day_count.calc_days_array(pd.DatetimeIndex([self.start_date, self.sf_leap]), self.end_date)
+        np.testing.assert_array_equal(days, [364, 1644])
+        
+        
+class TestDayCountCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.cache = DayCountCache(maxsize=2)
+        self.start_date = pd.to_datetime('2019-07-01')
+        self.end_date = pd.to_datetime('2020-03-31')
+        
+    def test_hits_and_misses(self):
+        day_count = ACT_360(cache=self.cache)
+        year_frac = day_count.year_frac_price(self.start_date, self.end_date)
+        self.assertEqual(day_count.year_frac_price(self.start_date, self.end_date), year_frac)
+        self.assertEqual(self.cache.info()['hits'], 1)
+        self.assertEqual(self.cache.info()['misses'], 1)
+        
+    def test_shared_between_instances(self):
+        first = ACT_360(inception=pd.to_datetime('2019-06-01'), maturity=pd.to_datetime('2020-05-31'), cache=self.cache)
+        second = ACT_360(inception=pd.to_datetime('2019-06-01'), maturity=pd.to_datetime('2020-05-31'), cache=self.cache)
+        other = ACT_360(inception=pd.to_datetime('2016-06-01'), maturity=pd.to_datetime('2017-05-31'), cache=self.cache)
+        
+        self.assertEqual(first.numerator(), 366)
+        self.assertEqual(second.numerator(), 366)
+        self.assertEqual(other.numerator(), 365)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 2)
+        
+    def test_eviction_and_clear(self):
+        day_count = ACT_360(cache=self.cache)
+        for end_date in pd.date_range('2020-01-01', periods=3):
+            self.assertAlmostEqual(day_count.year_frac_ytm(self.start_date, end_date),
+                                   ACT_360().year_frac_ytm(self.start_date, end_date))
+        # year_frac_ytm also caches the numerator it calls
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 4)
+        
+        self.cache.clear()
+        self.assertEqual(self.cache.info(), {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 2})
+
+    def test_intraday_timestamps(self):
+        # midnight and intraday starts on the same day are different keys
+        day_count = ACT_360(cache=self.cache)
+        end_date = pd.Timestamp('2023-06-29')
+        for start_date in [pd.Timestamp('2023-01-01 12:00'), pd.Timestamp('2023-01-01'), pd.Timestamp('2023-01-01 12:00')]:
+            self.assertEqual(day_count.year_frac_price(start_date, end_date),
+                             ACT_360().year_frac_price(start_date, end_date))
+        self.assertAlmostEqual(day_count.year_frac_price(pd.Timestamp('2023-01-01'), end_date), 179 / 360)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_bill_history_blocks(self):
+        # calc_ytm/calc_discount go through the array methods, one entry per price history
+        cache = DayCountCache()
+        bill = Bill()
+        methods = BillMethods(bill)
+        methods.set_attributes(isin='BILL', inception=datetime(2023, 1, 5), maturity=datetime(2023, 7, 6),
+                               face_value=100, convention=partial(ACT_360, cache=cache))
+        dates = pd.date_range('2023-01-05', '2023-06-30', freq='D')
+        methods.set_price_history(pd.Series(np.linspace(5., 0.1, dates.shape[0]), index=dates))
+        first = methods.calc_ytm(return_series=True, incremental=False)
+        second = methods.calc_ytm(return_series=True, incremental=False)
+        pd.testing.assert_series_equal(first, second)
+        self.assertEqual(cache.hits, 1)
+
+        uncached = Bill()
+        BillMethods(uncached).set_attributes(isin='BILL', inception=datetime(2023, 1, 5),
+                                             maturity=datetime(2023, 7, 6), face_value=100)
+        uncached.prices = bill.prices
+        pd.testing.assert_series_equal(BillMethods(uncached).calc_ytm(return_series=True), first)
+        tenor = methods.calc_tenor(dates)
+        self.assertFalse(tenor.flags.writeable)
+        self.assertEqual(cache.hits, 2)
+
+
+
+class TestKernelConventions(unittest.TestCase):
+    
+    def setUp(self):
+        # seeded random pairs, with month ends and the end of February over-represented
+        rng = np.random.default_rng(42)
+        days = pd.Timestamp('1999-01-01') + pd.to_timedelta(rng.integers(0, 365 * 40, 4000), unit='D')
+        month_ends = pd.DatetimeIndex(rng.choice(pd.date_range('1999-01-31', '2039-12-31', freq='ME'), 2000))
+        around = pd.date_range('1999-02-28', '2039-03-01', freq='D')
+        around = around[(around.month == 2) & (around.day >= 28) | (around.month == 3) & (around.day == 1)]
+        februaries = pd.DatetimeIndex(rng.choice(around, 1000))
+        dates = days.append(month_ends).append(februaries)
+        self.start_dates = pd.DatetimeIndex(rng.permutation(dates.values))
+        self.end_dates = pd.DatetimeIndex(rng.permutation(dates.values))
+        
+    def test_known_values(self):
+        start, end = pd.to_datetime('2024-02-29'), pd.to_datetime('2024-08-31')
+        self.assertEqual(THIRTY_360_US().calc_days(start, end), 180)
+        self.assertEqual(THIRTY_E_360().calc_days(start, end), 181)
+        self.assertEqual(THIRTY_360_US().calc_days(pd.to_datetime('2023-02-28'), pd.to_datetime('2024-02-29')), 360)
+        self.assertAlmostEqual(ACT_365F().year_frac_ytm(pd.to_datetime('2024-01-01'), pd.to_datetime('2025-01-01')),
+                               366 / 365)
+        self.assertAlmostEqual(ACT_ACT_ISDA().year_frac_price(pd.to_datetime('2023-12-15'), pd.to_datetime('2024-06-15')),
+                               17 / 365 + 166 / 366)
+        self.assertAlmostEqual(ACT_ACT_ISDA().year_frac_ytm(pd.to_datetime('2020-01-01'), pd.to_datetime('2023-01-01')), 3)
+        
+    def test_array_methods_match_scalar(self):
+        for convention in (ACT_365F, ACT_ACT_ISDA, THIRTY_360_US, THIRTY_E_360):
+            day_count = convention()
+            for scalar, array in [(day_count.calc_days, day_count.calc_days_array),
+                                  (day_count.year_frac_ytm, day_count.year_frac_ytm_array),
+                                  (day_count.year_frac_price, day_count.year_frac_price_array)]:
+                expected = [scalar(start, end) for start, end in zip(self.start_dates, self.end_dates)]
+                np.testing.assert_array_equal(array(self.start_dates, self.end_dates), expected,
+                                              err_msg=f'{convention.__name__}.{scalar.__name__}')
+                
+    def test_cached_scalar(self):
+        cache = DayCountCache()
+        day_count = THIRTY_E_360(cache=cache)
+        for _ in range(2):
+            self.assertEqual(day_count.year_frac_price(self.start_dates[0], self.end_dates[0]),
+                             THIRTY_E_360().year_frac_price(self.start_dates[0], self.end_dates[0]))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        
+    def test_registry(self):
+        self.assertIs(get_convention('act/365f'), ACT_365F)
+        self.assertIs(get_convention('30/360 US'), THIRTY_360_US)
+        self.assertIs(get_convention('ACT_ACT_ISDA'), ACT_ACT_ISDA)
+        self.assertIs(get_convention(ACT_360), ACT_360)
+        with self.assertRaises(KeyError):
+            get_convention('BUS/252')
+
+    def test_partial_convention(self):
+        # a shared cache is passed in through partial, as before the registry
+        cache = DayCountCache()
+        bill = Bill()
+        BillMethods(bill).set_attributes(isin='BILL', inception=datetime(2023, 1, 5), maturity=datetime(2023, 7, 6),
+                                         face_value=100, convention=partial(ACT_365F, cache=cache))
+        self.assertIsInstance(bill.convention, ACT_365F)
+        self.assertIs(bill.convention.cache, cache)
+        self.assertAlmostEqual(bill.convention.year_frac_price(bill.inception, bill.maturity), 182 / 365)
+        
         
 if __name__ == '__main__':
     unittest.main()
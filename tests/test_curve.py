@@ -0,0 +1,118 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from bill_book import BillBook, BillBookMethods
+from curve import Curve, YieldCurve, zero_rates
+from lru import LRUCache
+
+try:
+    from scipy.interpolate import PchipInterpolator
+except ImportError:
+    PchipInterpolator = None
+
+
+def make_bills():
+    # weekly 26-week bills quoted every day, so each date has a handful of points
+    rng = np.random.default_rng(0)
+    bills = []
+    for i in range(8):
+        bill = Bill()
+        methods = BillMethods(bill)
+        inception = datetime(2022, 1, 6) + pd.Timedelta(days=7 * i)
+        methods.set_attributes(isin=f'BILL{i}', inception=inception, maturity=inception + pd.Timedelta(days=182),
+                               face_value=100)
+        dates = pd.date_range(inception, datetime(2022, 4, 30), freq='D')
+        methods.set_price_history(pd.Series(rng.uniform(0.5, 5., dates.shape[0]), index=dates))
+        methods.calc_ytm()
+        bills.append(bill)
+    return bills
+
+
+class YieldCurveTest(unittest.TestCase):
+    def setUp(self):
+        self.bills = make_bills()
+        self.curves = YieldCurve.from_bills(self.bills)
+
+    def test_points_are_bill_zero_rates(self):
+        date = pd.Timestamp('2022-03-01')
+        curve = self.curves.curve(date)
+        priced = [bill for bill in self.bills if date in bill.prices.index]
+        self.assertEqual(len(curve), len(priced))
+        for bill in priced:
+            tenor = BillMethods(bill).calc_tenor(pd.DatetimeIndex([date]))[0]
+            expected = -np.log(bill.prices[date] / 100) / tenor
+            self.assertAlmostEqual(float(curve.zero(tenor)), expected, places=12)
+            self.assertAlmostEqual(float(curve.discount(tenor)), bill.prices[date] / 100, places=12)
+
+    def test_from_book_matches_from_bills(self):
+        book = BillBook()
+        methods = BillBookMethods(book)
+        methods.add_bills(self.bills)
+        methods.calc_ytm()
+        curves = YieldCurve.from_book(book)
+        np.testing.assert_array_equal(curves.dates, self.curves.dates)
+        np.testing.assert_allclose(curves.zeros, self.curves.zeros, rtol=1e-12)
+
+    def test_vectorized_matches_curves(self):
+        tenors = np.linspace(0, 0.6, 25)
+        frame = self.curves.to_frame(tenors)
+        for method in ('linear', 'log_linear', 'monotone_cubic'):
+            curves = YieldCurve(self.curves.dates, self.curves.tenors, self.curves.zeros, method)
+            dates = curves.dates[::9]
+            expected = np.stack([curves.curve(date).zero(tenors) for date in dates])
+            np.testing.assert_allclose(curves.zero(dates[:, None], tenors[None]), expected, rtol=1e-12)
+        np.testing.assert_allclose(frame.values[::9], expected, rtol=1e-12)
+
+    def test_interpolation(self):
+        curve = Curve([0.5, 0.25, 1.], [0.03, 0.02, 0.05], method='linear')
+        np.testing.assert_allclose(curve.zero([0.1, 0.25, 0.375, 0.75, 2.]), [0.02, 0.02, 0.025, 0.04, 0.05])
+        curve = Curve([0.25, 0.5, 1.], [0.02, 0.03, 0.05], method='log_linear')
+        # ln(discount factor) is linear between the points
+        self.assertAlmostEqual(float(np.log(curve.discount(0.75))),
+                               (np.log(curve.discount(0.5)) + np.log(curve.discount(1.))) / 2, places=14)
+        self.assertAlmostEqual(float(curve.forward(0.5, 1.)), 0.07, places=14)
+
+    def test_monotone_cubic(self):
+        tenors, zeros = np.array([0.1, 0.3, 0.5, 0.6, 1.]), np.array([0.01, 0.02, 0.02, 0.03, 0.05])
+        curve = Curve(tenors, zeros)
+        grid = np.linspace(0.1, 1., 200)
+        self.assertTrue((np.diff(curve.zero(grid)) >= -1e-15).all())
+        if PchipInterpolator is not None:
+            np.testing.assert_allclose(curve.zero(grid), PchipInterpolator(tenors, zeros)(grid), rtol=1e-12)
+
+    def test_as_of_lookup_and_cache(self):
+        first = self.curves.dates[0]
+        self.assertTrue(np.isnan(self.curves.zero(first - np.timedelta64(1, 'D'), 0.25)))
+        curve = self.curves.curve(pd.Timestamp('2022-05-15'))
+        self.assertEqual(curve.date, pd.Timestamp(self.curves.dates[-1]))
+        self.assertIs(self.curves.curve(self.curves.dates[-1]), curve)
+        self.assertEqual(self.curves.cache.hits, 1)
+        self.assertIs(type(self.curves.cache), LRUCache)
+
+    def test_from_points(self):
+        dates = pd.to_datetime(['2022-01-03', '2022-01-03', '2022-01-03', '2022-01-04', '2022-01-04'])
+        curves = YieldCurve.from_points(dates, [0.5, 0.25, 0.5, 0.25, 0.], [0.03, 0.02, 0.05, 0.01, 0.04])
+        np.testing.assert_array_equal(curves.counts, [2, 1])
+        np.testing.assert_allclose(curves.zeros[0], [0.02, 0.04])
+        np.testing.assert_allclose(curves.zero(dates[3], [0.1, 1.]), [0.01, 0.01])
+        self.assertAlmostEqual(zero_rates(0.04, 0.5), np.log(1.02) / 0.5)
+
+    def test_single_point(self):
+        dates = pd.to_datetime(['2022-01-03', '2022-01-04', '2022-01-04'])
+        for method in ('linear', 'log_linear', 'monotone_cubic'):
+            curves = YieldCurve.from_points(dates, [0.25, 0.25, 0.5], [0.036, 0.02, 0.03], method)
+            np.testing.assert_allclose(curves.zero(dates[0], [0.1, 0.25, 1.]), 0.036)
+            np.testing.assert_allclose(curves.curve(dates[0]).zero([0.1, 0.25, 1.]), 0.036)
+            np.testing.assert_allclose(Curve([0.25], [0.036], method).zero(0.25), 0.036)
+
+
+if __name__ == '__main__':
+    unittest.main()
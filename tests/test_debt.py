@@ -39,7 +39,7 @@ class DebtTests(unittest.TestCase):
         self.assertEqual(self.debt.inception, inception)
         self.assertEqual(self.debt.maturity, maturity)
         expected_rates = pd.Series(data=np.ones(5) * rate, index=pd.date_range(start=inception, end=maturity, freq='D'))
-        assert_series_equal(self.debt.rate, expected_rates, check_dtype=False)
+        assert_series_equal(self.debt.rate.to_series(), expected_rates, check_dtype=False)
         self.assertEqual(self.debt.face_value, face_value)
         assert_series_equal(self.debt.pmt_schedule, pmt_schedule)
         self.assertEqual(self.debt.convention, convention)
@@ -0,0 +1,102 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from ingest import TickIngestor
+
+
+def make_methods(isins):
+    methods = []
+    for isin in isins:
+        bill_methods = BillMethods(Bill())
+        bill_methods.set_attributes(isin=isin, inception=datetime(2022, 1, 6), maturity=datetime(2023, 1, 5),
+                                    face_value=100)
+        methods.append(bill_methods)
+    return methods
+
+
+class TickIngestorTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.isins = ['BILL0001', 'BILL0002', 'BILL0003']
+        dates = pd.Timestamp('2022-01-06') + pd.to_timedelta(np.sort(rng.integers(0, 300, 500)), unit='D')
+        self.records = list(zip(dates, rng.choice(self.isins, 500), rng.uniform(0.5, 5., 500).round(4)))
+
+    def test_matches_quote_by_quote(self):
+        expected = make_methods(self.isins)
+        by_isin = {m.bill.isin: m for m in expected}
+        for timestamp, isin, discount in self.records:
+            by_isin[isin].update_price(pd.Series([discount], index=pd.DatetimeIndex([timestamp]).as_unit('ns')))
+
+        methods = make_methods(self.isins)
+        stats = TickIngestor(methods, max_batch=32).run(self.records)
+        for bill_methods, expected_methods in zip(methods, expected):
+            assert_series_equal(bill_methods.bill.prices, expected_methods.bill.prices, check_names=False)
+        self.assertEqual(stats.records, 500)
+        self.assertEqual(stats.queue_depth, 0)
+        self.assertLessEqual(stats.max_queue_depth, 3 * 31 + 1)
+
+    def test_batches_on_count(self):
+        methods = make_methods(['BILL0001'])
+        records = [(pd.Timestamp('2022-02-01') + pd.Timedelta(days=i), 'BILL0001', 2.) for i in range(10)]
+        flushed = list(TickIngestor(methods, max_batch=4).stream(records))
+        self.assertEqual(flushed, [('BILL0001', 4), ('BILL0001', 4), ('BILL0001', 2)])
+        self.assertEqual(len(methods[0].bill.prices), 10)
+
+    def test_batches_on_window(self):
+        methods = make_methods(['BILL0001', 'BILL0002'])
+        start = pd.Timestamp('2022-02-01 09:00')
+        records = [(start, 'BILL0001', 2.), (start + pd.Timedelta(seconds=1), 'BILL0002', 2.1),
+                   (start + pd.Timedelta(seconds=2), 'BILL0001', 2.2),
+                   (start + pd.Timedelta(seconds=5), 'BILL0002', 2.3),
+                   (start + pd.Timedelta(seconds=6), 'BILL0001', 2.4)]
+        ingestor = TickIngestor(methods, window='5s')
+        stream = ingestor.stream(records)
+        self.assertEqual(next(stream), ('BILL0001', 2))
+        self.assertEqual(ingestor.stats.queue_depth, 2)
+        self.assertEqual(list(stream), [('BILL0002', 2), ('BILL0001', 1)])
+
+    def test_duplicates_and_rejected(self):
+        methods = make_methods(['BILL0001'])
+        date = pd.Timestamp('2022-02-01')
+        stats = TickIngestor(methods).run([(date, 'BILL0001', 2.), (date, 'UNKNOWN', 3.), (date, 'BILL0001', 1.)])
+        self.assertEqual(stats.rejected, 1)
+        self.assertEqual(stats.batches, 1)
+        self.assertEqual(methods[0].bill.prices.shape[0], 1)
+        assert_series_equal(methods[0].bill.prices,
+                            methods[0].calc_price(pd.Series([1.], index=pd.DatetimeIndex([date]).as_unit('ns'))))
+
+    def test_quotes_outside_life_rejected(self):
+        methods = make_methods(['BILL0001'])
+        records = [(pd.Timestamp('2022-02-01'), 'BILL0001', 2.), (pd.Timestamp('2023-02-01'), 'BILL0001', 3.),
+                   (pd.Timestamp('2021-12-01'), 'BILL0001', 3.), (pd.Timestamp('2022-02-02'), 'BILL0001', 2.1)]
+        stats = TickIngestor(methods, max_batch=8).run(records)
+        self.assertEqual((stats.records, stats.rejected, stats.batches, stats.queue_depth), (2, 2, 1, 0))
+        self.assertEqual(methods[0].bill.prices.shape[0], 2)
+
+    def test_failed_update_leaves_queue_consistent(self):
+        methods = make_methods(['BILL0001', 'BILL0002'])
+        ingestor = TickIngestor(methods, max_batch=8)
+        ingestor.push(pd.Timestamp('2022-02-01'), 'BILL0001', 2.)
+        ingestor.push(pd.Timestamp('2022-02-01'), 'BILL0002', 2.)
+        methods[0].bill.maturity = pd.Timestamp('2022-01-31')
+        with self.assertRaises(AssertionError):
+            ingestor.flush()
+        # nothing is lost: the failed batch is still queued and replays once the bill is fixed
+        self.assertEqual((ingestor.stats.queue_depth, ingestor.stats.batches), (2, 0))
+        methods[0].bill.maturity = pd.Timestamp('2022-07-31')
+        self.assertEqual(ingestor.flush(), [('BILL0001', 1), ('BILL0002', 1)])
+        self.assertEqual((ingestor.stats.queue_depth, ingestor.stats.batches), (0, 2))
+        self.assertEqual(methods[0].bill.price_store.dates[-1], np.datetime64('2022-02-01'))
+
+
+if __name__ == '__main__':
+    unittest.main()
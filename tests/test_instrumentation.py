@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from conventions import ACT_360, ACT_365F, THIRTY_E_360
+from instrumentation import DEFAULT_TARGETS, Instrumentation, REPORT_COLUMNS, profile
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.bill = Bill()
+        self.methods = BillMethods(self.bill)
+        self.methods.set_attributes(isin='BILL0', inception=datetime(2022, 1, 6), maturity=datetime(2022, 7, 7),
+                                    face_value=100)
+        self.discounts = pd.Series(np.linspace(1, 3, 150), index=pd.date_range('2022-01-06', periods=150))
+        self.registry = Instrumentation()
+
+    def tearDown(self):
+        self.registry.disable()
+
+    def test_disabled_leaves_originals(self):
+        originals = {target: self.registry.resolve(target)[0].__dict__[target.rsplit('.', 1)[1]]
+                     for target in DEFAULT_TARGETS}
+        self.registry.enable()
+        self.assertTrue(self.registry.enabled)
+        self.assertIsNot(BillMethods.__dict__['calc_ytm'], originals['bill.BillMethods.calc_ytm'])
+        self.registry.disable()
+        self.assertFalse(self.registry.enabled)
+        for target, original in originals.items():
+            owner, name = self.registry.resolve(target)
+            self.assertIs(owner.__dict__[name], original)
+        self.methods.set_price_history(self.discounts)
+        self.assertEqual(self.registry.stats, {})
+
+    def test_counts_and_rows(self):
+        self.registry.enable()
+        self.methods.set_price_history(self.discounts)
+        self.methods.calc_ytm(incremental=False)
+        self.methods.calc_ytm(incremental=False)
+        day_count = ACT_360(inception=datetime(2022, 1, 6), maturity=datetime(2022, 7, 7))
+        day_count.year_frac_ytm(datetime(2022, 2, 1), datetime(2022, 7, 7))
+        # the kernel conventions are timed through KernelDayCount, whichever subclass is called
+        ACT_365F().year_frac_ytm_array(self.discounts.index, datetime(2022, 7, 7))
+        THIRTY_E_360().year_frac_price(datetime(2022, 2, 1), datetime(2022, 7, 7))
+
+        report = self.registry.report()
+        self.assertEqual(list(report.columns), REPORT_COLUMNS)
+        self.assertEqual(report.loc['bill.BillMethods.calc_ytm', 'calls'], 2)
+        self.assertEqual(report.loc['bill.BillMethods.calc_tenor', 'calls'], 3)
+        self.assertEqual(report.loc['bill.BillMethods.calc_tenor', 'rows'], 450)
+        self.assertEqual(report.loc['bill.BillMethods.set_price_history', 'rows'], 150)
+        self.assertEqual(report.loc['conventions.ACT_360.year_frac_ytm', 'rows'], 1)
+        self.assertEqual(report.loc['conventions.KernelDayCount.year_frac_ytm_array', 'rows'], 150)
+        self.assertEqual(report.loc['conventions.KernelDayCount.year_frac_price', 'calls'], 1)
+        # calc_ytm takes no arrays, its rows are the bill's price history
+        self.assertEqual(report.loc['bill.BillMethods.calc_ytm', 'rows'], 300)
+        row = report.loc['bill.BillMethods.calc_ytm']
+        self.assertTrue(row['p50_us'] <= row['p99_us'] <= row['max_us'])
+        self.assertGreater(row['total_ms'], 0)
+
+    def test_profile(self):
+        stream = io.StringIO()
+        with profile(targets=['bill.BillMethods.calc_price'], registry=self.registry, stream=stream) as registry:
+            self.methods.calc_price(self.discounts)
+        self.assertFalse(registry.enabled)
+        self.assertIn('bill.BillMethods.calc_price', stream.getvalue())
+        self.assertEqual(list(registry.report().index), ['bill.BillMethods.calc_price'])
+
+    def test_profile_keeps_enabled_targets(self):
+        self.registry.enable(['bill.BillMethods.calc_tenor'])
+        targets = ['bill.BillMethods.calc_tenor', 'bill.BillMethods.calc_price']
+        with profile(targets=targets, registry=self.registry, stream=None):
+            self.methods.calc_price(self.discounts)
+        self.assertEqual(self.registry.patched, ['bill.BillMethods.calc_tenor'])
+        self.assertTrue(self.registry.is_patched('bill.BillMethods.calc_tenor'))
+        self.assertFalse(self.registry.is_patched('bill.BillMethods.calc_price'))
+        self.assertFalse(hasattr(BillMethods.__dict__['calc_price'], '__wrapped__'))
+        self.assertEqual(self.registry.report().loc['bill.BillMethods.calc_tenor', 'calls'], 1)
+
+    def test_reservoir_and_dump(self):
+        registry = Instrumentation(targets=['bill.BillMethods.calc_tenor'], max_samples=10)
+        registry.enable()
+        try:
+            for _ in range(50):
+                self.methods.calc_tenor(self.discounts.index)
+        finally:
+            registry.disable()
+        stats = registry.stats['bill.BillMethods.calc_tenor']
+        self.assertEqual((stats.calls, len(stats.samples), stats.rows), (50, 10, 7500))
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'report.json')
+            registry.dump(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)['bill.BillMethods.calc_tenor']['calls'], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill_book import BillBook, BillBookMethods
+from ledger import Ledger, LedgerMethods
+
+
+def replay(book, trades, date):
+    # lot by lot reference: sales scale every open lot of the bill by the unsold fraction
+    lots, cost, proceeds, removed = [], 0., 0., 0.
+    events = [(t, i, q, p) for i, t, q, p in trades if t <= date]
+    for i in {i for _, i, _, _ in events}:
+        maturity = book.maturity[list(book.isin).index(i)]
+        if maturity <= np.datetime64(date):
+            held = sum(q for _, j, q, _ in events if j == i)
+            if held:
+                events.append((pd.Timestamp(maturity), i, -held, 100.))
+    for t, i, q, p in sorted(events, key=lambda e: (e[1], e[0])):
+        maturity = pd.Timestamp(book.maturity[list(book.isin).index(i)])
+
+        def value(lot, at):
+            return lot[1] * (lot[2] + (100 - lot[2]) * (at - lot[0]).days / (maturity - lot[0]).days) / 100
+        if q > 0:
+            lots.append([t, q, p, i])
+            cost += q * p / 100
+        else:
+            open_lots = [lot for lot in lots if lot[3] == i and lot[1] > 0]
+            held = sum(lot[1] for lot in open_lots)
+            book_before = sum(value(lot, t) for lot in open_lots)
+            removed += -q / held * book_before
+            proceeds += -q * p / 100
+            for lot in open_lots:
+                lot[1] *= (held + q) / held
+    book_value = 0.
+    for t, q, p, i in lots:
+        maturity = pd.Timestamp(book.maturity[list(book.isin).index(i)])
+        if q > 1e-9:
+            book_value += q * (p + (100 - p) * (date - t).days / (maturity - t).days) / 100
+    return book_value, book_value - cost + removed, proceeds - removed
+
+
+class LedgerMethodsTest(unittest.TestCase):
+    def setUp(self):
+        self.book = BillBook()
+        book_methods = BillBookMethods(self.book)
+        book_methods.set_attributes(isin=['BILL0', 'BILL1', 'BILL2'],
+                                    inception=[datetime(2022, 1, 6), datetime(2022, 1, 6), datetime(2022, 2, 3)],
+                                    maturity=[datetime(2022, 4, 7), datetime(2022, 7, 7), datetime(2023, 2, 2)],
+                                    min_piece=[100, 1000, 100], increment=[100, 1000, 50])
+        dates = pd.date_range('2022-01-06', '2022-12-30', freq='D')
+        index = pd.MultiIndex.from_product([dates, self.book.isin], names=['date', 'isin'])
+        discounts = pd.Series(np.linspace(1, 4, index.shape[0]), index=index)
+        keep = (dates.values.repeat(3) >= np.tile(self.book.inception, dates.shape[0])) & \
+               (dates.values.repeat(3) <= np.tile(self.book.maturity, dates.shape[0]))
+        book_methods.set_price_history(discounts[keep])
+
+        self.ledger = Ledger()
+        self.methods = LedgerMethods(self.ledger)
+        self.methods.set_book(self.book)
+
+    def test_buy_and_partial_sale(self):
+        self.methods.add_trades('BILL0', datetime(2022, 1, 6), 1000, 99.)
+        self.methods.add_trades('BILL0', datetime(2022, 2, 5), -400, 99.5)
+        result = self.methods.valuation([datetime(2022, 2, 5), datetime(2022, 4, 7)], prices=self.book.prices)
+        book_before = 1000 - 10 * 61 / 91
+        first, last = result.iloc[0], result.iloc[1]
+        self.assertAlmostEqual(first['face'], 600)
+        self.assertAlmostEqual(first['book_value'], 0.6 * book_before)
+        self.assertAlmostEqual(first['realized_pnl'], 398 - 0.4 * book_before)
+        self.assertAlmostEqual(first['accretion'], 10 * 30 / 91)
+        # redeemed at 100 on maturity: all of the discount has accreted
+        self.assertEqual(last['face'], 0)
+        self.assertAlmostEqual(last['book_value'], 0)
+        self.assertAlmostEqual(last['accretion'] + last['realized_pnl'], 1000 - 990 - 400 + 398)
+        self.assertAlmostEqual(last['total_pnl'], last['accretion'] + last['realized_pnl'])
+
+    def test_matches_lot_by_lot_replay(self):
+        rng = np.random.default_rng(0)
+        trades = []
+        for isin, start, end, piece in [('BILL0', '2022-01-06', '2022-04-06', 100),
+                                        ('BILL1', '2022-01-06', '2022-07-06', 1000),
+                                        ('BILL2', '2022-02-03', '2022-12-30', 100)]:
+            held = 0
+            for date in sorted(rng.choice(pd.date_range(start, end), 12, replace=False)):
+                quantity = piece * int(rng.integers(1, 20))
+                if held and rng.random() < 0.4:
+                    quantity = -min(quantity, held)
+                held += quantity
+                trades.append((isin, pd.Timestamp(date), quantity, float(rng.uniform(95, 99.9))))
+        isin, dates, quantity, price = zip(*trades)
+        self.methods.add_trades(list(isin), list(dates), list(quantity), list(price))
+
+        valuation_dates = pd.date_range('2022-01-01', '2023-03-01', freq='7D')
+        result = self.methods.valuation(valuation_dates)
+        for date, row in result.iterrows():
+            book_value, accretion, realized = replay(self.book, trades, date)
+            self.assertAlmostEqual(row['book_value'], book_value, places=6)
+            self.assertAlmostEqual(row['accretion'], accretion, places=6)
+            self.assertAlmostEqual(row['realized_pnl'], realized, places=6)
+        np.testing.assert_allclose(result['total_pnl'],
+                                   result['accretion'] + result['realized_pnl'] + result['unrealized_pnl'])
+
+    def test_mark_to_market(self):
+        self.methods.add_trades(['BILL1', 'BILL2'], datetime(2022, 3, 1), [2000, 150], [98., 97.])
+        dates = pd.DatetimeIndex([datetime(2022, 2, 1), datetime(2022, 3, 1), datetime(2022, 5, 2)])
+        market_value = self.methods.mark_to_market(dates)
+        prices = self.book.prices.unstack('isin')
+        expected = prices.loc[dates, ['BILL1', 'BILL2']] * [20, 1.5]
+        expected.iloc[0] = 0
+        np.testing.assert_allclose(market_value.to_numpy(), expected.to_numpy())
+        np.testing.assert_array_equal(self.methods.holdings(dates).to_numpy(), [[0, 0], [2000, 150], [2000, 150]])
+
+    def test_trade_validation(self):
+        with self.assertRaises(AssertionError):
+            self.methods.add_trades('BILL1', datetime(2022, 2, 1), 500, 99.)
+        with self.assertRaises(AssertionError):
+            self.methods.add_trades('BILL2', datetime(2022, 3, 1), 120, 99.)
+        with self.assertRaises(AssertionError):
+            self.methods.add_trades('BILL0', datetime(2022, 4, 7), 100, 99.)
+        self.methods.add_trades('BILL2', datetime(2022, 3, 1), 150, 99.)
+        with self.assertRaises(AssertionError):
+            self.methods.add_trades('BILL2', datetime(2022, 3, 2), -200, 99.)
+        self.assertEqual(self.ledger.quantity.tolist(), [150])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from bill_book import BillBook, BillBookMethods
+from loaders import npz_member, pa, read_bill_book, read_bills, read_prices, write_universe
+
+
+class LoadersTest(unittest.TestCase):
+    format = 'npz'
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.bills = pd.DataFrame({'isin': ['BILL2', 'BILL0', 'BILL1'],
+                                   'inception': pd.to_datetime(['2022-02-03', '2022-01-06', '2022-01-06']),
+                                   'maturity': pd.to_datetime(['2023-02-02', '2022-04-07', '2022-07-07']),
+                                   'face_value': [100., 100., 1000.],
+                                   'min_piece': [100, 100, 1000], 'increment': [50, 100, 1000]})
+        pieces = []
+        for isin, inception, maturity in self.bills[['isin', 'inception', 'maturity']].itertuples(index=False):
+            dates = pd.date_range(inception, maturity - pd.Timedelta(days=1), freq='B', unit='ns')
+            pieces.append(pd.Series(rng.uniform(0.5, 5., dates.shape[0]),
+                                    index=pd.MultiIndex.from_product([dates, [isin]], names=['date', 'isin'])))
+        self.discounts = pd.concat(pieces).rename('discount').sample(frac=1, random_state=0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        write_universe(self.root, self.discounts, self.bills, format=self.format)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def expected(self, isins=None, start=None, end=None):
+        expected = self.discounts
+        dates = expected.index.get_level_values('date')
+        isin = expected.index.get_level_values('isin')
+        keep = np.ones(expected.shape[0], dtype=bool)
+        if isins is not None:
+            keep &= isin.isin(isins)
+        if start is not None:
+            keep &= dates >= start
+        if end is not None:
+            keep &= dates <= end
+        expected = expected[keep]
+        order = np.lexsort((expected.index.get_level_values('date'), expected.index.get_level_values('isin')))
+        return expected.iloc[order]
+
+    def test_read_prices(self):
+        assert_series_equal(read_prices(self.root), self.expected())
+
+    def test_pushdown(self):
+        start, end = pd.Timestamp('2022-03-01'), pd.Timestamp('2022-05-31')
+        assert_series_equal(read_prices(self.root, isins=['BILL2', 'BILL0'], start=start, end=end),
+                            self.expected(['BILL2', 'BILL0'], start, end))
+        assert_series_equal(read_prices(self.root, start=start), self.expected(start=start))
+        self.assertEqual(read_prices(self.root, isins=['MISSING']).shape[0], 0)
+
+    def test_read_bills(self):
+        bills = read_bills(self.root, isins=['BILL1', 'BILL0'], end=datetime(2022, 3, 31))
+        self.assertEqual([bill.isin for bill in bills], ['BILL0', 'BILL1'])
+        for bill in bills:
+            static = self.bills.set_index('isin').loc[bill.isin]
+            expected = Bill()
+            methods = BillMethods(expected)
+            methods.set_attributes(isin=bill.isin, inception=static['inception'], maturity=static['maturity'],
+                                   face_value=static['face_value'], min_piece=static['min_piece'],
+                                   increment=static['increment'])
+            discounts = self.expected([bill.isin], end=datetime(2022, 3, 31)).droplevel('isin').rename_axis(None)
+            methods.set_price_history(discounts)
+            self.assertEqual((bill.min_piece, bill.increment, bill.face_value),
+                             (expected.min_piece, expected.increment, expected.face_value))
+            # loaded columns carry no index freq
+            assert_series_equal(bill.prices, expected.prices, check_freq=False)
+
+    def test_read_bill_book(self):
+        book = read_bill_book(self.root)
+        expected = BillBook()
+        methods = BillBookMethods(expected)
+        methods.set_attributes(**self.bills.sort_values('isin').to_dict('list'))
+        methods.set_price_history(self.expected())
+        np.testing.assert_array_equal(book.isin, expected.isin)
+        np.testing.assert_array_equal(book.min_piece, expected.min_piece)
+        assert_series_equal(book.prices, expected.prices)
+
+    def test_price_universe(self):
+        # BillBook.prices round trip as a 'price' column, read back as prices by both readers
+        book = read_bill_book(self.root)
+        root = os.path.join(self.root, 'prices')
+        write_universe(root, book.prices, self.bills, format=self.format)
+        assert_series_equal(read_bill_book(root).prices, book.prices)
+        bills = read_bills(root)
+        self.assertEqual(len(bills), 3)
+        for bill in bills:
+            assert_series_equal(bill.prices, book.prices.xs(bill.isin, level='isin').rename_axis(None),
+                                check_freq=False)
+
+
+class NpzLoadersTest(LoadersTest):
+    def test_members_are_mapped(self):
+        self.assertIsInstance(npz_member(os.path.join(self.root, 'prices.npz'), 'discount'), np.memmap)
+
+    def test_compressed_fallback(self):
+        path = os.path.join(self.root, 'prices.npz')
+        with np.load(path) as archive:
+            np.savez_compressed(path, **{name: archive[name] for name in archive.files})
+        self.assertNotIsInstance(npz_member(path, 'discount'), np.memmap)
+        assert_series_equal(read_prices(self.root, isins=['BILL1']), self.expected(['BILL1']))
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class ParquetLoadersTest(LoadersTest):
+    format = 'parquet'
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class FeatherLoadersTest(LoadersTest):
+    format = 'feather'
+
+
+del LoadersTest
+
+if __name__ == '__main__':
+    unittest.main()
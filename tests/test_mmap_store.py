@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from mmap_store import MmapPriceLibrary, MmapPriceStore
+
+
+class MmapPriceStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.library = MmapPriceLibrary(self.tmp.name)
+        self.prices = pd.Series([10., 20., 30.], index=pd.date_range('2022-01-01', periods=3), name='price')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_and_open(self):
+        self.library.write('ABC123', self.prices)
+        self.assertIn('ABC123', self.library)
+        self.assertEqual(self.library.keys(), ['ABC123'])
+        
+        store = self.library.open('ABC123', name='price')
+        self.assertEqual(len(store), 3)
+        self.assertFalse(store.mapped)
+        assert_series_equal(store.to_series(), self.prices, check_index_type=False, check_freq=False)
+        self.assertTrue(store.mapped)
+        self.assertIsInstance(store.to_series().values, np.memmap)
+
+    def test_file_layout(self):
+        self.library.write('ABC123', self.prices)
+        days = np.fromfile(os.path.join(self.tmp.name, 'ABC123.1.days'), dtype=np.int64)
+        values = np.fromfile(os.path.join(self.tmp.name, 'ABC123.1.values'), dtype=np.float64)
+        np.testing.assert_array_equal(days, [18993, 18994, 18995])
+        np.testing.assert_array_equal(values, [10., 20., 30.])
+        with open(os.path.join(self.tmp.name, 'ABC123.meta')) as f:
+            self.assertEqual(f.read().split(), ['1', '3'])
+
+    def test_appends_grow_geometrically(self):
+        store = self.library.write('ABC123', self.prices)
+        dates = pd.date_range('2022-01-04', periods=100)
+        for i in range(100):
+            store.update(pd.Series([float(i)], index=dates[i:i + 1], name='price'))
+        # 3 -> 6 -> 12 -> 24 -> 48 -> 96 -> 192 rows: a new generation per doubling, not per append
+        self.assertEqual((store.generation, store.capacity, len(store)), (7, 192, 103))
+        reopened = self.library.open('ABC123', name='price')
+        self.assertEqual(len(reopened), 103)
+        np.testing.assert_array_equal(reopened.to_series().values[-3:], [97., 98., 99.])
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['ABC123.7.days', 'ABC123.7.values', 'ABC123.meta'])
+
+    def test_correction_keeps_earlier_series(self):
+        store = self.library.write('ABC123', self.prices)
+        before = store.to_series()
+        store.update(pd.Series([5.], index=pd.to_datetime(['2022-01-02']), name='price'))
+        self.assertEqual(store.generation, 2)
+        np.testing.assert_array_equal(before.values, [10., 20., 30.])
+        np.testing.assert_array_equal(store.to_series().values, [10., 5., 30.])
+
+    def test_update_matches_combine_first(self):
+        store = self.library.write('ABC123', self.prices)
+        new_prices = pd.Series([40., 50., 5.], name='price',
+                               index=pd.to_datetime(['2022-01-03', '2022-01-04', '2021-12-30']))
+        store.update(new_prices.iloc[:2])
+        store.update(new_prices.iloc[2:])
+        expected = new_prices.combine_first(self.prices)
+        assert_series_equal(self.library.open('ABC123', name='price').to_series(), expected,
+                            check_index_type=False, check_freq=False)
+
+    def test_bill_methods_on_mmap_store(self):
+        discounts = pd.Series([5, 6, 7, 8, 9], name='discount', index=pd.date_range(start='2023-01-01', periods=5))
+        results = []
+        for store in (None, MmapPriceStore(self.tmp.name, 'ABC123')):
+            bill = Bill()
+            bill_methods = BillMethods(bill)
+            bill_methods.set_attributes(isin='ABC123', inception=datetime(2022, 12, 29),
+                                        maturity=datetime(2023, 6, 29), face_value=100)
+            if store is not None:
+                bill_methods.set_price_store(store)
+            bill_methods.set_price_history(discounts)
+            bill_methods.update_price(pd.Series([10, 11], index=pd.date_range(start='2023-01-04', periods=2)))
+            results.append(bill_methods.calc_ytm(return_series=True))
+        
+        assert_series_equal(results[1], results[0], check_index_type=False, check_freq=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
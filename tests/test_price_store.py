@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from price_store import PriceStore
+
+
+class PriceStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.prices = pd.Series([10., 20., 30.], index=pd.date_range('2022-01-01', periods=3), name='price')
+        self.store = PriceStore.from_series(self.prices)
+
+    def test_from_series(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertIs(self.store.to_series(), self.prices)
+
+    def test_append(self):
+        capacity = self.store._values.shape[0]
+        for i, date in enumerate(pd.date_range('2022-01-04', periods=100)):
+            self.store.update(pd.Series([float(i)], index=[date], name='price'))
+        self.assertEqual(len(self.store), 103)
+        # buffers grow geometrically, not once per append
+        self.assertLess(self.store._values.shape[0], 4 * 103)
+        self.assertGreater(self.store._values.shape[0], capacity)
+        self.assertEqual(self.store.to_series().index.freq, 'D')
+        self.assertEqual(self.store.to_series().iloc[-1], 99.)
+
+    def test_matches_combine_first(self):
+        new_prices = pd.Series([40., np.nan, 50., 5.], name='price',
+                               index=pd.to_datetime(['2022-01-03', '2022-01-02', '2022-01-06', '2021-12-30']))
+        expected = new_prices.combine_first(self.prices)
+        self.store.update(new_prices)
+        assert_series_equal(self.store.to_series(), expected, check_freq=False)
+
+    def test_correction_does_not_touch_previous_series(self):
+        before = self.store.to_series()
+        self.store.update(pd.Series([25.], index=pd.to_datetime(['2022-01-02']), name='price'))
+        self.assertEqual(before.iloc[1], 20.)
+        self.assertEqual(self.store.to_series().iloc[1], 25.)
+
+    def test_dirty_dates(self):
+        self.assertIsNone(self.store.dirty_dates('ytm'))
+        self.store.mark_clean('ytm')
+        self.assertEqual(self.store.dirty_dates('ytm').shape[0], 0)
+        self.store.update(pd.Series([1., 2.], index=pd.to_datetime(['2022-01-04', '2022-01-02'])))
+        np.testing.assert_array_equal(self.store.dirty_dates('ytm'), pd.to_datetime(['2022-01-02', '2022-01-04']).values)
+        self.assertIsNone(self.store.dirty_dates('ytm', tag=6))
+        self.store.invalidate()
+        self.assertIsNone(self.store.dirty_dates('ytm'))
+
+    def test_invalid_index(self):
+        with self.assertRaises(AssertionError):
+            self.store.update(pd.Series([1.], index=[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from debt import Debt, DebtMethods
+from rates import StepRate
+
+
+class StepRateTests(unittest.TestCase):
+    def setUp(self):
+        self.rate = StepRate(dates=[datetime(2023, 1, 1), datetime(2023, 1, 4)], values=[0.05, 0.06],
+                             end=datetime(2023, 1, 6))
+
+    def test_lookup(self):
+        dates = pd.to_datetime(['2022-12-31', '2023-01-01', '2023-01-03', '2023-01-04', '2023-01-06', '2023-01-07'])
+        np.testing.assert_array_equal(self.rate.lookup(dates), [np.nan, 0.05, 0.05, 0.06, 0.06, np.nan])
+        self.assertEqual(self.rate[pd.Timestamp('2023-01-05')], 0.06)
+
+    def test_slice(self):
+        sliced = self.rate['2023-01-02':'2023-01-05']
+        self.assertEqual(len(sliced), 2)
+        self.assertEqual(sliced.start, np.datetime64('2023-01-02'))
+        self.assertEqual(sliced.end, np.datetime64('2023-01-05'))
+        np.testing.assert_array_equal(sliced.values, [0.05, 0.06])
+
+    def test_to_series(self):
+        expected = pd.Series([0.05, 0.05, 0.05, 0.06, 0.06, 0.06], index=pd.date_range('2023-01-01', '2023-01-06'))
+        assert_series_equal(self.rate.to_series(), expected, check_index_type=False)
+
+    def test_from_series(self):
+        steps = pd.Series([0.05, 0.05, 0.06, 0.06], index=pd.date_range('2023-01-01', periods=4))
+        rate = StepRate.from_series(steps, end=datetime(2023, 1, 6))
+        self.assertEqual(len(rate), 2)
+        self.assertEqual(rate, StepRate(dates=['2023-01-01', '2023-01-03'], values=[0.05, 0.06], end='2023-01-06'))
+
+
+class DebtRateTests(unittest.TestCase):
+    def setUp(self):
+        self.debt = Debt()
+        self.debt_methods = DebtMethods(self.debt)
+
+    def test_float_rate_is_compact(self):
+        self.debt_methods.set_attributes(inception=datetime(1995, 1, 1), maturity=datetime(2025, 1, 1), rate=0.05)
+        self.assertEqual(len(self.debt.rate), 1)
+        daily = self.debt.rate.to_series()
+        expected = pd.Series(data=np.ones(daily.shape[0]) * 0.05,
+                             index=pd.date_range(start=datetime(1995, 1, 1), end=datetime(2025, 1, 1), freq='D'))
+        assert_series_equal(daily, expected, check_index_type=False)
+
+    def test_series_rate(self):
+        steps = pd.Series([0.05, 0.06], index=pd.to_datetime(['2023-01-01', '2023-01-03']))
+        self.debt_methods.set_attributes(inception=datetime(2023, 1, 1), maturity=datetime(2023, 1, 5), rate=steps)
+        np.testing.assert_array_equal(self.debt.rate.to_series().values, [0.05, 0.05, 0.06, 0.06, 0.06])
+        assert_series_equal(self.debt.rate.to_series(freq=None), steps, check_index_type=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from records import AssetRecord, BillRecord
+
+
+class RecordTests(unittest.TestCase):
+
+    def test_no_dict_and_no_shared_defaults(self):
+        record = BillRecord()
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertIsNone(record.maturity)
+        self.assertIsNone(record.prices)
+        with self.assertRaises(AttributeError):
+            record.unknown_field = 1
+        self.assertNotIn('maturity', vars(BillRecord))
+
+    def test_fields(self):
+        record = AssetRecord(asset_id='12345')
+        self.assertEqual(record.asset_id, '12345')
+        self.assertEqual(repr(record), "AssetRecord(asset_id='12345')")
+
+    def test_same_results_as_bill(self):
+        discounts = pd.Series([5, 6, 7, 8, 9], name='discount', index=pd.date_range(start='2023-01-01', periods=5))
+        results = []
+        for bill in (Bill(), BillRecord()):
+            bill_methods = BillMethods(bill)
+            bill_methods.set_attributes(isin='ABC123', inception=datetime(2022, 12, 29),
+                                        maturity=datetime(2023, 6, 29), face_value=100)
+            bill_methods.set_price_history(discounts)
+            bill_methods.update_price(pd.Series([10, 11], index=pd.date_range(start='2023-01-04', periods=2)))
+            results.append((bill_methods.calc_ytm(return_series=True), bill_methods.calc_discount(return_series=True)))
+        assert_series_equal(results[0][0], results[1][0])
+        assert_series_equal(results[0][1], results[1][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
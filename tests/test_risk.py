@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from cashflows import CashFlowMethods
+from debt import Debt
+from risk import BP, RiskEngine, key_rate_bumps, parallel_shifts, scenario_matrix
+
+
+DATE = pd.Timestamp('2022-03-01')
+
+
+def make_book():
+    methods = []
+    for i, days in enumerate([91, 182, 364]):
+        bill = Bill()
+        bill_methods = BillMethods(bill)
+        bill_methods.set_attributes(isin=f'BILL{i}', inception=datetime(2022, 1, 6),
+                                    maturity=datetime(2022, 1, 6) + pd.Timedelta(days=days), face_value=100)
+        dates = pd.date_range('2022-01-06', '2022-03-10', freq='D')
+        bill_methods.set_price_history(pd.Series(np.linspace(1., 3., dates.shape[0]), index=dates))
+        bill_methods.calc_ytm()
+        methods.append(bill_methods)
+
+    debt = Debt()
+    debt_methods = CashFlowMethods(debt)
+    pay_dates = pd.to_datetime(['2022-01-01', '2023-01-01', '2024-01-01', '2027-01-01'])
+    pmt_schedule = pd.DataFrame({'interest': [50., 50., 50., 50.], 'principal': [0., 0., 0., 1000.]},
+                                index=pay_dates)
+    debt_methods.set_attributes(inception=datetime(2021, 1, 1), maturity=datetime(2027, 1, 1), face_value=1000,
+                                pmt_schedule=pmt_schedule)
+    dates = pd.date_range('2021-01-01', '2022-06-30', freq='D')
+    clean = debt_methods.dirty_price(0.04, dates) - debt_methods.accrued_interest(dates)
+    debt_methods.set_price_history(pd.Series(clean, index=dates))
+    debt_methods.calc_ytm()
+    methods.append(debt_methods)
+    return methods
+
+
+class RiskEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.methods = make_book()
+        self.engine = RiskEngine(self.methods, DATE)
+
+    def bill_price(self, methods, shift=0.):
+        tenor = methods.calc_tenor(pd.DatetimeIndex([DATE]))[0]
+        return 100 / (1 + (methods.bill.historic_ytm[DATE] + shift) * tenor)
+
+    def test_base_and_parallel_shift(self):
+        debt_methods = self.methods[-1]
+        for shift, values in zip([0., -0.01, 0.02], self.engine.value(parallel_shifts([0., -0.01, 0.02]))):
+            expected = [self.bill_price(m, shift) for m in self.methods[:3]] + \
+                       [debt_methods.dirty_price(0.04 + shift, [DATE])[0]]
+            np.testing.assert_allclose(values, expected, rtol=1e-12)
+        np.testing.assert_allclose(self.engine.base[:3], [m.bill.prices[DATE] for m in self.methods[:3]],
+                                   rtol=1e-12)
+
+    def test_chunking(self):
+        scenarios = scenario_matrix(shifts=np.linspace(-0.02, 0.02, 9), key_rates=True)
+        # blocks of one instrument (max_elements < tenor.size), of two, and of the whole book
+        self.assertLess(5, self.engine.tenor.size)
+        for max_elements in (5, 60, 1000):
+            chunked = RiskEngine(self.methods, DATE, max_elements=max_elements)
+            np.testing.assert_array_equal(chunked.value(scenarios), self.engine.value(scenarios))
+
+    def test_measures(self):
+        measures = self.engine.measures()
+        self.assertEqual(list(measures.index), ['BILL0', 'BILL1', 'BILL2', 3])
+        for methods in self.methods[:3]:
+            tenor = methods.calc_tenor(pd.DatetimeIndex([DATE]))[0]
+            ytm = methods.bill.historic_ytm[DATE]
+            row = measures.loc[methods.bill.isin]
+            self.assertAlmostEqual(row['modified_duration'], tenor / (1 + ytm * tenor), places=6)
+            self.assertAlmostEqual(row['convexity'], 2 * tenor ** 2 / (1 + ytm * tenor) ** 2, places=4)
+        debt = measures.loc[3]
+        self.assertAlmostEqual(debt['dv01'], debt['price'] * debt['modified_duration'] * BP, places=12)
+        self.assertAlmostEqual(debt['position_dv01'], debt['dv01'] * 10, places=12)
+        self.assertGreater(debt['convexity'], 0)
+
+    def test_key_rates(self):
+        key_rates = self.engine.key_rate_dv01()
+        np.testing.assert_allclose(key_rates.sum(axis=1), self.engine.measures()['dv01'], rtol=1e-6)
+        # the 3-month bill only moves with the pillars around its tenor
+        self.assertEqual((key_rates.loc['BILL0'] != 0).sum(), 1)
+        self.assertEqual(key_rates.loc[3, 30.], 0)
+
+    def test_pnl_and_matured(self):
+        pnl = self.engine.pnl(scenario_matrix(shifts=[-BP, BP]))
+        self.assertEqual(list(pnl.index), ['parallel -1bp', 'parallel +1bp'])
+        np.testing.assert_allclose(pnl.iloc[0] - pnl.iloc[1], 2 * self.engine.measures()['position_dv01'],
+                                   rtol=1e-6)
+        late = RiskEngine(self.methods, '2022-06-01', holdings=1e6)
+        self.assertTrue(np.isnan(late.base[0]))
+        self.assertFalse(np.isnan(late.base[1:]).any())
+        self.assertEqual(key_rate_bumps().shape, (7, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_series_equal
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from snapshot import Snapshot, input_hash, write_snapshot
+
+
+def make_bills(shift=None):
+    rng = np.random.default_rng(0)
+    bills = []
+    for i in range(4):
+        bill = Bill()
+        methods = BillMethods(bill)
+        inception = datetime(2022, 1, 6) + pd.Timedelta(days=7 * i)
+        methods.set_attributes(isin=f'BILL{i}', inception=inception, maturity=inception + pd.Timedelta(days=182),
+                               face_value=100, min_piece=100, increment=50)
+        dates = pd.date_range(inception, periods=120, freq='D')
+        discounts = pd.Series(rng.uniform(0.5, 5., 120), index=dates)
+        if shift is not None and i == shift:
+            discounts.iloc[-1] += 0.25
+        methods.set_price_history(discounts)
+        bills.append(bill)
+    return bills
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'bills.snap')
+        self.bills = make_bills()
+        for bill in self.bills:
+            BillMethods(bill).calc_ytm()
+            BillMethods(bill).calc_discount()
+        unpriced = Bill()
+        BillMethods(unpriced).set_attributes(isin='EMPTY', inception=datetime(2022, 1, 6),
+                                             maturity=datetime(2022, 7, 7), face_value=100)
+        write_snapshot(self.path, self.bills + [unpriced])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_restore(self):
+        snapshot = Snapshot(self.path)
+        self.assertEqual(snapshot.isins, ['BILL0', 'BILL1', 'BILL2', 'BILL3', 'EMPTY'])
+        restored = snapshot.restore()
+        for bill, original in zip(restored, self.bills):
+            self.assertEqual((bill.isin, bill.face_value, bill.min_piece, bill.increment),
+                             (original.isin, original.face_value, original.min_piece, original.increment))
+            self.assertEqual(bill.maturity, original.maturity)
+            self.assertEqual(type(bill.convention), type(original.convention))
+            self.assertIsInstance(bill.price_store.values, np.memmap)
+            self.assertTrue(bill.prices.index.equals(original.prices.index))
+            np.testing.assert_array_equal(bill.prices.values, original.prices.values)
+            np.testing.assert_array_equal(bill.historic_ytm.values, original.historic_ytm.values)
+            np.testing.assert_array_equal(bill.discounts.values, original.discounts.values)
+            self.assertEqual(input_hash(bill), input_hash(original))
+        self.assertIsNone(restored[-1].prices)
+
+    def test_restored_bill_updates(self):
+        bill, = Snapshot(self.path).restore(['BILL1'])
+        methods = BillMethods(bill)
+        date = bill.prices.index[-1] + pd.Timedelta(days=1)
+        methods.update_price(pd.Series([2.], index=pd.DatetimeIndex([date])))
+        ytm = methods.calc_ytm(return_series=True)
+        self.assertEqual(ytm.shape[0], 121)
+        expected = BillMethods(Bill())
+        expected.set_attributes(isin='BILL1', inception=bill.inception, maturity=bill.maturity, face_value=100)
+        expected.bill.prices = bill.prices.copy()
+        np.testing.assert_allclose(ytm.values, expected.calc_ytm(return_series=True).values, rtol=1e-15)
+
+    def test_refresh_recalculates_changed_inputs(self):
+        snapshot = Snapshot(self.path)
+        fresh = make_bills(shift=2)
+        self.assertEqual(snapshot.refresh(fresh), ['BILL2'])
+        for bill in fresh:
+            expected = bill.historic_ytm.copy()
+            assert_series_equal(expected, BillMethods(bill).calc_ytm(return_series=True, incremental=False))
+        self.assertFalse(np.array_equal(fresh[2].historic_ytm.values, self.bills[2].historic_ytm.values))
+        np.testing.assert_array_equal(fresh[0].historic_ytm.values, self.bills[0].historic_ytm.values)
+        # reused analytics count as clean for the incremental calc_* paths
+        self.assertEqual(fresh[0].price_store.dirty_dates('ytm', BillMethods(fresh[0]).splice_tag()).shape[0], 0)
+
+    def test_verify(self):
+        snapshot = Snapshot(self.path)
+        self.assertEqual(snapshot.verify(), [])
+        offset = snapshot.header['columns']['ytm'] + 8 * snapshot.entries['BILL3']['start']
+        with open(self.path, 'r+b') as f:
+            f.seek(offset)
+            f.write(np.float64(1.).tobytes())
+        self.assertEqual(Snapshot(self.path).verify(), ['BILL3'])
+
+    def test_version_mismatch(self):
+        snapshot = Snapshot(self.path)
+        snapshot.header['version'] = 0
+        self.assertTrue(snapshot.is_stale(self.bills[0]))
+        with self.assertRaises(AssertionError):
+            snapshot.restore()
+        self.assertEqual(snapshot.refresh(make_bills()), ['BILL0', 'BILL1', 'BILL2', 'BILL3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+package_path = '\\'.join(os.path.realpath(__file__).split('\\')[:-2])
+sys.path.append(package_path)
+from bill import Bill, BillMethods
+from cashflows import CashFlowMethods
+from debt import Debt
+from solvers import YieldSolver, discounted_value, solve_ytm
+
+
+class YieldSolverTest(unittest.TestCase):
+    def setUp(self):
+        self.tenor = np.array([[0.5, 1., 1.5], [1., 2., 3.], [0.25, 0.5, 0.]])
+        self.amounts = np.array([[3., 3., 103.], [5., 5., 105.], [1., 101., 0.]])
+        self.true_yields = np.array([0.02, 0.07, -0.01])
+        self.target = discounted_value(self.true_yields, self.tenor, self.amounts, 1)[0]
+
+    def price_fn(self, yields, rows):
+        return discounted_value(yields, self.tenor[rows], self.amounts[rows], 1)
+
+    def test_newton(self):
+        result = YieldSolver().solve(self.price_fn, self.target)
+        np.testing.assert_allclose(result.yields, self.true_yields, atol=1e-12)
+        self.assertTrue(result.converged.all())
+        self.assertFalse(result.bisected.any())
+        self.assertTrue((result.iterations > 0).all())
+
+    def test_bisection_fallback(self):
+        result = YieldSolver(max_iter=1).solve(self.price_fn, self.target)
+        np.testing.assert_allclose(result.yields, self.true_yields, atol=1e-10)
+        self.assertTrue(result.converged.all())
+        self.assertTrue(result.bisected.all())
+
+    def test_no_root(self):
+        target = self.target.copy()
+        target[0] = 1e6
+        target[1] = np.nan
+        result = YieldSolver().solve(self.price_fn, target)
+        self.assertFalse(result.converged[0])
+        self.assertTrue(np.isnan(result.yields[1]))
+        self.assertFalse(result.converged[1] or result.bisected[1])
+        self.assertTrue(result.converged[2])
+
+    def test_warm_start(self):
+        steps = 200
+        yields = 0.08 + np.linspace(0, 0.002, steps)
+        tenor = np.tile(np.arange(1., 11.), (steps, 1))
+        amounts = np.tile(np.r_[np.full(9, 4.), 104.], (steps, 1))
+        target = discounted_value(yields, tenor, amounts, 2)[0]
+
+        def price_fn(y, rows):
+            return discounted_value(y, tenor[rows], amounts[rows], 2)
+
+        solver = YieldSolver()
+        cold = solver.solve(price_fn, target)
+        warm = solver.solve(price_fn, target, steps=np.arange(steps), block=1)
+        np.testing.assert_allclose(warm.yields, yields, atol=1e-12)
+        np.testing.assert_allclose(cold.yields, yields, atol=1e-12)
+        self.assertLess(warm.iterations[1:].sum(), cold.iterations[1:].sum())
+
+
+class SolveYtmTest(unittest.TestCase):
+    def test_bills_and_debt(self):
+        bill = Bill()
+        bill_methods = BillMethods(bill)
+        bill_methods.set_attributes(isin='TEST00000001', inception=datetime(2021, 1, 7),
+                                    maturity=datetime(2022, 1, 6), face_value=100)
+        bill_methods.set_price_history(pd.Series(np.linspace(3, 1, 300), name='discount',
+                                                 index=pd.date_range('2021-01-07', periods=300, freq='D')))
+        expected_bill = bill_methods.calc_ytm(return_series=True)
+
+        debt = Debt()
+        debt_methods = CashFlowMethods(debt)
+        pmt_schedule = pd.DataFrame({'interest': [50., 50., 50.], 'principal': [0., 0., 1000.]},
+                                    index=pd.to_datetime(['2022-01-01', '2023-01-01', '2024-01-01']))
+        debt_methods.set_attributes(inception=datetime(2021, 1, 1), maturity=datetime(2024, 1, 1),
+                                    face_value=1000, pmt_schedule=pmt_schedule)
+        dates = pd.date_range('2021-01-01', '2023-12-30', freq='3D')
+        true_yields = np.linspace(0.01, 0.09, dates.shape[0])
+        debt_methods.set_price_history(pd.Series(debt_methods.clean_price(true_yields, dates), index=dates))
+
+        result = solve_ytm([bill_methods, debt_methods], block=8)
+        self.assertTrue(result.converged.all())
+        self.assertEqual(result.yields.shape[0], 300 + dates.shape[0])
+        np.testing.assert_allclose(bill.historic_ytm.values, expected_bill.values, rtol=1e-10)
+        np.testing.assert_allclose(debt.historic_ytm.values, true_yields, atol=1e-10)
+
+    def test_empty(self):
+        result = solve_ytm([BillMethods(Bill())])
+        self.assertEqual(result.yields.shape[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()